@@ -9,6 +9,8 @@ import time as t
 import json
 import requests
 from config_manager import get_config
+from postprocess_queue import PostProcessQueue
+from schedule_store import ScheduleStore
 
 # === CONFIG ===
 config = get_config()
@@ -21,6 +23,11 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 scheduled_jobs = []
 current_process = None
 stop_event = threading.Event()
+POSTPROCESS_CONFIG = config.get_postprocess_config()
+# Same database as the web app, so queued remuxes survive a restart of either
+schedule_store = ScheduleStore(os.path.join(SAVE_DIR, "scheduled_jobs.db"))
+postprocessor = PostProcessQueue(FFMPEG_PATH, workers=POSTPROCESS_CONFIG['workers'],
+                                 nice_level=POSTPROCESS_CONFIG['nice'], store=schedule_store)
 
 # === FUNCTIONS ===
 
@@ -47,6 +54,7 @@ def record_channel(channel_key, duration_min, crf=23, preset="fast", update_prog
     now = datetime.now().strftime("%Y-%m-%d_%H-%M")
     # Determine format
     record_format = record_format_var.get() if record_format_var else "mp4"
+    fragmented = config.get_recording_config()['capture_mode'] == 'fragmented'
     ext = ".mp4" if record_format == "mp4" else ".ts"
     filename = f"{chname}_{now}{ext}"
     filepath = os.path.join(SAVE_DIR, filename)
@@ -67,7 +75,8 @@ def record_channel(channel_key, duration_min, crf=23, preset="fast", update_prog
             "-crf", str(crf),
             "-c:a", "aac",
             "-b:a", "160k",
-            "-movflags", "+faststart",
+            # Fragmented MP4 stays playable mid-recording and after a crash, with no fix-up pass
+            "-movflags", "+frag_keyframe+empty_moov+default_base_moof" if fragmented else "+faststart",
             "-y",
             filepath
         ]
@@ -132,31 +141,10 @@ def record_channel(channel_key, duration_min, crf=23, preset="fast", update_prog
     current_process = None
 
     # === POST-PROCESSING: Ensure moov atom is at the start (only for mp4) ===
-    if record_format == "mp4":
-        fixed_filepath = filepath.replace('.mp4', '_fixed.mp4')
-        post_cmd = [
-            FFMPEG_PATH,
-            '-i', filepath,
-            '-c', 'copy',
-            '-movflags', '+faststart',
-            '-y', fixed_filepath
-        ]
-        print(f"Post-processing: fixing moov atom for {filename}...")
-        try:
-            post_proc = subprocess.Popen(post_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-            for line in iter(post_proc.stdout.readline, b''):
-                if not line:
-                    break
-                print(line.decode(errors='ignore').strip())
-            post_proc.wait()
-            if post_proc.returncode == 0:
-                print(f"Moov atom fixed. Output: {fixed_filepath}")
-                # Optionally replace original file
-                os.replace(fixed_filepath, filepath)
-            else:
-                print(f"Post-processing failed for {filename}")
-        except Exception as e:
-            print(f"Error during post-processing: {e}")
+    # Queued so the recording thread is free as soon as capture ends
+    if record_format == "mp4" and not fragmented:
+        postprocessor.enqueue('remux', filepath,
+                              then=['thumbnail'] if POSTPROCESS_CONFIG['thumbnails'] else None)
 
 def run_threaded(job_func, *args):
     threading.Thread(target=job_func, args=args, daemon=True).start()
@@ -316,6 +304,10 @@ listbox_scheduled.grid(row=8, column=0, columnspan=8)
 ttk.Button(frame, text="Cancel Selected", command=cancel_selected).grid(row=9, column=0, pady=5)
 
 load_schedule()
+# Pick up post-processing interrupted by the last shutdown
+resumed = postprocessor.resume()
+if resumed:
+    print(f"[PostProcess] Resumed {resumed} job(s) from the last run")
 
 def run_schedule_loop():
     while True:
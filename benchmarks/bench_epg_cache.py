@@ -0,0 +1,92 @@
+"""
+Startup benchmark for the binary EPG cache (epg_cache_file)
+
+Writes a synthetic guide (channels x days of 30-minute programs) to a temp
+directory, then times epg_cache_file.load() plus the EPGStore build that
+dvr_web does at startup and a 3-hour "what's on" lookup, and reports the
+Python memory they keep alive (tracemalloc).
+
+    python benchmarks/bench_epg_cache.py [channels] [days]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import epg_cache_file
+from epg_store import EPGStore
+
+GENRES = ['Drama', 'Comedy', 'News', 'Sports', 'Reality', 'Documentary']
+
+
+def synthetic_guide(channels=150, days=14):
+    start = datetime(2025, 1, 6)
+    programs = []
+    for ch in range(channels):
+        for slot in range(days * 48):
+            begins = start + timedelta(minutes=30 * slot)
+            programs.append({
+                'title': f'Program {ch}-{slot % 40}',
+                'episode_title': f'Episode {slot}',
+                'season': str(1 + slot // 200),
+                'episode': str(slot % 24 + 1),
+                'description': f'A synthetic listing used for benchmarking, slot {slot} on channel {ch}. ' * 3,
+                'genre': GENRES[slot % len(GENRES)],
+                'channel_name': f'K{ch:03d}',
+                'channel_number': f'{ch}.1',
+                'time': begins.strftime('%I:%M %p'),
+                'date': begins.strftime('%Y-%m-%d'),
+                'period': 'Evening',
+                'duration': '30',
+                'start_ts': begins.timestamp(),
+            })
+    return programs
+
+
+def main():
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 14
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'epg_cache.bin')
+        guide = synthetic_guide(channels, days)
+        index_bytes, desc_bytes = epg_cache_file.save(path, guide, time.time())
+        count = len(guide)
+        window_start = guide[0]['start_ts'] + 5 * 86400
+        del guide
+        gc.collect()
+        print(f"{count:,} programs: {index_bytes / 1024:,.0f} KB index + {desc_bytes / 1024:,.0f} KB descriptions")
+
+        # Timed without tracemalloc, whose bookkeeping slows allocation-heavy code a lot
+        started = time.perf_counter()
+        programs, _ = epg_cache_file.load(path)
+        loaded = time.perf_counter()
+        store = EPGStore(programs)
+        built = time.perf_counter()
+        window = store.between(window_start, window_start + 3 * 3600)
+        looked_up = time.perf_counter()
+        print(f"load:  {(loaded - started) * 1000:,.0f} ms")
+        print(f"index: {(built - loaded) * 1000:,.0f} ms")
+        print(f"3-hour window: {len(window):,} programs in {(looked_up - built) * 1000:,.1f} ms")
+        del programs, store, window
+        gc.collect()
+
+        tracemalloc.start()
+        programs, _ = epg_cache_file.load(path)
+        store = EPGStore(programs)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"memory after startup: {current / 2 ** 20:,.1f} MiB (peak {peak / 2 ** 20:,.1f} MiB)")
+        store.between(window_start, window_start + 3 * 3600)
+        current, _ = tracemalloc.get_traced_memory()
+        print(f"after the 3-hour window: {current / 2 ** 20:,.1f} MiB")
+        tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for epg_zap2it.parse_gracenote_data
+
+Builds a synthetic 6-hour grid response (channels x 30-minute events) and
+reports how many events per second the parser handles.
+
+    python benchmarks/bench_parse_gracenote.py [channels] [repeats]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from epg_zap2it import parse_gracenote_data
+
+
+def synthetic_grid(channels=100, hours=6):
+    start = datetime(2025, 1, 6, 12, 0, tzinfo=timezone.utc)
+    data = {'channels': []}
+    for ch in range(channels):
+        events = []
+        for slot in range(hours * 2):
+            begins = start + timedelta(minutes=30 * slot)
+            events.append({
+                'startTime': begins.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'duration': '30',
+                'program': {
+                    'title': f'Program {ch}-{slot}',
+                    'episodeTitle': 'Pilot',
+                    'seasonNumber': '1',
+                    'episodeNumber': str(slot + 1),
+                    'shortDescription': 'A synthetic listing used for benchmarking.',
+                    'genre': 'Drama',
+                    'rating': 'TV-PG',
+                },
+            })
+        data['channels'].append({'callSign': f'K{ch:03d}', 'affiliateName': 'NBC',
+                                 'channelNo': f'{ch}.1', 'events': events})
+    return data
+
+
+def main():
+    channels = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    grid = synthetic_grid(channels)
+    events = sum(len(ch['events']) for ch in grid['channels'])
+    parse_gracenote_data(grid, '2025-01-06')  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        parse_gracenote_data(grid, '2025-01-06')
+    elapsed = time.perf_counter() - started
+    print(f"{events * repeats} events in {elapsed:.3f}s: {events * repeats / elapsed:,.0f} events/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Micro-benchmark for release_classifier.classify
+
+Builds a corpus of synthetic release names (episodes, season packs, movies,
+dated shows, cam/telesync rips) and compares the single-pass classifier with
+the previous one-re.search-per-indicator detect_content_type: titles per
+second for both, and how many verdicts differ.
+
+    python benchmarks/bench_release_classifier.py [titles] [repeats]
+"""
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from release_classifier import classify
+
+SHOWS = ['The Office', 'Severance', 'Slow Horses', 'Only Murders in the Building', 'Shogun', 'The Bear',
+         'Doctor Who', 'Taskmaster', 'Jeopardy', 'The Tonight Show Starring Jimmy Fallon']
+MOVIES = ['Dune Part Two', 'Oppenheimer', 'Blade Runner', 'The Thing', 'Heat', 'Alien', 'Arrival',
+          'Past Lives', 'Aliens', 'The Godfather']
+RESOLUTIONS = ['2160p', '1080p', '720p', '480p', '4K', '']
+TV_SOURCES = ['WEB-DL', 'WEBRip', 'HDTV', 'AMZN.WEB-DL', 'NF.WEBRip']
+MOVIE_SOURCES = ['BluRay', 'BDRip', 'DVDRip', 'REMUX.BluRay', 'HDCAM', 'TS', 'WEB-DL']
+CODECS = ['x264', 'x265', 'H.264', 'HEVC', 'AV1']
+AUDIO = ['DDP5.1', 'AAC2.0', 'DTS-HD.MA.5.1', 'Atmos', '']
+GROUPS = ['NTb', 'FLUX', 'SPARKS', 'RARBG', 'GalaxyTV', 'YIFY']
+EDITIONS = ['', '', '', 'Directors.Cut', 'Extended.Cut', 'UNRATED', 'REMASTERED', 'Criterion']
+
+
+def synthetic_titles(count=20000, seed=7):
+    rnd = random.Random(seed)
+    titles = []
+    for i in range(count):
+        kind = i % 5
+        if kind in (0, 1):
+            show = rnd.choice(SHOWS).replace(' ', rnd.choice('. '))
+            tag = rnd.choice([f"S{rnd.randint(1, 9):02d}E{rnd.randint(1, 24):02d}",
+                              f"{rnd.randint(1, 9)}x{rnd.randint(1, 24):02d}",
+                              f"Season {rnd.randint(1, 9)} Episode {rnd.randint(1, 24)}"])
+            parts = [show, tag, rnd.choice(RESOLUTIONS), rnd.choice(TV_SOURCES), rnd.choice(CODECS)]
+        elif kind == 2:
+            show = rnd.choice(SHOWS).replace(' ', '.')
+            tag = rnd.choice([f"S{rnd.randint(1, 9):02d}", f"Complete Season {rnd.randint(1, 9)}",
+                              f"Season {rnd.randint(1, 9)} Pack", "Complete TV Series"])
+            parts = [show, tag, rnd.choice(RESOLUTIONS), rnd.choice(TV_SOURCES), rnd.choice(AUDIO)]
+        elif kind == 3:
+            movie = rnd.choice(MOVIES).replace(' ', '.')
+            parts = [movie, str(rnd.randint(1970, 2025)), rnd.choice(EDITIONS), rnd.choice(RESOLUTIONS),
+                     rnd.choice(MOVIE_SOURCES), rnd.choice(AUDIO), rnd.choice(CODECS)]
+        else:
+            show = rnd.choice(SHOWS).replace(' ', '.')
+            parts = [show, f"{rnd.randint(2015, 2025)}.{rnd.randint(1, 12):02d}.{rnd.randint(1, 28):02d}",
+                     rnd.choice(RESOLUTIONS), rnd.choice(TV_SOURCES)]
+        titles.append('.'.join(p for p in parts if p) + '-' + rnd.choice(GROUPS))
+    return titles
+
+
+def legacy_detect_content_type(torrent_name):
+    """The per-pattern implementation classify() replaced, kept here for comparison."""
+    name_lower = torrent_name.lower()
+    tv_indicators = [
+        r's\d+e\d+', r'season\s*\d+', r'\d+x\d+', r'episode\s*\d+', r'ep\s*\d+', r'e\d{2,}',
+        r'complete\s*season', r'full\s*season', r'season\s*pack', r'tv\s*series',
+        r'\b\d{4}\.\d{2}\.\d{2}\b', r'\b(hdtv|web-dl|webrip).*\d+p\b',
+    ]
+    movie_indicators = [
+        r'\b(19|20)\d{2}\b', r'bluray', r'bdrip', r'dvdrip', r'cam\b', r'ts\b', r'r5\b',
+        r'director.*cut', r'extended.*cut', r'unrated', r'remastered', r'criterion',
+    ]
+    tv_score = sum(1 for pattern in tv_indicators if re.search(pattern, name_lower))
+    movie_score = sum(1 for pattern in movie_indicators if re.search(pattern, name_lower))
+    if tv_score > movie_score:
+        return "TV"
+    elif movie_score > tv_score:
+        return "Movies"
+    elif re.search(r'\b(s\d+|season|episode|ep\d+)\b', name_lower):
+        return "TV"
+    elif re.search(r'\b(19|20)\d{2}\b', name_lower):
+        return "Movies"
+    return "Uncategorized"
+
+
+def timed(fn, titles, repeats):
+    fn(titles[0])  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for title in titles:
+            fn(title)
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    titles = synthetic_titles(count)
+    total = count * repeats
+
+    legacy = timed(legacy_detect_content_type, titles, repeats)
+    single = timed(classify.__wrapped__, titles, repeats)  # uncached: one full scan per title
+    print(f"legacy re.search per indicator: {total / legacy:,.0f} titles/s")
+    print(f"single-pass classify:           {total / single:,.0f} titles/s ({legacy / single:.1f}x)")
+
+    differ = [t for t in titles if legacy_detect_content_type(t) != classify(t).content_type]
+    print(f"verdicts differing from legacy: {len(differ)} of {count}")
+    for title in differ[:10]:
+        print(f"  {title}: {legacy_detect_content_type(title)} -> {classify(title).content_type}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,10 @@ import json
 import os
 from pathlib import Path
 
+# epg.timezone values the old setup wizards and template wrote into every config. Listings
+# were always converted in Central time back then, so these never reflected a user's choice.
+LEGACY_EPG_TIMEZONES = ('America/New_York', 'America/Chicago')
+
 class ConfigManager:
     def __init__(self, config_path=None):
         if config_path is None:
@@ -35,7 +39,15 @@ class ConfigManager:
         try:
             with open(self.config_path, 'r') as f:
                 config = json.load(f)
-            return self._validate_and_fix_config(config)
+            migrated = self._migrate_config(config)
+            config = self._validate_and_fix_config(config)
+            if migrated:
+                self.config = config
+                try:
+                    self.save_config()
+                except OSError as e:
+                    print(f"Could not save migrated config: {e}")
+            return config
         except (json.JSONDecodeError, FileNotFoundError) as e:
             print(f"Error loading config: {e}")
             return self._create_default_config()
@@ -62,6 +74,17 @@ class ConfigManager:
         
         return default_config
     
+    def _migrate_config(self, config):
+        """One-time fixes for values older versions wrote. Returns True if the config changed."""
+        epg = config.get('epg')
+        if not isinstance(epg, dict) or epg.get('timezone_migrated'):
+            return False
+        if epg.get('timezone') in LEGACY_EPG_TIMEZONES:
+            print(f"Config: clearing legacy epg.timezone '{epg['timezone']}', the zone now comes from the zip code")
+            epg['timezone'] = ''
+        epg['timezone_migrated'] = True
+        return True
+    
     def _validate_and_fix_config(self, config):
         """Validate and fix configuration with defaults"""
         defaults = self._create_default_config()
@@ -132,6 +155,40 @@ class ConfigManager:
     def get_hdhr_ip(self):
         """Get HDHomeRun IP address"""
         return self.get('hdhr', 'ip_address', '192.168.1.100')
+
+    def get_hdhr_tuner_count(self):
+        """Get HDHomeRun tuner count (0 = read it from the device's discover.json)"""
+        return self.get('hdhr', 'tuner_count', 0)
+
+    def get_recording_config(self):
+        """Get capture settings ('transcode', 'fragmented' or 'hls' encode live, 'copy' saves the raw stream)"""
+        return {
+            'capture_mode': self.get('recording', 'capture_mode', 'transcode'),
+            'segment_sec': self.get('recording', 'segment_sec', 6),
+            'segment_type': self.get('recording', 'segment_type', 'mpegts'),
+            'hls_finalize': self.get('recording', 'hls_finalize', False),
+            'conflict_policy': self.get('recording', 'conflict_policy', 'reject'),
+            'planner_horizon_days': self.get('recording', 'planner_horizon_days', 14),
+            'pre_padding_sec': self.get('recording', 'pre_padding_sec', 0),
+            'post_padding_sec': self.get('recording', 'post_padding_sec', 0),
+            'warmup_sec': self.get('recording', 'warmup_sec', 10),
+            'warmup_timeout_sec': self.get('recording', 'warmup_timeout_sec', 15),
+            'preallocate_mbps': self.get('recording', 'preallocate_mbps', 20),
+            'chunk_mb': self.get('recording', 'chunk_mb', 4),
+            'fsync_sec': self.get('recording', 'fsync_sec', 10)
+        }
+
+    def get_postprocess_config(self):
+        """Get settings for the post-processing job queue"""
+        return {
+            'workers': self.get('postprocess', 'workers', 1),
+            'nice': self.get('postprocess', 'nice', 10),
+            'offpeak_start': self.get('postprocess', 'offpeak_start', ''),
+            'offpeak_end': self.get('postprocess', 'offpeak_end', ''),
+            'delete_source': self.get('postprocess', 'delete_source', True),
+            'thumbnails': self.get('postprocess', 'thumbnails', True),
+            'loudnorm': self.get('postprocess', 'loudnorm', False)
+        }
     
     def is_prowlarr_enabled(self):
         """Check if Prowlarr integration is enabled"""
@@ -152,6 +209,10 @@ class ConfigManager:
             'enabled': indexer_config.get('enabled', False),
             'provider': indexer_config.get('provider', 'prowlarr'),
             'timeout': indexer_config.get('timeout', 30),
+            'cache_ttl_sec': indexer_config.get('cache_ttl_sec', 600),
+            'cache_size': indexer_config.get('cache_size', 256),
+            'season_search_workers': indexer_config.get('season_search_workers', 6),
+            'season_search_deadline_sec': indexer_config.get('season_search_deadline_sec', 60),
             'providers': indexer_config.get('providers', {
                 'prowlarr': {
                     'api_url': 'http://127.0.0.1:9696',
@@ -198,9 +259,12 @@ class ConfigManager:
         return {
             'zip_code': self.get('epg', 'zip_code', '78748'),
             'headend_id': self.get('epg', 'headend_id', ''),
-            'timezone': self.get('epg', 'timezone', 'America/Chicago'),
+            'timezone': self.get('epg', 'timezone', ''),
             'auto_refresh': self.get('epg', 'auto_refresh', False),
-            'refresh_hours': self.get('epg', 'refresh_hours', [6, 14, 22])
+            'refresh_hours': self.get('epg', 'refresh_hours', [6, 14, 22]),
+            'fetch_workers': self.get('epg', 'fetch_workers', 6),
+            'fetch_retries': self.get('epg', 'fetch_retries', 3),
+            'delta_refetch_hours': self.get('epg', 'delta_refetch_hours', 24)
         }
     
     def get_vpn_config(self):
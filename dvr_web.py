@@ -32,222 +32,146 @@ def run_threaded(func, *args, **kwargs):
     t.start()
     return t
 
-# Utility: save the schedule to disk
-def save_schedule():
+def _publish_schedule(changed):
+    # Render the list once here and push it, so open pages patch it in place
+    payload = {'changed': changed}
+    if event_bus.subscriber_count():
+        payload['html'] = _render_scheduled_list()
+    event_bus.publish('schedule', payload)
+
+# Utility: persist jobs that were just added to or edited in scheduled_jobs
+def save_jobs(jobs):
+    """Write only these rows and recompute only their start times."""
     try:
-        print(f"DEBUG: Saving {len(scheduled_jobs)} recordings to {SCHEDULE_FILE}")
-        # Ensure we only persist serializable dict-based jobs. If any legacy tuple
-        # entries (job_obj, description) exist, convert them to a dict form.
-        serializable = []
-        for entry in scheduled_jobs:
-            if isinstance(entry, tuple) and len(entry) == 2:
-                # Legacy format: (schedule_job_object, description_string)
-                serializable.append({
-                    'id': len(serializable) + 1,
-                    'type': 'legacy_scheduled',
-                    'description': entry[1],
-                    'created_at': datetime.now().isoformat()
-                })
-            elif isinstance(entry, dict):
-                # Ensure it has an id
-                if 'id' not in entry:
-                    entry = {**entry, 'id': len(serializable) + 1}
-                serializable.append(entry)
-            else:
-                # Unknown type, skip with warning
-                print(f"WARN: Skipping non-serializable scheduled entry: {type(entry)}")
-        with open(SCHEDULE_FILE, "w") as f:
-            json.dump(serializable, f, indent=2)
-        print(f"DEBUG: Save successful!")
+        changed = 0
+        for job in jobs:
+            changed += schedule_store.upsert_job(job)
+            recording_scheduler.schedule(job)
+        if changed:
+            _publish_schedule(changed)
+    except Exception as e:
+        print(f"Error saving schedule: {e}")
+
+# Utility: forget jobs that were just removed from scheduled_jobs
+def delete_jobs(jobs):
+    try:
+        for job in jobs:
+            schedule_store.delete_job(job['id'])
+            recording_scheduler.cancel(job['id'])
+        if jobs:
+            _publish_schedule(len(jobs))
     except Exception as e:
         print(f"Error saving schedule: {e}")
 
+# Utility: allocate a job id that is unique even after cancellations
+def next_job_id():
+    ids = [j.get('id') for j in scheduled_jobs if isinstance(j, dict) and isinstance(j.get('id'), int)]
+    return max(ids, default=0) + 1
+
 # Utility: load the schedule from disk
 def load_schedule():
     global scheduled_jobs
     try:
-        if os.path.exists(SCHEDULE_FILE):
-            with open(SCHEDULE_FILE, "r") as f:
-                scheduled_jobs = json.load(f)
-                print(f"Loaded {len(scheduled_jobs)} scheduled recordings")
-        else:
-            scheduled_jobs = []
+        # One-time migration from the legacy JSON file (duplicate ids are renumbered)
+        schedule_store.import_json(SCHEDULE_FILE)
+        scheduled_jobs = schedule_store.load_jobs()
+        print(f"Loaded {len(scheduled_jobs)} scheduled recordings")
     except Exception as e:
         print(f"Error loading schedule: {e}")
         scheduled_jobs = []
+    recording_scheduler.sync(scheduled_jobs)
+
+
+def _job_padding(job):
+    """(pre, post) padding in seconds: the job's own values, else the recording defaults."""
+    recording_config = config.get_recording_config()
+    pads = []
+    for key in ('pre_padding_sec', 'post_padding_sec'):
+        try:
+            pads.append(max(0, int(job.get(key) if job.get(key) is not None else recording_config[key])))
+        except (TypeError, ValueError):
+            pads.append(0)
+    return tuple(pads)
+
+def _scheduler_lead(job):
+    """Seconds before its start a job is woken: pre-roll padding plus the tuner warm-up."""
+    warmup_sec = config.get_recording_config()['warmup_sec']
+    if warmup_sec:
+        channel = job.get('channel_number') or job.get('channel')
+        warmup_sec = recording_manager.warmup_stats.lead_sec(channel, warmup_sec)
+    return _job_padding(job)[0] + warmup_sec
+
+def _fire_scheduled_job(job, fire_dt):
+    """Scheduler callback: start the recording for a rule occurrence or one-off episode.
+
+    fire_dt is the programme start; the scheduler calls this early (see _scheduler_lead)
+    so the tuner is warm and capture can begin on a keyframe at start minus pre-padding.
+    """
+    ch_num = job.get('channel_number') or job.get('channel')
+    dur_min = int(job.get('duration') or 30)
+    pre_pad, post_pad = _job_padding(job)
+    crf = int(job.get('crf') or 23)
+    preset = job.get('preset') or 'fast'
+    fmt = job.get('format') or 'mp4'
+    if job.get('type') == 'recurring_series':
+        print(f"[Scheduler] Starting '{job.get('title')}' on {ch_num} for {dur_min} min (rule #{job.get('id')})")
+    else:
+        print(f"[Scheduler] Starting one-off '{job.get('title')}' on {ch_num} for {dur_min} min at {job.get('date')} {job.get('time')}")
+    capture_start = fire_dt - timedelta(seconds=pre_pad)
+    lateness = (datetime.now() - capture_start).total_seconds()
+    if lateness > 1:
+        print(f"[Scheduler] Job #{job.get('id')} started {lateness:.1f}s after its scheduled time")
+    # Never earlier than the programme start, so the next occurrence is not picked up again
+    started_at_iso = max(datetime.now(), fire_dt).isoformat()
+    run_threaded(record_channel, ch_num, dur_min, crf, preset, fmt, started_at=started_at_iso, job_id=job.get('id'),
+                 pre_pad_sec=pre_pad, post_pad_sec=post_pad, capture_start=capture_start.timestamp())
+    job['last_started_at'] = started_at_iso
+    if job.get('type') != 'recurring_series':
+        job['status'] = 'recording'
+    save_jobs([job])
+
+def _on_postprocess_done(pp_job):
+    """Record a finished post-processing step on the scheduled job that produced the recording."""
+    if pp_job.recording_job_id is None:
+        return
+    for job in scheduled_jobs:
+        if str(job.get('id')) == str(pp_job.recording_job_id):
+            job.setdefault('postprocess', {})[pp_job.kind] = {
+                'status': pp_job.status, 'cpu_seconds': round(pp_job.cpu_seconds, 1), 'error': pp_job.error}
+            if pp_job.status == 'completed' and pp_job.kind in ('transcode', 'concat'):
+                job['output_file'] = os.path.basename(pp_job.dest)
+            elif pp_job.status == 'completed' and pp_job.kind == 'thumbnail':
+                job['thumbnail'] = os.path.basename(pp_job.dest)
+            save_jobs([job])
+            break
+    event_bus.publish('postprocess', pp_job.to_dict())
+
+def _on_recording_event(action, session):
+    """RecordingManager listener: push the start/end of a capture and a fresh progress view."""
+    event_bus.publish('recording', {'action': action, **session.to_dict()})
+    event_bus.publish('progress', _progress_payload())
+
 def run_schedule_loop():
     import time
-    print("Schedule loop started (stub)")
+    # Recording starts are driven by recording_scheduler (a heap of absolute start
+    # times); this loop only does periodic housekeeping such as EPG refreshes.
+    recording_scheduler.start(scheduled_jobs)
     refresh_counter = 0
     while True:
-        # TODO: implement actual scheduling logic (trigger ffmpeg at times)
         try:
-            # Allow jobs created via /schedule endpoint using `schedule` library to run
+            # Allow jobs created via the `schedule` library to run
             try:
                 import schedule as _sched
                 _sched.run_pending()
             except Exception:
                 pass
 
-            # Trigger recurring_series rules (time-based) when their day/time matches
-            now_dt = datetime.now()
-            now_hhmm = now_dt.strftime('%H:%M')
-            now_day = now_dt.strftime('%A')  # e.g., 'Monday'
-            
-            # Only check jobs that could potentially match today
-            active_jobs = [job for job in scheduled_jobs 
-                          if job.get('type') == 'recurring_series' and job.get('status') == 'active']
-            
-            # Filter jobs to only those scheduled for today
-            todays_jobs = []
-            for job in active_jobs:
-                rec = job.get('recurrence') or {}
-                days = rec.get('days') or []
-                if days:
-                    # Map current day to both formats for matching
-                    day_mapping = {
-                        'Monday': ['Mon', 'Monday'], 'Tuesday': ['Tue', 'Tuesday'], 'Wednesday': ['Wed', 'Wednesday'],
-                        'Thursday': ['Thu', 'Thursday'], 'Friday': ['Fri', 'Friday'], 'Saturday': ['Sat', 'Saturday'], 
-                        'Sunday': ['Sun', 'Sunday']
-                    }
-                    valid_day_names = day_mapping.get(now_day, [now_day])
-                    if any(day_name in days for day_name in valid_day_names):
-                        todays_jobs.append(job)
-                else:
-                    # No specific days set, include all days
-                    todays_jobs.append(job)
-            
-            # Only process jobs within 5 minutes of their scheduled time to reduce noise
-            for job in todays_jobs:
-                job_time = job.get('time') or job.get('recurrence', {}).get('time')
-                
-                # Convert job_time to 24-hour format if needed for comparison
-                normalized_job_time = job_time
-                if job_time and ('AM' in job_time or 'PM' in job_time):
-                    try:
-                        # Convert 12-hour format to 24-hour format
-                        parsed_time = datetime.strptime(job_time, '%I:%M %p')
-                        normalized_job_time = parsed_time.strftime('%H:%M')
-                    except:
-                        pass  # Keep original format if parsing fails
-                elif job_time and ':' in job_time:
-                    # Handle times without AM/PM (e.g., "12:23")
-                    try:
-                        # If it's already in 24-hour format (00:00-23:59), keep as-is
-                        hour, minute = map(int, job_time.split(':'))
-                        if 0 <= hour <= 23 and 0 <= minute <= 59:
-                            # For times starting with 12 without AM/PM, check context
-                            if hour == 12:
-                                # Check if this is likely midnight (00:xx) based on other jobs or context
-                                # For now, times like "12:xx" without AM/PM in early morning hours
-                                # are assumed to be midnight (00:xx) if current time is also early morning
-                                if now_dt.hour < 6:  # Between midnight and 6 AM
-                                    normalized_job_time = f"00:{minute:02d}"
-                                else:
-                                    normalized_job_time = f"{hour:02d}:{minute:02d}"
-                            else:
-                                normalized_job_time = f"{hour:02d}:{minute:02d}"
-                    except:
-                        pass  # Keep original format if parsing fails
-                
-                # Only check jobs within 5 minutes of scheduled time to reduce log noise
-                if not normalized_job_time:
-                    continue
-                    
-                try:
-                    job_hour, job_minute = map(int, normalized_job_time.split(':'))
-                    job_minutes_total = job_hour * 60 + job_minute
-                    current_minutes_total = now_dt.hour * 60 + now_dt.minute
-                    time_diff = abs(job_minutes_total - current_minutes_total)
-                    
-                    # Handle wrap-around (e.g., 23:59 vs 00:01)
-                    if time_diff > 720:  # 12 hours
-                        time_diff = 1440 - time_diff  # 24 hours - diff
-                    
-                    # Only log and process jobs within 5 minutes of their scheduled time
-                    if time_diff > 5:
-                        continue
-                        
-                except Exception:
-                    # If time parsing fails, continue with full check for safety
-                    pass
-                
-                # Debug: Log scheduler evaluation (only for jobs being actively checked)
-                print(f"[Scheduler] Checking job '{job.get('title')}' - Channel: {job.get('channel_number')}, Time: {job.get('time')}, Days: {job.get('recurrence', {}).get('days', [])}")
-                
-                # Debug time conversion
-                if job_time != normalized_job_time:
-                    print(f"[Scheduler DEBUG] Time conversion: '{job_time}' → '{normalized_job_time}' (current: {now_hhmm})")
-                if not normalized_job_time or normalized_job_time != now_hhmm:
-                    # Debug logging for missed schedules
-                    if normalized_job_time and abs((datetime.strptime(normalized_job_time, '%H:%M').time().hour * 60 + datetime.strptime(normalized_job_time, '%H:%M').time().minute) - (now_dt.hour * 60 + now_dt.minute)) <= 2:
-                        print(f"[Scheduler DEBUG] Job '{job.get('title')}' time {normalized_job_time} vs current {now_hhmm} - missed by {abs((datetime.strptime(normalized_job_time, '%H:%M').time().hour * 60 + datetime.strptime(normalized_job_time, '%H:%M').time().minute) - (now_dt.hour * 60 + now_dt.minute))} minutes")
-                    continue
-                # Prevent duplicate triggers within the same minute
-                last = job.get('last_started_at')
-                if last:
-                    try:
-                        from datetime import datetime as _dt
-                        last_dt = _dt.fromisoformat(last)
-                        if (now_dt - last_dt).total_seconds() < 55:
-                            continue
-                    except Exception:
-                        pass
-                # Start recording
-                try:
-                    ch_num = job.get('channel_number')
-                    dur_min = int(job.get('duration') or 30)
-                    crf = int(job.get('crf') or 23)
-                    preset = job.get('preset') or 'fast'
-                    fmt = job.get('format') or 'mp4'
-                    print(f"[Scheduler] Starting '{job.get('title')}' on {ch_num} for {dur_min} min (rule #{job.get('id')})")
-                    started_at_iso = now_dt.isoformat()
-                    run_threaded(record_channel, ch_num, dur_min, crf, preset, fmt, started_at=started_at_iso)
-                    job['last_started_at'] = started_at_iso
-                    save_schedule()
-                except Exception as _e:
-                    print(f"[Scheduler] Failed to start recording for rule #{job.get('id')}: {_e}")
-
-            # Trigger one-off scheduled episode recordings (those created by NLP/EPG with specific date+time)
-            # Criteria: has 'status' == 'scheduled', has explicit 'date' (YYYY-MM-DD) and 'time' (HH:MM), and not already started
-            try:
-                from datetime import datetime as _dt
-                for job in list(scheduled_jobs):
-                    if job.get('status') != 'scheduled':
-                        continue
-                    # Skip rules and other types that don't represent a one-off episode
-                    if job.get('type') in ('recurring_series', 'one_time_timeslot'):
-                        continue
-                    date_str = job.get('date')
-                    time_str = job.get('time')
-                    ch_num = job.get('channel_number') or job.get('channel')
-                    if not (date_str and time_str and ch_num):
-                        continue
-                    try:
-                        dt_obj = _dt.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                    except Exception:
-                        continue
-                    # Start within the minute it matches, and avoid retriggering
-                    if abs((now_dt - dt_obj).total_seconds()) <= 59:
-                        if job.get('last_started_at'):
-                            continue
-                        dur_min = int(job.get('duration') or 30)
-                        crf = int(job.get('crf') or 23)
-                        preset = job.get('preset') or 'fast'
-                        fmt = job.get('format') or 'mp4'
-                        print(f"[Scheduler] Starting one-off '{job.get('title')}' on {ch_num} for {dur_min} min at {date_str} {time_str}")
-                        started_at_iso = now_dt.isoformat()
-                        run_threaded(record_channel, ch_num, dur_min, crf, preset, fmt, started_at=started_at_iso)
-                        job['last_started_at'] = started_at_iso
-                        job['status'] = 'recording'
-                        save_schedule()
-            except Exception as _e2:
-                print(f"[Scheduler] Error while checking one-off episodes: {_e2}")
-
-            # Show scheduler heartbeat every 10 minutes instead of constant job checking
+            # Show scheduler heartbeat every 10 minutes
             if refresh_counter % 10 == 0:
                 active_count = len([j for j in scheduled_jobs if j.get('type') == 'recurring_series' and j.get('status') == 'active'])
-                print(f"[Scheduler Heartbeat] {active_count} active recording rules")
+                upcoming = recording_scheduler.upcoming(1)
+                next_info = f"; next start {upcoming[0][0].strftime('%Y-%m-%d %H:%M')} '{upcoming[0][1].get('title')}'" if upcoming else ""
+                print(f"[Scheduler Heartbeat] {active_count} active recording rules{next_info}")
 
             time.sleep(60)
         except Exception:
@@ -261,14 +185,12 @@ def run_schedule_loop():
                 if refresh_counter % 30 == 0:
                     try:
                         print("[EPG Auto-Refresh] Starting twice-weekly EPG cache refresh...")
-                        # Force refresh of the main EPG cache
-                        global EPG_CACHE
-                        EPG_CACHE["data"] = None  # Clear cache to force fresh fetch
-                        EPG_CACHE["timestamp"] = 0
-                        
-                        # Get fresh EPG data (this will fetch and cache automatically)
-                        epg = get_epg()
-                        if not epg:
+                        # Rebuild in the refresh worker; the old cache stays live until the swap.
+                        # This loop is already off the request path, so it can wait for the result.
+                        epg_refresher.trigger('scheduled auto-refresh', force=True, incremental=True)
+                        epg_refresher.wait()
+                        epg = EPG_CACHE["data"]
+                        if not epg or epg_refresher.last_error:
                             print("[EPG Auto-Refresh] Failed to fetch fresh EPG data")
                             continue
                         
@@ -276,23 +198,15 @@ def run_schedule_loop():
                         
                         # Also update job sample episodes for existing recurring rules
                         upcoming_map = {}
-                        now = datetime.now()
-                        for entry in epg:
+                        for entry in epg_store.between(datetime.now()):
                             ch_num = entry.get('channel_number')
                             time_str = entry.get('time')
-                            date_str = entry.get('date')
-                            if not (ch_num and time_str and date_str):
-                                continue
-                            try:
-                                dt_obj = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                                if dt_obj < now:
-                                    continue
-                            except Exception:
+                            if not (ch_num and time_str):
                                 continue
                             key = (ch_num, time_str)
                             upcoming_map.setdefault(key, []).append(entry)
                         
-                        updated = 0
+                        updated = []
                         for job in scheduled_jobs:
                             if job.get('type') == 'recurring_series' and job.get('is_time_based'):
                                 key = (job.get('channel_number'), job.get('time'))
@@ -300,10 +214,10 @@ def run_schedule_loop():
                                 if new_samples:
                                     job['sample_episodes'] = new_samples[:10]
                                     job['next_episode'] = new_samples[0]
-                                    updated += 1
+                                    updated.append(job)
                         if updated:
-                            print(f"[EPG Auto-Refresh] Updated {updated} recurring series with fresh episode data")
-                            save_schedule()
+                            print(f"[EPG Auto-Refresh] Updated {len(updated)} recurring series with fresh episode data")
+                            save_jobs(updated)
                     except Exception:
                         # Ignore transient errors during periodic EPG sampling
                         pass
@@ -336,8 +250,8 @@ def check_indexer_availability():
         return False
         
     try:
-        from indexer_manager import IndexerManager
-        indexer = IndexerManager()
+        from indexer_manager import get_indexer_manager
+        indexer = get_indexer_manager()
         return indexer.is_available()
     except Exception as e:
         print(f"Indexer availability check failed: {e}")
@@ -363,9 +277,9 @@ def unified_torrent_search(query: str, content_type: str = "tv", sort: str = Non
         return ("disabled", [])
     
     try:
-        from indexer_manager import IndexerManager
+        from indexer_manager import get_indexer_manager
         
-        indexer = IndexerManager()
+        indexer = get_indexer_manager()
         provider = indexer.provider
         
         print(f"📡 Using {provider} indexer for search")
@@ -394,7 +308,6 @@ def unified_torrent_search(query: str, content_type: str = "tv", sort: str = Non
         print(f"❌ Indexer search failed: {e}")
         return ("error", [])
 import threading
-import subprocess
 import time
 import json
 import requests
@@ -402,18 +315,52 @@ import socket
 import struct
 import re
 from datetime import datetime, timedelta
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, Response, stream_with_context
 from epg_zap2it import fetch_zap2it_epg
+from recording_manager import RecordingManager, TunerBusyError
+from recording_scheduler import RecordingScheduler
+from postprocess_queue import PostProcessQueue
+from schedule_store import ScheduleStore
+from epg_store import EPGStore
+from epg_search import EPGSearchIndex
+from epg_refresh import EPGRefreshWorker
+import epg_cache_file
+import hls_capture
+from event_bus import EventBus
+from tuner_planner import TunerPlanner, TunerConflictError
+from stream_warmup import StreamWarmup
+import http_client
+import release_classifier
 # --- Global config variables ---
 HDHR_IP = config.get_hdhr_ip()
 SAVE_DIR = str(config.get_recording_dir())
 FFMPEG_PATH = config.get_ffmpeg_path()
-SCHEDULE_FILE = os.path.join(SAVE_DIR, "scheduled_jobs.json")
+SCHEDULE_FILE = os.path.join(SAVE_DIR, "scheduled_jobs.json")  # legacy, imported once
+SCHEDULE_DB = os.path.join(SAVE_DIR, "scheduled_jobs.db")
 
 os.makedirs(SAVE_DIR, exist_ok=True)
 scheduled_jobs = []
-current_process = None
-stop_event = threading.Event()
+schedule_store = ScheduleStore(SCHEDULE_DB)
+# One session per tuner; replaces the old single current_process/stop_event pair
+recording_manager = RecordingManager(HDHR_IP, tuner_count=config.get_hdhr_tuner_count(),
+                                     listener=_on_recording_event,
+                                     writer_options={key: config.get_recording_config()[key]
+                                                     for key in ('preallocate_mbps', 'chunk_mb', 'fsync_sec')})
+# Pushes recording, schedule and EPG changes to open browsers over /events (SSE)
+event_bus = EventBus()
+# Checks new jobs against the tuner count before they are added to the schedule
+tuner_planner = TunerPlanner(recording_manager.get_tuner_count,
+                             horizon_days=config.get_recording_config()['planner_horizon_days'],
+                             padding_fn=_job_padding)
+# Jobs are woken early by their pre-roll padding plus tuner warm-up
+recording_scheduler = RecordingScheduler(on_fire=_fire_scheduled_job, lead_fn=_scheduler_lead)
+# Post-capture work (transcode, loudness, thumbnails) runs here, off the recording threads
+POSTPROCESS_CONFIG = config.get_postprocess_config()
+postprocessor = PostProcessQueue(FFMPEG_PATH if os.path.exists(FFMPEG_PATH) else "ffmpeg",
+                                 workers=POSTPROCESS_CONFIG['workers'], nice_level=POSTPROCESS_CONFIG['nice'],
+                                 offpeak_start=POSTPROCESS_CONFIG['offpeak_start'],
+                                 offpeak_end=POSTPROCESS_CONFIG['offpeak_end'],
+                                 store=schedule_store, on_done=_on_postprocess_done)
 
 app = Flask(__name__)
 from epg_zap2it import fetch_zap2it_epg
@@ -422,19 +369,58 @@ import time
 # EPG caching with disk persistence
 EPG_CACHE = {"data": None, "timestamp": 0}
 EPG_TTL = 60 * 60 * 24 * 3.5  # 3.5 days - twice weekly refresh
-EPG_CACHE_FILE = os.path.join(SAVE_DIR, "epg_cache.json")
+EPG_CACHE_FILE = os.path.join(SAVE_DIR, "epg_cache.json")  # legacy format; now import/export only
+EPG_CACHE_BIN = os.path.join(SAVE_DIR, "epg_cache.bin")    # descriptions in epg_cache.desc
+# Time/channel index over EPG_CACHE["data"]; rebuilt whenever the data is replaced
+epg_store = EPGStore()
+# Full-text index over the same programs; updated incrementally on first search after each load
+epg_search_index = EPGSearchIndex()
+_search_index_pending = None
+_search_index_lock = threading.Lock()
+
+def _set_epg_data(data, timestamp):
+    """Replace the cached EPG and rebuild its indexes in one step."""
+    global epg_store, _search_index_pending
+    store = EPGStore(data or [])
+    EPG_CACHE["data"] = data
+    EPG_CACHE["timestamp"] = timestamp
+    epg_store = store
+    # Tokenizing reads every description, so it waits until someone actually searches
+    _search_index_pending = store
+
+def search_epg_index(query, days):
+    """Ranked (score, entry) matches airing within `days` days, indexing the latest EPG first if needed."""
+    global _search_index_pending
+    with _search_index_lock:
+        store = _search_index_pending
+        if store is not None:
+            added, removed = epg_search_index.update(store.programs + store.undated)
+            if added or removed:
+                print(f"EPG: search index updated (+{added} / -{removed} programs)")
+            _search_index_pending = None
+    return epg_search_index.search(query, predicate=_epg_window_filter(days))
+
+def get_epg_store():
+    """Indexed view of the current EPG (fetching it first if needed)."""
+    get_epg()
+    return epg_store
 
 def load_epg_cache():
-    """Load EPG cache from disk if available"""
+    """Load EPG cache from disk if available (binary cache, else a legacy epg_cache.json)"""
     try:
-        if os.path.exists(EPG_CACHE_FILE):
+        if os.path.exists(EPG_CACHE_BIN):
+            data, timestamp = epg_cache_file.load(EPG_CACHE_BIN)
+            _set_epg_data(data, timestamp)
+        elif os.path.exists(EPG_CACHE_FILE):
             with open(EPG_CACHE_FILE, 'r', encoding='utf-8') as f:
                 cache_data = json.load(f)
-                EPG_CACHE["data"] = cache_data.get("data")
-                EPG_CACHE["timestamp"] = cache_data.get("timestamp", 0)
-                cache_age = time.time() - EPG_CACHE["timestamp"]
-                print(f"EPG: loaded from disk (age: {cache_age/60:.1f} minutes)")
-                return True
+            _set_epg_data(cache_data.get("data"), cache_data.get("timestamp", 0))
+            save_epg_cache()  # convert once; the JSON file is left in place
+        else:
+            return False
+        cache_age = time.time() - EPG_CACHE["timestamp"]
+        print(f"EPG: loaded from disk (age: {cache_age/60:.1f} minutes)")
+        return True
     except Exception as e:
         print(f"EPG: failed to load cache from disk: {e}")
     return False
@@ -442,18 +428,40 @@ def load_epg_cache():
 def save_epg_cache():
     """Save EPG cache to disk"""
     try:
-        cache_data = {
-            "data": EPG_CACHE["data"],
-            "timestamp": EPG_CACHE["timestamp"]
-        }
-        with open(EPG_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, ensure_ascii=False, indent=2)
-        print(f"EPG: saved cache to disk ({len(EPG_CACHE['data']) if EPG_CACHE['data'] else 0} programs)")
+        index_bytes, desc_bytes = epg_cache_file.save(EPG_CACHE_BIN, EPG_CACHE["data"], EPG_CACHE["timestamp"])
+        print(f"EPG: saved cache to disk ({len(EPG_CACHE['data']) if EPG_CACHE['data'] else 0} programs, "
+              f"{index_bytes/1024:.0f} KB index + {desc_bytes/1024:.0f} KB descriptions)")
     except Exception as e:
         print(f"EPG: failed to save cache to disk: {e}")
 
+def _fetch_epg_for_refresh(days=None, incremental=False):
+    """Crawl Gracenote for the refresh worker (runs in its thread).
+
+    Incremental refreshes start from the current cache and only download missing
+    windows plus the next day; with no cache they fall back to a full crawl.
+    """
+    if incremental and EPG_CACHE["data"]:
+        from epg_zap2it import fetch_gracenote_delta
+        return fetch_gracenote_delta(EPG_CACHE["data"], days=days or 7)
+    if days:
+        from epg_zap2it import fetch_gracenote_epg
+        return fetch_gracenote_epg(days=days)
+    return fetch_zap2it_epg()
+
+def _install_refreshed_epg(data):
+    """Swap a freshly crawled EPG in and persist it."""
+    _set_epg_data(data, time.time())
+    save_epg_cache()
+    event_bus.publish('epg', {'programs': len(data), 'timestamp': EPG_CACHE["timestamp"]})
+
+epg_refresher = EPGRefreshWorker(_fetch_epg_for_refresh, _install_refreshed_epg)
+
 def get_epg():
-    """Return cached EPG; fetch if cache empty or expired."""
+    """Return cached EPG immediately; refresh in the background if empty or expired.
+
+    Never waits for a crawl: with no cache at all this returns None until the
+    first background refresh finishes.
+    """
     now = time.time()
     
     # Load from disk if memory cache is empty
@@ -462,90 +470,43 @@ def get_epg():
     
     cache_age = now - EPG_CACHE["timestamp"]
     
-    # Check if we need to fetch: cache empty or expired
-    if EPG_CACHE["data"] is None or cache_age > EPG_TTL:
-        try:
-            if EPG_CACHE["data"] is None:
-                print("EPG: fetching fresh data (no cache available)")
-            else:
-                print(f"EPG: fetching fresh data (cache expired after {cache_age/60:.1f} minutes)")
-            
-            EPG_CACHE["data"] = fetch_zap2it_epg()
-            EPG_CACHE["timestamp"] = now
-            
-            # Save to disk
-            save_epg_cache()
-            
-            print(f"EPG: fetched and cached {len(EPG_CACHE['data']) if EPG_CACHE['data'] else 0} programs")
-        except Exception as e:
-            print(f"EPG fetch failed: {e}")
-            # Return stale data if available, otherwise None
-            return EPG_CACHE["data"]
-    else:
-        print(f"EPG: using cached data (age: {cache_age/60:.1f} minutes)")
+    # Stale-while-revalidate: serve what we have, rebuild off the request path
+    if EPG_CACHE["data"] is None:
+        epg_refresher.trigger('no cache available')
+    elif cache_age > EPG_TTL:
+        epg_refresher.trigger(f'cache expired after {cache_age/60:.1f} minutes', incremental=True)
     
     return EPG_CACHE["data"]
 
+def _epg_window_filter(days):
+    """Predicate for programs airing from now through `days` days ahead.
+
+    Programs without a parseable start are kept unless their date has passed.
+    """
+    now = datetime.now()
+    now_ts, cutoff_ts = now.timestamp(), (now + timedelta(days=days)).timestamp()
+    today = now.strftime('%Y-%m-%d')
+    def in_window(entry):
+        ts = entry.get('start_ts')
+        if ts is None:
+            return not entry.get('date') or entry.get('date') >= today
+        return now_ts <= ts <= cutoff_ts
+    return in_window
+
 def search_cached_epg(query, days=7):
     """Search through cached EPG data instead of fetching fresh data"""
     print(f"Searching cached EPG for: '{query}'")
     
     # Use cached EPG data
-    epg_data = get_epg()
-    if not epg_data:
+    store = get_epg_store()
+    if not len(store):
         print("No cached EPG data available")
         return []
     
-    # Search through cached EPG data for matches
-    matching_episodes = []
-    query_lower = query.lower()
-    query_words = [word.strip() for word in query_lower.split()]
-    
-    now = datetime.now()
-    cutoff = now + timedelta(days=days)
-    
-    for entry in epg_data:
-        try:
-            # Check if the show matches our query
-            title = (entry.get('title', '') or '').lower()
-            description = (entry.get('description', '') or '').lower()
-            episode_title = (entry.get('episode_title', '') or '').lower()
-            
-            # Match against title, description, episode title, or genre
-            matches = (
-                any(word in title for word in query_words) or
-                any(word in description for word in query_words) or
-                any(word in episode_title for word in query_words) or
-                query_lower in title or 
-                query_lower in description or
-                query_lower in episode_title or
-                any(query_lower in (entry.get('genre', '') or '').lower().split())
-            )
-            
-            if matches:
-                # Parse the air time to filter future shows only
-                date_str = entry.get('date', '')
-                time_str = entry.get('time', '')
-                
-                if date_str and time_str:
-                    try:
-                        # Handle both 12-hour and 24-hour formats
-                        if 'AM' in time_str or 'PM' in time_str:
-                            air_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %I:%M %p")
-                        else:
-                            air_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                            
-                        if now <= air_datetime <= cutoff:
-                            matching_episodes.append(entry)
-                    except Exception as e:
-                        # If date parsing fails, include it anyway for future dates
-                        if date_str >= now.strftime('%Y-%m-%d'):
-                            matching_episodes.append(entry)
-                else:
-                    matching_episodes.append(entry)
-                    
-        except Exception as e:
-            continue  # Skip problematic entries
+    # Best matches first (every query word must appear in title, episode title,
+    # description or genre); only programs airing within the next `days` days
+    results = search_epg_index(query, days)
+    matching_episodes = [entry for _, entry in results]
     
     print(f"Found {len(matching_episodes)} cached matches for '{query}'")
     return matching_episodes
@@ -555,7 +516,7 @@ t = time
 # NOTE: The following block was duplicated earlier in the file which caused the
 # schedule to be loaded and then immediately overwritten by resetting
 # scheduled_jobs = []. We keep the first initialization near the top of the file
-# (where SCHEDULE_FILE, scheduled_jobs, current_process, stop_event, and app are
+# (where SCHEDULE_DB, scheduled_jobs, recording_manager, and app are
 # already defined) and remove the duplicate to preserve persisted recordings.
 # If you need to re-init for tests, do it explicitly rather than on import.
 
@@ -564,7 +525,7 @@ t = time
 def get_hdhr_channels(ip):
     url = f"http://{ip}/lineup.json"
     try:
-        r = requests.get(url, timeout=5)
+        r = http_client.device_get(url, timeout=5)
         r.raise_for_status()
         lineup = r.json()
         channels_dict = {}
@@ -581,59 +542,144 @@ def get_hdhr_channels(ip):
 channels = get_hdhr_channels(HDHR_IP)
 days_list = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
 
-def record_channel(channel_key, duration_min, crf=23, preset="fast", record_format="mp4", started_at=None):
-    global current_process, stop_event
+def mp4_movflags(capture_mode):
+    """Fragmented MP4 writes an index with every keyframe fragment, so the file plays while
+    recording, stays playable if ffmpeg dies, and needs no faststart rewrite at the end."""
+    if capture_mode == 'fragmented':
+        return "+frag_keyframe+empty_moov+default_base_moof"
+    return "+faststart"
+
+def record_channel(channel_key, duration_min, crf=23, preset="fast", record_format="mp4", started_at=None, job_id=None,
+                   pre_pad_sec=0, post_pad_sec=0, capture_start=None):
     chname = channels[channel_key]
     # Use a filesystem-friendly timestamp for the output filename and keep an ISO timestamp for job tracking
     started_at = started_at or datetime.now().isoformat()
     now = datetime.fromisoformat(started_at).strftime("%Y-%m-%d_%H-%M")
-    ext = ".mp4" if record_format=="mp4" else ".ts"
+    # Copy mode saves the tuner's MPEG-TS untouched; MP4 conversion is queued for later
+    recording_config = config.get_recording_config()
+    capture_mode = recording_config['capture_mode']
+    copy_capture = capture_mode == 'copy'
+    # HLS mode writes a folder of segments plus a growing playlist instead of one file
+    segmented = capture_mode == 'hls'
+    ext = ".mp4" if record_format=="mp4" and not copy_capture else ".ts"
     filename = f"{chname}_{now}{ext}"
     filepath = os.path.join(SAVE_DIR, filename)
+    if segmented:
+        filepath = hls_capture.segment_dir(SAVE_DIR, f"{chname}_{now}")
+        os.makedirs(filepath, exist_ok=True)
     url = f"http://{HDHR_IP}:5004/auto/v{channel_key}"
-
-    stop_event.clear()
+    capture_sec = duration_min * 60 + pre_pad_sec + post_pad_sec
+    # Open the tuner ourselves so capture starts on a keyframe instead of on the first (partial) packets
+    warmup = None
+    if recording_config['warmup_sec']:
+        warmup = StreamWarmup(url, keyframe_timeout=recording_config['warmup_timeout_sec'])
 
     # Determine ffmpeg binary: prefer configured path, fallback to system ffmpeg
     ffmpeg_bin = FFMPEG_PATH if os.path.exists(FFMPEG_PATH) else "ffmpeg"
 
-    if record_format == "mp4":
+    if record_format == "ts" and not segmented:
+        # The tuner already serves MPEG-TS: write it straight to disk, no ffmpeg process
+        cmd = None
+        warmup = warmup or StreamWarmup(url, keyframe_timeout=recording_config['warmup_timeout_sec'])
+    elif copy_capture:
+        cmd = [
+            ffmpeg_bin, "-i", url, "-t", str(capture_sec),
+            "-map", "0", "-ignore_unknown", "-c", "copy", "-f", "mpegts", "-y", filepath
+        ]
+    elif segmented:
         cmd = [
-            ffmpeg_bin, "-i", url, "-t", str(duration_min*60),
+            ffmpeg_bin, "-i", url, "-t", str(capture_sec),
             "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
-            "-c:a", "aac", "-b:a", "160k", "-movflags", "+faststart", "-y", filepath
+            "-c:a", "aac", "-b:a", "160k",
+            *hls_capture.output_args(filepath, recording_config['segment_sec'], recording_config['segment_type'])
+        ]
+    elif record_format == "mp4":
+        cmd = [
+            ffmpeg_bin, "-i", url, "-t", str(capture_sec),
+            "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+            "-c:a", "aac", "-b:a", "160k", "-movflags", mp4_movflags(capture_mode), "-y", filepath
         ]
     else:
         cmd = [
-            ffmpeg_bin, "-i", url, "-t", str(duration_min*60),
+            ffmpeg_bin, "-i", url, "-t", str(capture_sec),
             "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
             "-c:a", "ac3", "-b:a", "192k", "-y", filepath
         ]
 
-    global current_process
-    current_process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-
-    def stream_output(proc):
-        for line in iter(proc.stdout.readline, b''):
-            if not line:
-                break
-            print(line.decode(errors='ignore').strip())
-    threading.Thread(target=stream_output, args=(current_process,), daemon=True).start()
+    # Sessions are keyed by job id so overlapping shows each keep their own handle
+    session_id = f"job-{job_id}" if job_id is not None else f"manual-{channel_key}-{now}"
+    try:
+        session = recording_manager.record(session_id, channel_key, filepath, cmd, capture_sec, job_id=job_id,
+                                           warmup=warmup, capture_start=capture_start)
+    except TunerBusyError as e:
+        print(f"[Recorder] Cannot record {chname} ({channel_key}): {e}")
+        _finalize_recording_job(job_id, channel_key, started_at, status='failed', error=str(e))
+        return None
 
-    while current_process.poll() is None:
-        if stop_event.is_set():
-            try:
-                current_process.stdin.write(b'q\n')
-                current_process.stdin.flush()
-            except:
-                pass
-            break
-        t.sleep(1)
+    if session.status == 'failed':
+        print(f"[Recorder] Recording {session_id} failed: {session.error}")
+    _finalize_recording_job(job_id, channel_key, started_at,
+                            status='failed' if session.status == 'failed' else 'completed',
+                            output_file=os.path.basename(filepath), exit_code=session.returncode,
+                            error=session.error)
+    if segmented and session.status != 'failed':
+        # Joining the segments is a stream copy, so finalising costs one sequential read/write
+        first = 'concat' if recording_config['hls_finalize'] else None
+        _queue_postprocess(hls_capture.playlist_path(filepath), job_id, first=first, in_place_ok=bool(first))
+    elif session.status != 'failed' and os.path.exists(filepath):
+        _queue_postprocess(filepath, job_id, first='transcode' if copy_capture and record_format == "mp4" else None,
+                           crf=crf, preset=preset)
+    return session
+
+def _queue_postprocess(filepath, job_id, first=None, in_place_ok=True, **options):
+    """Queue the configured post-capture steps for a finished recording, chained in order.
+
+    first is a job that produces the final file (transcode, concat); in_place_ok=False
+    skips steps that rewrite the source, which a bare HLS playlist cannot take.
+    """
+    steps = []
+    if POSTPROCESS_CONFIG['loudnorm'] and in_place_ok:
+        steps.append('loudnorm')
+    if POSTPROCESS_CONFIG['thumbnails']:
+        steps.append('thumbnail')
+    if first:
+        postprocessor.enqueue(first, filepath, recording_job_id=job_id, then=steps,
+                              delete_source=POSTPROCESS_CONFIG['delete_source'], **options)
+    elif steps:
+        postprocessor.enqueue(steps[0], filepath, recording_job_id=job_id, then=steps[1:])
+
+def _finalize_recording_job(job_id, channel_key, started_at, status='completed', output_file=None, exit_code=None, error=None):
+    """Mark the scheduled job that triggered a recording as completed or failed."""
+    def add_history(job):
+        try:
+            schedule_store.add_history(
+                job.get('id') if job else job_id,
+                (job or {}).get('title') or channels.get(channel_key, channel_key),
+                channel_key, started_at, datetime.now().isoformat(), status,
+                exit_code=exit_code, output_file=output_file, error=error)
+        except Exception as _e:
+            print(f"WARN: Could not record history for channel {channel_key}: {_e}")
+
+    def apply(job):
+        add_history(job)
+        # Recurring rules stay active; only their one-off episodes change status
+        if job.get('type') != 'recurring_series':
+            job['status'] = status
+        job['completed_at'] = datetime.now().isoformat()
+        if output_file:
+            job['output_file'] = output_file
+        if exit_code is not None:
+            job['exit_code'] = exit_code
+        if error:
+            job['error'] = error
+        save_jobs([job])
 
-    current_process.wait()
-    current_process = None
-    # Attempt to mark matching scheduled job as completed
     try:
+        if job_id is not None:
+            for job in scheduled_jobs:
+                if str(job.get('id')) == str(job_id):
+                    apply(job)
+                    return
         for job in reversed(scheduled_jobs):  # search latest first
             if job.get('status') == 'recording' and str(job.get('channel_number')) == str(channel_key):
                 # Match by start time within a 2-minute window
@@ -643,13 +689,11 @@ def record_channel(channel_key, duration_min, crf=23, preset="fast", record_form
                         jdt = datetime.fromisoformat(js)
                         sdt = datetime.fromisoformat(started_at)
                         if abs((jdt - sdt).total_seconds()) <= 120:
-                            job['status'] = 'completed'
-                            job['completed_at'] = datetime.now().isoformat()
-                            job['output_file'] = os.path.basename(filepath)
-                            save_schedule()
-                            break
+                            apply(job)
+                            return
                 except Exception:
                     pass
+        add_history(None)  # manual recording with no scheduled job
     except Exception as _e:
         print(f"WARN: Could not finalize job for channel {channel_key}: {_e}")
 
@@ -913,62 +957,20 @@ def agent_browse_simple(parsed):
     print(f"Browsing EPG for shows matching: '{query}'")
     
     # Use cached EPG data instead of fetching fresh data
-    epg_data = get_epg()
-    if not epg_data:
+    store = get_epg_store()
+    if not len(store):
         return {"error": "No EPG data available. Try refreshing EPG data."}
     
-    # Search through cached EPG data for matches
-    matching_episodes = []
-    query_lower = query.lower()
-    
-    now = datetime.now()
-    cutoff = now + timedelta(days=7)  # Look ahead 7 days
-    
-    for entry in epg_data:
-        try:
-            # Check if the show matches our query
-            title = (entry.get('title', '') or '').lower()
-            description = (entry.get('description', '') or '').lower()
-            
-            # Match against title, description, or genre
-            if (query_lower in title or 
-                query_lower in description or 
-                any(query_lower in (entry.get('genre', '') or '').lower().split())):
-                
-                # Parse the air time to filter future shows only
-                date_str = entry.get('date', '')
-                time_str = entry.get('time', '')
-                
-                if date_str and time_str:
-                    try:
-                        air_datetime = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %I:%M %p")
-                        if now <= air_datetime <= cutoff:
-                            matching_episodes.append(entry)
-                    except:
-                        # If date parsing fails, include it anyway
-                        matching_episodes.append(entry)
-                else:
-                    matching_episodes.append(entry)
-                    
-        except Exception as e:
-            continue  # Skip problematic entries
+    # Look ahead 7 days; best matches first, earliest airing first among equals
+    results = search_epg_index(query, 7)
+    matching_episodes = [entry for _, entry in results]
     
     if not matching_episodes:
-        return {"error": f"No upcoming shows found matching '{query}' in the next 7 days"}
+        return {"error": f"No upcoming shows found matching every word of '{query}' in the next 7 days"}
     
     print(f"Found {len(matching_episodes)} matching episodes")
     
-    # Sort by date and time
-    def sort_key(show):
-        try:
-            date_str = show.get('date', '9999-12-31')
-            time_str = show.get('time', '11:59 PM')
-            return datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %I:%M %p")
-        except:
-            return datetime.max
-    
-    matching_episodes.sort(key=sort_key)
-    
+    # Already ranked by relevance, then air time
     # Limit to reasonable number of results (first 15)
     matching_episodes = matching_episodes[:15]
     
@@ -1141,7 +1143,10 @@ def agent_record(parsed):
         chosen = candidates[idx]
         if parsed.get('record_option'):
             # Single episode schedule
-            rec_id = schedule_episode_recording(chosen)
+            try:
+                rec_id = schedule_episode_recording(chosen)
+            except TunerConflictError as e:
+                return e.to_dict()
             if rec_id:
                 return {"status": "record_scheduled", "message": f"Scheduled '{chosen.get('title')}' {chosen.get('date')} {chosen.get('time')} (option {idx+1})", "recording_id": rec_id}
             return {"error": "Failed to schedule recording"}
@@ -1160,7 +1165,10 @@ def agent_record(parsed):
                     slot_eps.append(e)
             if not slot_eps:
                 slot_eps = [chosen]  # Fallback to just the selected episode
-            rule = create_recurring_recording_rule(LAST_RECORD_CANDIDATES.get('show_name',''), slot_eps, 'weekly', f"{target_channel}_{target_time}")
+            try:
+                rule = create_recurring_recording_rule(LAST_RECORD_CANDIDATES.get('show_name',''), slot_eps, 'weekly', f"{target_channel}_{target_time}")
+            except TunerConflictError as e:
+                return e.to_dict()
             if rule:
                 return {"status": "recurring_rule_created", "message": f"Created recurring rule from option {idx+1} ({chosen.get('channel')} @ {chosen.get('time')})", "details": rule}
             return {"error": "Failed to create recurring recording rule"}
@@ -1225,81 +1233,73 @@ def agent_record(parsed):
             except Exception:
                 target_time_obj = None
         # Pull fresh/full EPG (cached helper)
-        epg_data = get_epg()
-        if not epg_data:
+        store = get_epg_store()
+        if not len(store):
             return None
         now = datetime.now()
         candidates = []
         exclusion_keywords = ['postgame','pregame','game night','gamenight','show','special','replay','encore','scoreboard','countdown']
-        for ch in epg_data:
-            ch_num = ch.get('channel_number') or ch.get('channel')
-            ch_name = ch.get('channel_name') or ch.get('call_sign') or ''
-            for prog in ch.get('programs', []):
-                title = (prog.get('title') or '').strip()
-                tl = title.lower()
-                desc_l = (prog.get('description') or '').lower()
-                ep_title_l = (prog.get('episode_title') or '').lower()
-                team_in_title = any(tt in tl for tt in team_tokens)
-                # Accept generic 'NFL Football' if team appears in description or episode_title
-                if not team_in_title:
-                    if not ('nfl football' in tl and any(tt in (desc_l + ' ' + ep_title_l) for tt in team_tokens)):
-                        continue
-                # Matchup indicator can appear in title OR metadata
-                combined_meta = ' '.join([tl, desc_l, ep_title_l])
-                if not any(x in combined_meta for x in [' vs ',' at ',' vs. ']):
-                    # Allow if still a long NFL Football with team in metadata (network may omit matchup early)
-                    if 'nfl football' not in tl:
-                        continue
-                if any(bad in tl for bad in exclusion_keywords):
+        for prog in store.between(now):
+            ch_num = prog.get('channel_number')
+            ch_name = prog.get('channel') or prog.get('call_sign') or ''
+            title = (prog.get('title') or '').strip()
+            tl = title.lower()
+            desc_l = (prog.get('description') or '').lower()
+            ep_title_l = (prog.get('episode_title') or '').lower()
+            team_in_title = any(tt in tl for tt in team_tokens)
+            # Accept generic 'NFL Football' if team appears in description or episode_title
+            if not team_in_title:
+                if not ('nfl football' in tl and any(tt in (desc_l + ' ' + ep_title_l) for tt in team_tokens)):
                     continue
-                # Duration filter: need at least 90 minutes (games are usually >=150)
-                try:
-                    dur = int(prog.get('duration') or 0)
-                except Exception:
-                    dur = 0
-                if dur < 90:
-                    continue
-                date_str = prog.get('date') or prog.get('airDate')
-                time_str = prog.get('time') or prog.get('airTime')
-                if not (date_str and time_str):
+            # Matchup indicator can appear in title OR metadata
+            combined_meta = ' '.join([tl, desc_l, ep_title_l])
+            if not any(x in combined_meta for x in [' vs ',' at ',' vs. ']):
+                # Allow if still a long NFL Football with team in metadata (network may omit matchup early)
+                if 'nfl football' not in tl:
                     continue
+            if any(bad in tl for bad in exclusion_keywords):
+                continue
+            # Duration filter: need at least 90 minutes (games are usually >=150)
+            try:
+                dur = int(prog.get('duration') or 0)
+            except Exception:
+                dur = 0
+            if dur < 90:
+                continue
+            date_str = prog.get('date') or prog.get('airDate')
+            time_str = prog.get('time') or prog.get('airTime')
+            start_dt = EPGStore.start_of(prog)
+            if requested_weekdays and start_dt.weekday() not in requested_weekdays:
+                continue
+            # If user supplied a target time, require start within +/- 120 minutes.
+            if target_time_obj:
                 try:
-                    start_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
+                    delta_minutes = abs((start_dt.hour*60 + start_dt.minute) - (target_time_obj.hour*60 + target_time_obj.minute))
+                    if delta_minutes > 120:
+                        continue
                 except Exception:
-                    continue
-                if start_dt < now:
-                    continue
-                if requested_weekdays and start_dt.weekday() not in requested_weekdays:
-                    continue
-                # If user supplied a target time, require start within +/- 120 minutes.
-                if target_time_obj:
-                    try:
-                        delta_minutes = abs((start_dt.hour*60 + start_dt.minute) - (target_time_obj.hour*60 + target_time_obj.minute))
-                        if delta_minutes > 120:
-                            continue
-                    except Exception:
-                        pass
-                # Score ranking: prefer durations >=150, prime evening start times, exact team token at start
-                score = 0
-                if dur >= 150: score += 30
-                if any(k in tl for k in [' at ', ' vs ', ' vs. ']): score += 20
-                if any(tt in tl.split(':')[0].split(' vs ')[0] for tt in team_tokens): score += 5
-                # Evening weight (6pm-9:30pm local)
-                if 18 <= start_dt.hour <= 21:
-                    score += 10
-                # Slight boost for network channels (heuristic: channel number ends with .1)
-                if ch_num and str(ch_num).endswith('.1'): score += 2
-                candidates.append({
-                    'program': prog,
-                    'channel_number': ch_num,
-                    'channel': ch_name,
-                    'score': score,
-                    'date': date_str,
-                    'time': time_str,
-                    'start_dt': start_dt,
-                    'duration': str(dur),
-                    'title': title
-                })
+                    pass
+            # Score ranking: prefer durations >=150, prime evening start times, exact team token at start
+            score = 0
+            if dur >= 150: score += 30
+            if any(k in tl for k in [' at ', ' vs ', ' vs. ']): score += 20
+            if any(tt in tl.split(':')[0].split(' vs ')[0] for tt in team_tokens): score += 5
+            # Evening weight (6pm-9:30pm local)
+            if 18 <= start_dt.hour <= 21:
+                score += 10
+            # Slight boost for network channels (heuristic: channel number ends with .1)
+            if ch_num and str(ch_num).endswith('.1'): score += 2
+            candidates.append({
+                'program': prog,
+                'channel_number': ch_num,
+                'channel': ch_name,
+                'score': score,
+                'date': date_str,
+                'time': time_str,
+                'start_dt': start_dt,
+                'duration': str(dur),
+                'title': title
+            })
         if not candidates:
             return None
         # Sort by score then earliest start; always present as record_candidates
@@ -1342,7 +1342,7 @@ def agent_record(parsed):
     matching_episodes = search_cached_epg(show_name, days=7)
     
     if not matching_episodes:
-        return {"error": f"No episodes found for '{show_name}' in the next 7 days"}
+        return {"error": f"No episodes found matching every word of '{show_name}' in the next 7 days"}
     
     # Analyze the pattern to determine recording strategy
     pattern, relevant_episodes = analyze_show_pattern(matching_episodes)
@@ -1439,25 +1439,35 @@ def handle_dynamic_series_recording(show_name, episodes, pattern, parsed_context
     
     total_rules_created = 0
     recording_details = []
+    rejected = []
     
     for series_key, group_episodes in series_groups.items():
         print(f"  Series group: {series_key} ({len(group_episodes)} episodes)")
         
         # Create a single recurring recording rule for this series group
-        recording_rule = create_recurring_recording_rule(show_name, group_episodes, pattern, series_key, parsed_context=parsed_context)
+        try:
+            recording_rule = create_recurring_recording_rule(show_name, group_episodes, pattern, series_key, parsed_context=parsed_context)
+        except TunerConflictError as e:
+            print(f"  Not creating rule for {series_key}: {e}")
+            rejected.append({'series_key': series_key, **e.to_dict()})
+            continue
         if recording_rule:
             total_rules_created += 1
             recording_details.append(recording_rule)
     
-    # Save all the recording rules to disk
-    save_schedule()
+    # Each rule was saved to disk as it was created
     
-    return {
+    result = {
         "message": f"Series recording scheduled for '{show_name}'",
         "pattern": pattern,
         "recording_rules": total_rules_created,
         "recording_details": recording_details
     }
+    if rejected:
+        result["tuner_conflicts"] = rejected
+        if not total_rules_created:
+            result["error"] = rejected[0]["error"]
+    return result
 
 def is_duplicate_recurring_rule(show_name, series_key, channel_number, time):
     """Check if a recurring recording rule already exists for this show/series"""
@@ -1497,7 +1507,7 @@ def create_recurring_recording_rule(show_name, episodes, pattern, series_key, pa
     except Exception:
         local_offset_minutes = 0
     recording_rule = {
-        'id': len(scheduled_jobs) + 1,
+        'id': next_job_id(),
         'type': 'recurring_series',
         'title': template_episode.get('title', show_name),
         'channel': template_episode.get('channel', 'Unknown Channel'),
@@ -1521,9 +1531,10 @@ def create_recurring_recording_rule(show_name, episodes, pattern, series_key, pa
             if k in parsed_context:
                 recording_rule[k] = parsed_context[k]
     
+    _admit_new_jobs([recording_rule])
     # Add to scheduled jobs
     scheduled_jobs.append(recording_rule)
-    save_schedule()  # Save the recording rule to disk
+    save_jobs([recording_rule])  # Save the recording rule to disk
     
     print(f"  Created time-based recurring rule: {recording_rule['title']} - {recurrence_info['description']}")
     print(f"  Will record ongoing at {template_episode.get('time', '')} on {', '.join(recurrence_info.get('days', []))} (not limited to current EPG episodes)")
@@ -1590,7 +1601,10 @@ def handle_single_episode_recording(show_name, episode):
         return {"error": f"'{show_name}' is already scheduled for recording"}
     
     # Schedule the recording
-    recording_id = schedule_episode_recording(episode)
+    try:
+        recording_id = schedule_episode_recording(episode)
+    except TunerConflictError as e:
+        return e.to_dict()
     
     if recording_id:
         return {
@@ -1627,7 +1641,7 @@ def schedule_episode_recording(episode):
         
         # Create recording entry
         recording_info = {
-            'id': len(scheduled_jobs) + 1,
+            'id': next_job_id(),
             'title': episode.get('title', 'Unknown Show'),
             'channel': episode.get('channel', 'Unknown Channel'),
             'channel_number': episode.get('channel_number', ''),
@@ -1654,9 +1668,10 @@ def schedule_episode_recording(episode):
             'status': 'scheduled'
         }
         
+        _admit_new_jobs([recording_info])
         # Add to scheduled jobs
         scheduled_jobs.append(recording_info)
-        save_schedule()  # Save the scheduled recording to disk
+        save_jobs([recording_info])  # Save the scheduled recording to disk
         
         # Save metadata
         metadata_file = save_metadata_file(recording_info, suggested_filename)
@@ -1667,6 +1682,8 @@ def schedule_episode_recording(episode):
         
         return recording_info['id']
         
+    except TunerConflictError:
+        raise
     except Exception as e:
         print(f"Error scheduling recording: {e}")
         import traceback
@@ -1677,6 +1694,7 @@ def handle_series_recording(parsed):
     """Handle recording multiple episodes of a show"""
     epg_matches = parsed.get('epg_matches', [])
     recording_ids = []
+    added = []
     filenames = []
     duplicates_skipped = 0
     
@@ -1685,7 +1703,7 @@ def handle_series_recording(parsed):
     for i, epg_match in enumerate(epg_matches):
         # Create a comprehensive recording entry with all metadata
         recording_info = {
-            'id': len(scheduled_jobs) + 1,  # Simple ID generation
+            'id': next_job_id(),  # Simple ID generation
             'title': epg_match.get('title', parsed.get('event', 'Unknown Show')),
             'channel': epg_match.get('channel', parsed.get('channel', 'Unknown Channel')),
             'channel_number': epg_match.get('channel_number', ''),
@@ -1722,6 +1740,7 @@ def handle_series_recording(parsed):
         
         # Add to scheduled jobs
         scheduled_jobs.append(recording_info)
+        added.append(recording_info)
         recording_ids.append(recording_info['id'])
         filenames.append(suggested_filename)
         
@@ -1738,7 +1757,7 @@ def handle_series_recording(parsed):
         print(log_msg)
     
     # Save to disk
-    save_schedule()
+    save_jobs(added)
     
     series_name = parsed.get('event', 'Unknown Show')
     scheduled_count = len(recording_ids)
@@ -1764,7 +1783,7 @@ def handle_single_recording(parsed):
     
     # Create a comprehensive recording entry with all metadata
     recording_info = {
-        'id': len(scheduled_jobs) + 1,  # Simple ID generation
+        'id': next_job_id(),  # Simple ID generation
         'title': epg_match.get('title', parsed.get('event', 'Unknown Show')),
         'channel': epg_match.get('channel', parsed.get('channel', 'Unknown Channel')),
         'channel_number': epg_match.get('channel_number', ''),
@@ -1801,7 +1820,7 @@ def handle_single_recording(parsed):
     scheduled_jobs.append(recording_info)
     
     # Save to disk
-    save_schedule()
+    save_jobs([recording_info])
     
     # Save metadata file for this recording
     save_metadata_file(recording_info, suggested_filename)
@@ -1821,6 +1840,28 @@ def handle_single_recording(parsed):
     
     return {"status": "scheduled", "details": parsed, "recording_id": recording_info['id'], "filename": suggested_filename}
 
+def _admit_new_jobs(new_jobs):
+    """Tuner admission control for jobs about to be added to the schedule.
+
+    Under the 'reject' conflict policy raises TunerConflictError, with other
+    airings from the EPG that would fit; under 'flag' the jobs are marked and
+    the conflicts returned.
+    """
+    existing = [j for j in scheduled_jobs if isinstance(j, dict)]
+    conflicts = tuner_planner.conflicts_with(existing, new_jobs)
+    if not conflicts:
+        return []
+    upcoming = get_epg_store().upcoming(tuner_planner.horizon_days)
+    alternatives = []
+    for job in new_jobs:
+        alternatives.extend(tuner_planner.alternatives(job, existing, upcoming))
+    if config.get_recording_config()['conflict_policy'] == 'reject':
+        raise TunerConflictError(conflicts, alternatives)
+    print(f"[Planner] Scheduling despite {len(conflicts)} tuner conflict(s): {TunerConflictError(conflicts)}")
+    for job in new_jobs:
+        job['tuner_conflict'] = True
+    return conflicts
+
 def is_duplicate_recording(new_recording):
     """Check if a recording is already scheduled"""
     for existing in scheduled_jobs:
@@ -1856,45 +1897,28 @@ def is_duplicate_recording(new_recording):
 def schedule_next_episode(show_name):
     """Find the next upcoming airing of a show from EPG and schedule only that single episode."""
     try:
-        epg = get_epg()
-        if not epg:
+        store = get_epg_store()
+        if not len(store):
             return {"error": "EPG unavailable"}
-        # Flatten all channel listings
-        upcoming = []
-        now = datetime.now()
-        for ch in epg:
-            for prog in ch.get('programs', []):
-                title = prog.get('title','').lower().strip()
-                if show_name.lower() in title:
-                    # Build datetime from date/time fields if available
-                    date_str = prog.get('date') or prog.get('airDate') or ''
-                    time_str = prog.get('time') or prog.get('airTime') or ''
-                    # Basic parse attempts
-                    dt_obj = None
-                    if date_str and time_str:
-                        try:
-                            dt_obj = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-                        except Exception:
-                            pass
-                    # Filter out past airings if we got datetime
-                    if dt_obj and dt_obj < now:
-                        continue
-                    # Store candidate
-                    upcoming.append({
-                        'raw': prog,
-                        'channel_number': ch.get('channel_number') or ch.get('channel') or prog.get('channel_number',''),
-                        'channel': ch.get('channel_name') or ch.get('call_sign') or prog.get('channel','Unknown Channel'),
-                        'date': prog.get('date', date_str),
-                        'time': prog.get('time', time_str),
-                        'dt': dt_obj or now,  # fallback now to allow sort
-                    })
-        if not upcoming:
+        # Future airings are already in start order, so the first title match is the next one;
+        # undated listings are only used when nothing dated matches
+        needle = show_name.lower()
+        next_ep = None
+        for prog in store.between(datetime.now()) + store.undated:
+            if needle in (prog.get('title') or '').lower().strip():
+                next_ep = {
+                    'raw': prog,
+                    'channel_number': prog.get('channel_number',''),
+                    'channel': prog.get('channel','Unknown Channel'),
+                    'date': prog.get('date') or prog.get('airDate') or '',
+                    'time': prog.get('time') or prog.get('airTime') or '',
+                }
+                break
+        if not next_ep:
             return {"error": f"No upcoming episode found for '{show_name}'"}
-        upcoming.sort(key=lambda x: x['dt'])
-        next_ep = upcoming[0]
         # Build recording_info structure similar to single episode scheduling
         recording_info = {
-            'id': len(scheduled_jobs) + 1,
+            'id': next_job_id(),
             'title': show_name.title(),
             'channel': next_ep['channel'],
             'channel_number': next_ep['channel_number'],
@@ -1911,25 +1935,29 @@ def schedule_next_episode(show_name):
         }
         if is_duplicate_recording(recording_info):
             return {"message": "Next episode already scheduled", "recording": recording_info}
+        _admit_new_jobs([recording_info])
         # Generate filename
         recording_info['filename'] = generate_filename(recording_info)
         scheduled_jobs.append(recording_info)
-        save_schedule()
+        save_jobs([recording_info])
         save_metadata_file(recording_info, recording_info['filename'])
         return {"message": "Scheduled next episode", "recording": recording_info}
+    except TunerConflictError as e:
+        return e.to_dict()
     except Exception as e:
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
 
-def search_torrents_for_series(series_name, season_number):
+def search_torrents_for_series(series_name, season_number, on_progress=None):
     """Search for all episodes in a TV series season using configured indexer.
 
     Strategy:
       1. Perform a broad season-level search: "<Series> Sxx" to gather a large pool.
       2. Parse episode identifiers SxxEyy from torrent titles. Keep the highest seeder count per episode.
-      3. If few / no episodes found, iterate each episode number (1..24) and run a targeted query
-         "<Series> SxxEyy" to try to fill gaps (stop early if we encounter a long miss streak).
+      3. At the same time run a targeted query "<Series> SxxEyy" for each episode number (1..24)
+         to fill gaps; queries made redundant by earlier results (or past a long miss streak)
+         are cancelled before they start. on_progress(episodes, done) sees partial results.
       4. Return a normalized list ready for UI consumption (similar shape to prior mock data):
          name (SxxEyy), title (human), size (human readable), seeders, magnet, selected default True.
 
@@ -1938,6 +1966,7 @@ def search_torrents_for_series(series_name, season_number):
     import re
     from math import log
     from datetime import datetime as _dt
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeout
 
     # Use unified search with configured indexer
 
@@ -1959,9 +1988,6 @@ def search_torrents_for_series(series_name, season_number):
         except Exception:
             return "?"
 
-    # Regex to extract SxxEyy (case-insensitive). Accept forms like S1E2, S01E02 etc.
-    ep_pattern = re.compile(rf"\b{season_tag}E(\d{{1,2}})\b", re.IGNORECASE)
-
     episodes_map = {}  # episode_number(int) -> chosen torrent dict
     attempted_queries = []
 
@@ -1970,18 +1996,11 @@ def search_torrents_for_series(series_name, season_number):
             title = (t.get("title") or "").strip()
             if not title:
                 continue
-            m = ep_pattern.search(title.replace(' ', '').upper())  # normalize spacing for patterns
-            if not m:
-                # Try a looser pattern removing punctuation (e.g., S01 E02)
-                loose = re.search(rf"{season_tag}[^A-Za-z0-9]?[Ee](\d{{1,2}})", title.replace(' ', ''), re.IGNORECASE)
-                if loose:
-                    m = loose
-            if not m:
-                continue
-            try:
-                ep_no = int(m.group(1))
-            except Exception:
+            # One classifier pass gives season, episode (S01E02, S01 E02, 1x02) and quality
+            info = release_classifier.classify(title)
+            if info.season != season_number or info.episode is None:
                 continue
+            ep_no = info.episode
             if ep_no < 1 or ep_no > 40:  # sanity bounds
                 continue
             seeders = int(t.get("seeders") or 0)
@@ -1994,25 +2013,19 @@ def search_torrents_for_series(series_name, season_number):
                     "size": human_size(t.get("size_bytes")),
                     "seeders": seeders,
                     "magnet": t.get("magnet"),
-                    "quality": derive_quality_hint(title),
+                    "quality": info.quality,
                     "selected": True,
                     "raw_title": title,
                     "source_tag": tag,
                 }
 
-    def derive_quality_hint(title):
-        tl = title.lower()
-        if '2160' in tl or '4k' in tl:
-            return '2160p'
-        if '1080' in tl:
-            return '1080p'
-        if '720' in tl:
-            return '720p'
-        if '480' in tl:
-            return '480p'
-        return 'unknown'
-
-    # 1. Broad season query (and a couple variants to loosen constraints)
+    # 1+2. Broad season variants, then per-episode backfill, through a bounded worker pool and
+    # merged here as they complete. Episode queries are queued once the first broad result is in,
+    # and only if broad results cover fewer than 10 episodes (skipping episodes already found).
+    # Queries that become pointless are cancelled before they start: episode queries at 10+
+    # episodes (or for that episode), remaining broad variants at 8+, and episodes past a run of
+    # 5 misses. An overall deadline bounds the whole lookup instead of 28 x the indexer timeout.
+    indexer_config = config.get_indexer_config()
     broad_variants = [
         base_query,
         f"{clean_series} {season_tag} 1080",  # prefer high quality
@@ -2020,45 +2033,78 @@ def search_torrents_for_series(series_name, season_number):
         f"{clean_series} season {season_number}",
     ]
     seen_variant = set()
+    executor = ThreadPoolExecutor(max_workers=indexer_config['season_search_workers'])
+    futures = {}
     for variant in broad_variants:
         v = variant.strip()
         if not v or v.lower() in seen_variant:
             continue
         seen_variant.add(v.lower())
-        try:
-            _, pool = unified_torrent_search(v, content_type="tv")
-            attempted_queries.append(v)
-            print(f"Season search variant '{v}' -> {len(pool)} torrents")
-            consider_pool(pool, f"broad:{v}")
-            # If we have a good number of episodes already (>=8) stop broad variants early
-            if len(episodes_map) >= 8:
-                break
-        except Exception as e:  # noqa: PERF203
-            print(f"Variant search error '{v}': {e}")
-            attempted_queries.append(f"error:{v}")
+        futures[executor.submit(unified_torrent_search, v, content_type="tv")] = ('broad', v, None)
 
-    # 2. Targeted per-episode backfill if we have big gaps (< 10 or missing low numbers)
-    if len(episodes_map) < 10:
-        miss_streak = 0
+    def queue_episode_queries():
+        queued = set()
+        if len(episodes_map) >= 10:
+            return queued
         for ep_no in range(1, 25):  # search up to 24 episodes
             if ep_no in episodes_map:
                 continue
             ep_query = f"{clean_series} {season_tag}E{ep_no:02d}"
-            try:
-                _, pool = unified_torrent_search(ep_query, content_type="tv")
-                attempted_queries.append(ep_query)
-                if not pool:
-                    miss_streak += 1
-                else:
-                    miss_streak = 0
-                consider_pool(pool, f"ep:{ep_query}")
-            except Exception as e:
-                print(f"Episode query error '{ep_query}': {e}")
-                attempted_queries.append(f"error:{ep_query}")
-                miss_streak += 1
-            # If we keep missing results, stop early to reduce noise/time
-            if miss_streak >= 5:
+            future = executor.submit(unified_torrent_search, ep_query, content_type="tv")
+            futures[future] = ('ep', ep_query, ep_no)
+            queued.add(future)
+        return queued
+
+    ep_results = {}  # episode number -> True if its query returned torrents
+    deadline = time.time() + indexer_config['season_search_deadline_sec']
+    pending = set(futures)
+    episodes_queued = False
+    try:
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                print(f"Season search deadline reached with {len(pending)} queries outstanding")
                 break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            before = len(episodes_map)
+            for future in done:
+                kind, query, ep_no = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    _, pool = future.result()
+                    attempted_queries.append(query)
+                except Exception as e:  # noqa: PERF203
+                    print(f"Season search error '{query}': {e}")
+                    attempted_queries.append(f"error:{query}")
+                    pool = []
+                if kind == 'broad':
+                    print(f"Season search variant '{query}' -> {len(pool)} torrents")
+                else:
+                    ep_results[ep_no] = bool(pool)
+                consider_pool(pool, f"{kind}:{query}")
+            if not episodes_queued:
+                episodes_queued = True  # first broad answer is in: backfill only what it missed
+                pending |= queue_episode_queries()
+
+            # Cancel queued queries that can no longer add anything
+            last_hit = max([0] + list(episodes_map) + [n for n, hit in ep_results.items() if hit])
+            streak_end = last_hit + 5
+            misses_past_last = all(ep_results.get(n) is False for n in range(last_hit + 1, streak_end + 1))
+            for future in list(pending):
+                kind, _, ep_no = futures[future]
+                if kind == 'broad':
+                    drop = len(episodes_map) >= 8
+                else:
+                    drop = (len(episodes_map) >= 10 or ep_no in episodes_map
+                            or (misses_past_last and ep_no > streak_end))
+                if drop and future.cancel():
+                    pending.discard(future)
+
+            if on_progress and len(episodes_map) != before:
+                on_progress([episodes_map[k] for k in sorted(episodes_map)], False)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
     # Build ordered episode list (gap episodes omitted)
     ordered_eps = [episodes_map[k] for k in sorted(episodes_map.keys())]
@@ -2077,22 +2123,34 @@ def search_torrents_for_series(series_name, season_number):
     ]
     packs = []
     seen_variant.clear()
+    # Same worker pool and deadline; terms are still checked in order of preference
+    pack_futures = []
+    executor = ThreadPoolExecutor(max_workers=indexer_config['season_search_workers'])
     for term in season_pack_terms:
         if term.lower() in seen_variant:
             continue
         seen_variant.add(term.lower())
-        try:
-            _, pool = unified_torrent_search(term, content_type="tv")
-        except Exception as e:
-            print(f"Season pack query error '{term}': {e}")
-            continue
-        for t in pool:
-            title = (t.get('title') or '').lower()
-            # Heuristics: must mention season number, and either 'complete' or season tag or 'sxx'
-            if (f"season {season_number}" in title or season_tag.lower() in title) and ("complete" in title or season_tag.lower() in title):
-                packs.append(t)
-        if packs:
-            break  # stop after first variant that yields packs
+        pack_futures.append((term, executor.submit(unified_torrent_search, term, content_type="tv")))
+    try:
+        for term, future in pack_futures:
+            try:
+                _, pool = future.result(timeout=max(0, deadline - time.time()))
+            except FuturesTimeout:
+                print("Season search deadline reached during season pack fallback")
+                break
+            except Exception as e:
+                print(f"Season pack query error '{term}': {e}")
+                continue
+            for t in pool:
+                # A pack names this season (S01, Season 1, Complete Season 1) but no episode
+                info = release_classifier.classify(t.get('title') or '')
+                if info.season == season_number and info.is_season_pack:
+                    packs.append(t)
+            if packs:
+                break  # stop after first variant that yields packs
+    finally:
+        # Less-preferred terms still queued are not sent once an answer (or the deadline) is in
+        executor.shutdown(wait=False, cancel_futures=True)
 
     if not packs:
         print("Season pack fallback also produced no results.")
@@ -2117,7 +2175,7 @@ def search_torrents_for_series(series_name, season_number):
             'size': human_size(p.get('size') or p.get('size_bytes')),  # upstream may use 'size'
             'seeders': seeds,
             'magnet': p.get('magnet'),
-            'quality': derive_quality_hint(p.get('title') or ''),
+            'quality': release_classifier.quality_hint(p.get('title') or ''),
             'selected': True,
             'season_pack': True,
             'raw_title': p.get('title'),
@@ -2168,8 +2226,12 @@ def agent_download(parsed):
         if not series:
             return {"error": "No series name provided"}
         
-        # Search for episodes
-        episodes = search_torrents_for_series(series, season)
+        # Search for episodes; partial results are pushed to the page that asked (request_id) over SSE
+        def publish_partial(found, done):
+            event_bus.publish('season_search', {"request_id": parsed.get('request_id'), "series": series,
+                                                "season": season, "episodes": found, "done": done})
+        episodes = search_torrents_for_series(series, season, on_progress=publish_partial)
+        publish_partial(episodes, True)
         
         if not episodes:
             return {"error": f"No torrents found for {series} Season {season}"}
@@ -2226,8 +2288,8 @@ def agent_download(parsed):
                     print(f"🔍 No direct magnet link found, trying to resolve download URL...")
                     # Try to resolve the download URL to get magnet link
                     try:
-                        from indexer_manager import IndexerManager
-                        indexer = IndexerManager()
+                        from indexer_manager import get_indexer_manager
+                        indexer = get_indexer_manager()
                         resolved_magnet = indexer.resolve_download_url(download_url)
                         if resolved_magnet and resolved_magnet.startswith('magnet:'):
                             magnet = resolved_magnet
@@ -2464,79 +2526,18 @@ def agent_download(parsed):
         }
 
 def detect_content_type(torrent_name):
-    """Analyze torrent name to determine if it's a TV show or movie"""
-    name_lower = torrent_name.lower()
-    
-    # TV Show indicators (strong signals)
-    tv_indicators = [
-        # Season/Episode patterns
-        r's\d+e\d+',           # S01E01, S1E1
-        r'season\s*\d+',       # Season 1, Season01
-        r'\d+x\d+',            # 1x01, 01x01
-        r'episode\s*\d+',      # Episode 1, Episode01
-        r'ep\s*\d+',           # Ep1, Ep01
-        r'e\d{2,}',            # E01, E001
-        
-        # Season pack patterns
-        r'complete\s*season',   # Complete Season
-        r'full\s*season',      # Full Season
-        r'season\s*pack',      # Season Pack
-        r'tv\s*series',        # TV Series
-        
-        # Episode naming patterns
-        r'\b\d{4}\.\d{2}\.\d{2}\b',  # 2024.01.15 (date format)
-        r'\b(hdtv|web-dl|webrip).*\d+p\b',  # TV release patterns
-    ]
-    
-    # Movie indicators
-    movie_indicators = [
-        # Year patterns (movies often have year)
-        r'\b(19|20)\d{2}\b',   # 1980-2099
-        r'bluray',             # BluRay releases
-        r'bdrip',              # BD-Rip
-        r'dvdrip',             # DVD-Rip
-        r'cam\b',              # CAM releases
-        r'ts\b',               # Telesync
-        r'r5\b',               # R5 releases
-        
-        # Movie-specific terms
-        r'director.*cut',      # Director's Cut
-        r'extended.*cut',      # Extended Cut
-        r'unrated',            # Unrated
-        r'remastered',         # Remastered
-        r'criterion',          # Criterion Collection
-    ]
-    
-    # Check for TV patterns
-    tv_score = 0
-    for pattern in tv_indicators:
-        if re.search(pattern, name_lower):
-            tv_score += 1
-    
-    # Check for movie patterns  
-    movie_score = 0
-    for pattern in movie_indicators:
-        if re.search(pattern, name_lower):
-            movie_score += 1
-    
-    # Decision logic
-    if tv_score > 0 and movie_score == 0:
-        return "TV"
-    elif movie_score > 0 and tv_score == 0:
-        return "Movies"
-    elif tv_score > movie_score:
-        return "TV"
-    elif movie_score > tv_score:
-        return "Movies"
-    else:
-        # Fallback: check common TV show naming patterns
-        if re.search(r'\b(s\d+|season|episode|ep\d+)\b', name_lower):
-            return "TV"
-        # Check for year (common in movie titles)
-        elif re.search(r'\b(19|20)\d{2}\b', name_lower):
-            return "Movies"
-        else:
-            return "Uncategorized"
+    """Analyze torrent name to determine if it's a TV show or movie ("TV", "Movies" or "Uncategorized")"""
+    return release_classifier.detect_content_type(torrent_name)
+
+def _qb_session(host, username, password):
+    """Shared qBittorrent session, logged in once and again only when the SID is rejected; None if login fails."""
+    def login(session):
+        r = session.post(f"{host}/api/v2/auth/login", data={"username": username, "password": password}, timeout=10)
+        return r.status_code == 200
+    session = http_client.session_for(host, login=login)
+    if 'SID' not in session.cookies and not login(session):
+        return None
+    return session
 
 def categorize_torrent_with_qb(torrent_hash, category):
     """Set category for a specific torrent using qBittorrent API"""
@@ -2545,11 +2546,9 @@ def categorize_torrent_with_qb(torrent_hash, category):
     QB_PASSWORD = ""
     
     try:
-        session = requests.Session()
-        login_data = {"username": QB_USERNAME, "password": QB_PASSWORD}
-        login_response = session.post(f"{QB_HOST}/api/v2/auth/login", data=login_data, timeout=10)
+        session = _qb_session(QB_HOST, QB_USERNAME, QB_PASSWORD)
         
-        if login_response.status_code != 200:
+        if session is None:
             return False
         
         # Set category
@@ -2569,11 +2568,9 @@ def auto_categorize_torrents():
     QB_PASSWORD = ""
     
     try:
-        session = requests.Session()
-        login_data = {"username": QB_USERNAME, "password": QB_PASSWORD}
-        login_response = session.post(f"{QB_HOST}/api/v2/auth/login", data=login_data, timeout=10)
+        session = _qb_session(QB_HOST, QB_USERNAME, QB_PASSWORD)
         
-        if login_response.status_code != 200:
+        if session is None:
             print("Failed to login to qBittorrent for auto-categorization")
             return 0
         
@@ -2732,10 +2729,8 @@ def add_magnet_with_vpn(magnet_url, torrent_info=None):
         QB_USERNAME = "admin"
         QB_PASSWORD = ""
         
-        session = requests.Session()
-        login_data = {"username": QB_USERNAME, "password": QB_PASSWORD}
-        login_response = session.post(f"{QB_HOST}/api/v2/auth/login", data=login_data, timeout=10)
-        if login_response.status_code != 200:
+        session = _qb_session(QB_HOST, QB_USERNAME, QB_PASSWORD)
+        if session is None:
             return {"error": "Failed to login to qBittorrent"}
         
         add_data = {"urls": magnet_url}
@@ -2755,11 +2750,9 @@ def add_torrent_to_qbittorrent(query, parsed):
     QB_PASSWORD = ""
     
     try:
-        session = requests.Session()
-        login_data = {"username": QB_USERNAME, "password": QB_PASSWORD}
-        login_response = session.post(f"{QB_HOST}/api/v2/auth/login", data=login_data, timeout=10)
+        session = _qb_session(QB_HOST, QB_USERNAME, QB_PASSWORD)
         
-        if login_response.status_code != 200:
+        if session is None:
             return {"error": "Failed to login to qBittorrent. Check if WebUI is enabled and credentials are correct."}
         
         add_data = {"urls": query}
@@ -2865,6 +2858,9 @@ def nlp_command():
         # If channel is provided explicitly, use it as fallback/override
         if "channel" in data and data["channel"]:
             parsed["channel"] = data["channel"]
+        # Lets the page match streamed partial results (season search) to this request
+        if data.get("request_id"):
+            parsed["request_id"] = data["request_id"]
         result = dispatch_agent(parsed)
         return jsonify({"parsed": parsed, "result": result})
     except Exception as e:
@@ -2901,8 +2897,8 @@ def debug_channel_schedule():
     weekday_param = request.args.get('weekday')
     time_param = request.args.get('time')  # expected HH:MM 24h
     horizon_days = int(request.args.get('horizon_days', '10'))
-    epg = get_epg()
-    if not epg:
+    store = get_epg_store()
+    if not len(store):
         return jsonify({'error': 'EPG unavailable'}), 503
     weekday_map = {'monday':0,'tuesday':1,'wednesday':2,'thursday':3,'friday':4,'saturday':5,'sunday':6}
     target_wd = None
@@ -2919,40 +2915,29 @@ def debug_channel_schedule():
     window_days = now + timedelta(days=horizon_days)
     entries = []
     raw = []
-    for ch in epg:
-        ch_num = ch.get('channel_number') or ch.get('channel')
-        if str(ch_num) != str(ch_param):
+    for prog in store.channel_between(ch_param, now, window_days):
+        date_str = prog.get('date') or prog.get('airDate')
+        time_str = prog.get('time') or prog.get('airTime')
+        start_dt = EPGStore.start_of(prog)
+        # Always collect raw channel entries for context
+        base_entry = {
+            'title': prog.get('title',''),
+            'episode_title': prog.get('episode_title',''),
+            'description': prog.get('description',''),
+            'date': date_str,
+            'time': time_str,
+            'duration': prog.get('duration',''),
+            'weekday': start_dt.strftime('%A'),
+            'call_sign': prog.get('call_sign') or prog.get('channel') or ''
+        }
+        raw.append(base_entry)
+        if target_wd is not None and start_dt.weekday() != target_wd:
             continue
-        for prog in ch.get('programs', []):
-            date_str = prog.get('date') or prog.get('airDate')
-            time_str = prog.get('time') or prog.get('airTime')
-            if not (date_str and time_str):
-                continue
-            try:
-                start_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            except Exception:
-                continue
-            if start_dt < now or start_dt > window_days:
-                continue
-            # Always collect raw channel entries for context
-            base_entry = {
-                'title': prog.get('title',''),
-                'episode_title': prog.get('episode_title',''),
-                'description': prog.get('description',''),
-                'date': date_str,
-                'time': time_str,
-                'duration': prog.get('duration',''),
-                'weekday': start_dt.strftime('%A'),
-                'call_sign': ch.get('call_sign') or ch.get('channel_name') or ''
-            }
-            raw.append(base_entry)
-            if target_wd is not None and start_dt.weekday() != target_wd:
+        if target_minutes is not None:
+            start_minutes = start_dt.hour*60 + start_dt.minute
+            if abs(start_minutes - target_minutes) > 180:  # 3-hour span
                 continue
-            if target_minutes is not None:
-                start_minutes = start_dt.hour*60 + start_dt.minute
-                if abs(start_minutes - target_minutes) > 180:  # 3-hour span
-                    continue
-            entries.append(base_entry)
+        entries.append(base_entry)
     # Heuristic marking for likely NFL game among filtered entries
     for e in entries:
         tl = e['title'].lower()
@@ -2978,18 +2963,21 @@ def debug_channel_schedule():
 @app.route('/debug/recurring_status')
 def debug_recurring_status():
     """Inspect recurring series rules and their last trigger time."""
-    rules = [
-        {
+    rules = []
+    for j in scheduled_jobs:
+        if j.get('type') != 'recurring_series':
+            continue
+        next_fire = recording_scheduler.next_fire_for(j.get('id'))
+        rules.append({
             'id': j.get('id'),
             'title': j.get('title'),
             'channel_number': j.get('channel_number'),
             'time': j.get('time'),
             'days': (j.get('recurrence') or {}).get('days'),
             'last_started_at': j.get('last_started_at'),
+            'next_fire_at': next_fire.isoformat() if next_fire else None,
             'status': j.get('status'),
-        }
-        for j in scheduled_jobs if j.get('type') == 'recurring_series'
-    ]
+        })
     return jsonify({'count': len(rules), 'rules': rules})
 
 @app.route('/debug/recent_recordings')
@@ -3007,6 +2995,68 @@ def debug_recent_recordings():
     return jsonify({'count': len(entries), 'items': entries[:20]})
 
 # Public aliases for convenience
+@app.route('/api/postprocess')
+def api_postprocess():
+    """Running and queued post-processing jobs plus recent ones from the store, with CPU seconds."""
+    try:
+        limit = int(request.args.get('limit', '50'))
+    except Exception:
+        limit = 50
+    snapshot = postprocessor.snapshot()
+    snapshot['history'] = schedule_store.recent_postprocess_jobs(limit)
+    return jsonify(snapshot)
+
+@app.route('/api/hls')
+def api_hls_recordings():
+    """Segmented recordings on disk; unfinished ones can be watched while they record."""
+    return jsonify(hls_capture.list_recordings(SAVE_DIR))
+
+@app.route('/hls/<name>/<path:filename>')
+def hls_file(name, filename):
+    """Playlist and segments of one segmented recording."""
+    if not hls_capture.is_segment_dir(name):
+        return jsonify({'error': 'not a segmented recording'}), 404
+    mimetype = hls_capture.MIMETYPES.get(os.path.splitext(filename)[1].lower())
+    response = send_from_directory(os.path.join(SAVE_DIR, name), filename, mimetype=mimetype)
+    if filename.endswith('.m3u8'):
+        # The playlist grows while recording; segments never change once listed
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/watch/<name>')
+def watch_recording(name):
+    """Player page for a segmented recording, live or finished."""
+    if not hls_capture.is_segment_dir(name) or not os.path.exists(
+            hls_capture.playlist_path(os.path.join(SAVE_DIR, name))):
+        return jsonify({'error': 'recording not found'}), 404
+    return render_template("watch.html", title=name[:-len(hls_capture.SEGMENT_DIR_EXT)],
+                           playlist_url=f"/hls/{name}/{hls_capture.PLAYLIST_NAME}")
+
+@app.route('/api/tuner_plan')
+def api_tuner_plan():
+    """Peak concurrent recordings and every over-subscribed window in the planning horizon."""
+    return jsonify(tuner_planner.plan([j for j in scheduled_jobs if isinstance(j, dict)]))
+
+@app.route('/api/http_stats')
+def api_http_stats():
+    """Outbound request counts, errors and latency per host (HDHomeRun, Gracenote, indexers, qBittorrent)."""
+    return jsonify(http_client.stats())
+
+@app.route('/api/indexer_cache')
+def api_indexer_cache():
+    """Hit/miss/coalesced counts for the shared indexer search cache."""
+    from indexer_manager import search_cache
+    return jsonify(search_cache.stats())
+
+@app.route('/api/recording_history')
+def api_recording_history():
+    """Completed/failed recordings from the schedule store, newest first."""
+    try:
+        limit = int(request.args.get('limit', '50'))
+    except Exception:
+        limit = 50
+    return jsonify(schedule_store.recent_history(limit))
+
 @app.route('/recent_recordings')
 def recent_recordings():
     """Alias for /debug/recent_recordings"""
@@ -3054,23 +3104,44 @@ def run_setup():
 
 @app.route('/debug/refresh_epg', methods=['POST','GET'])
 def refresh_epg_manual():
-    """Manual EPG refresh endpoint. Clears cache and fetches fresh data immediately.
+    """Manual EPG refresh endpoint. Starts a background crawl and returns at once.
 
-    Query param: days (default 7) to expand horizon for this one-shot fetch.
+    Query params: days (default 7) to expand horizon for this one-shot fetch;
+    mode=incremental to only fetch missing windows and the next 24 h.
+    Progress and the outcome are reported by /api/epg/status.
     """
     try:
         days = int(request.args.get('days','7'))
     except Exception:
         days = 7
-    from epg_zap2it import fetch_gracenote_epg
-    try:
-        print(f"EPG: manual refresh requested (days={days})")
-        fresh = fetch_gracenote_epg(days=days)
-        EPG_CACHE['data'] = fresh
-        EPG_CACHE['timestamp'] = time.time()
-        return jsonify({'status':'ok','program_count': len(fresh)})
-    except Exception as e:
-        return jsonify({'status':'error','error': str(e)}), 500
+    incremental = request.args.get('mode') == 'incremental'
+    print(f"EPG: manual refresh requested (days={days}, {'incremental' if incremental else 'full'})")
+    started = epg_refresher.trigger('manual refresh', force=True, days=days, incremental=incremental)
+    # The current cache keeps serving until the new data is swapped in; poll /api/epg/status
+    return jsonify({'status': 'started' if started else 'already_running',
+                    'refresh': epg_refresher.status()}), 202
+
+@app.route('/api/epg/export')
+def api_epg_export():
+    """Download the cached EPG in the legacy JSON layout (also written to epg_cache.json)."""
+    if not EPG_CACHE["data"]:
+        return jsonify({'error': 'EPG unavailable'}), 503
+    count = epg_cache_file.export_json(EPG_CACHE["data"], EPG_CACHE["timestamp"], EPG_CACHE_FILE)
+    print(f"EPG: exported {count} programs to {EPG_CACHE_FILE}")
+    return send_file(EPG_CACHE_FILE, mimetype='application/json', as_attachment=True,
+                     download_name='epg_cache.json')
+
+@app.route('/api/epg/status')
+def api_epg_status():
+    """EPG cache age and background refresh state."""
+    timestamp = EPG_CACHE["timestamp"]
+    return jsonify({
+        'program_count': len(EPG_CACHE["data"]) if EPG_CACHE["data"] else 0,
+        'cache_timestamp': timestamp or None,
+        'cache_age_minutes': round((time.time() - timestamp) / 60, 1) if timestamp else None,
+        'ttl_minutes': round(EPG_TTL / 60),
+        'refresh': epg_refresher.status(),
+    })
 
 def _extract_opponent(team_token:str, title:str):
     import re
@@ -3117,52 +3188,43 @@ def debug_nfl_matchup():
         days = int(request.args.get('days','7'))
     except Exception:
         days = 7
-    epg = get_epg()
-    if not epg:
+    store = get_epg_store()
+    if not len(store):
         return jsonify({'error': 'EPG unavailable'}), 503
     import datetime as _dt
     now = _dt.datetime.now()
     horizon = now + _dt.timedelta(days=days)
     candidates = []
-    for ch in epg:
-        ch_num = ch.get('channel_number') or ch.get('channel')
-        ch_name = ch.get('channel_name') or ch.get('call_sign') or ''
-        for prog in ch.get('programs', []):
-            title = prog.get('title') or ''
-            desc = prog.get('description') or ''
-            if not title:
-                continue
-            if team.lower() not in title.lower() and team.lower() not in desc.lower():
-                continue
-            date_str = prog.get('date') or prog.get('airDate')
-            time_str = prog.get('time') or prog.get('airTime')
-            if not (date_str and time_str):
-                continue
-            try:
-                start_dt = _dt.datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-            except Exception:
-                continue
-            if start_dt < now or start_dt > horizon:
-                continue
-            opponent = _extract_opponent(team, title)
-            if not opponent and desc:
-                opponent = _extract_opponent(team, desc)
-            dur = prog.get('duration') or ''
-            try:
-                dur_i = int(dur)
-            except Exception:
-                dur_i = 0
-            is_game_length = dur_i >= 120
-            candidates.append({
-                'title': title.strip(),
-                'channel_number': ch_num,
-                'channel': ch_name,
-                'date': date_str,
-                'time': time_str,
-                'duration': dur,
-                'opponent': opponent,
-                'is_game_length': is_game_length,
-            })
+    for prog in store.between(now, horizon):
+        ch_num = prog.get('channel_number')
+        ch_name = prog.get('channel') or prog.get('call_sign') or ''
+        title = prog.get('title') or ''
+        desc = prog.get('description') or ''
+        if not title:
+            continue
+        if team.lower() not in title.lower() and team.lower() not in desc.lower():
+            continue
+        date_str = prog.get('date') or prog.get('airDate')
+        time_str = prog.get('time') or prog.get('airTime')
+        opponent = _extract_opponent(team, title)
+        if not opponent and desc:
+            opponent = _extract_opponent(team, desc)
+        dur = prog.get('duration') or ''
+        try:
+            dur_i = int(dur)
+        except Exception:
+            dur_i = 0
+        is_game_length = dur_i >= 120
+        candidates.append({
+            'title': title.strip(),
+            'channel_number': ch_num,
+            'channel': ch_name,
+            'date': date_str,
+            'time': time_str,
+            'duration': dur,
+            'opponent': opponent,
+            'is_game_length': is_game_length,
+        })
     # Prioritize entries that look like real games (matchup extracted + long duration)
     def score(c):
         s = 0
@@ -3202,26 +3264,103 @@ def index():
                          days=days_list,
                          cache_bust=cache_bust)
 
+def _render_scheduled_list():
+    """Just the scheduled recordings list (templates/_scheduled_list.html), for schedule events."""
+    with app.app_context():
+        return render_template("_scheduled_list.html", scheduled=scheduled_jobs)
+
 @app.route("/record_now", methods=["POST"])
 def record_now():
     data = request.get_json()
+    if recording_manager.free_tuners() <= 0:
+        return jsonify({"message": f"All {recording_manager.get_tuner_count()} tuners are busy. Stop a recording first."}), 409
     run_threaded(record_channel, data['channel'], int(data['duration']),
                  int(data['crf']), data['preset'], data['format'])
     return jsonify({"message": f"Recording {data['channel']} started."})
 
 @app.route("/stop_recording", methods=["POST"])
 def stop_recording():
-    global stop_event
-    stop_event.set()
-    return jsonify({"message":"Stop signal sent."})
+    """Stop one session (session_id or job_id in the body) or, with no id, every active session."""
+    data = request.get_json(silent=True) or {}
+    target = data.get('session_id') or data.get('job_id')
+    stopped = recording_manager.stop(target)
+    if target and not stopped:
+        return jsonify({"message": f"No active recording '{target}'."}), 404
+    return jsonify({"message": f"Stop signal sent to {stopped} recording(s).", "stopped": stopped})
+
+def _progress_payload():
+    """Recording and post-processing status, rendered once for /progress and the event stream."""
+    snapshot = recording_manager.snapshot()
+    active = snapshot['active']
+    if active:
+        rows = []
+        for s in active:
+            mins, secs = divmod(s['elapsed_sec'], 60)
+            watch = ""
+            if hls_capture.is_segment_dir(os.path.basename(s['file'] or '')):
+                watch = f" <a href='/watch/{os.path.basename(s['file'])}' target='_blank'>Watch</a>"
+            m = s['metrics'] or {}
+            stats = " - starting"
+            if m.get('fps') is not None:
+                stats = (f" - {m['fps']:.0f} fps, {(m['bitrate_kbps'] or 0) / 1000:.1f} Mbps, "
+                         f"{m['speed'] or 0:.2f}x, {m['drop_frames']} dropped")
+            elif s.get('writer'):
+                w = s['writer']
+                stats = (f" - {w['throughput_mbps']:.1f} Mbps direct to disk, {w['writes']} writes "
+                         f"(max {w['max_write_ms']:.0f} ms)")
+            rows.append(f"<div>{channels.get(s['channel'], s['channel'])} ({s['channel']}): "
+                        f"{s['status']} {mins:02d}:{secs:02d} ({int(s['progress'] * 100)}%){stats}{watch}</div>")
+        html = (f"<div class='alert alert-info'>Recording {len(active)} of {snapshot['tuner_count']} tuners"
+                f"{''.join(rows)}</div>")
+    else:
+        html = "<div class='alert alert-secondary'>No active recording</div>"
+    post = postprocessor.snapshot()
+    if post['running'] or post['queued']:
+        rows = [f"<div>{j['kind']}: {os.path.basename(j['source'])} - {j['cpu_seconds']:.0f}s CPU</div>"
+                for j in post['running']]
+        html += (f"<div class='alert alert-secondary'>Post-processing: {len(post['running'])} running, "
+                 f"{len(post['queued'])} queued{''.join(rows)}</div>")
+    return {"html": html, "postprocess": post, **snapshot}
 
 @app.route("/progress", methods=["GET"])
 def progress():
-    global current_process
-    if current_process and current_process.poll() is None:
-        return jsonify({"html": f"<div class='alert alert-info'>Recording in progress... PID: {current_process.pid}</div>"})
-    else:
-        return jsonify({"html": "<div class='alert alert-secondary'>No active recording</div>"})
+    return jsonify(_progress_payload())
+
+PROGRESS_PUSH_SEC = 2
+_progress_pusher = None
+_progress_pusher_lock = threading.Lock()
+
+def _push_progress_loop():
+    """One render every few seconds while something is running, shared by every open page."""
+    idle_sent = False
+    while True:
+        time.sleep(PROGRESS_PUSH_SEC)
+        if not event_bus.subscriber_count():
+            continue
+        busy = bool(recording_manager.active_sessions() or postprocessor.snapshot()['running'])
+        if busy or not idle_sent:
+            event_bus.publish('progress', _progress_payload())
+        idle_sent = not busy
+
+@app.route("/events")
+def events():
+    """Server-Sent Events: progress, recording, schedule, postprocess and epg events."""
+    global _progress_pusher
+    with _progress_pusher_lock:
+        if _progress_pusher is None:
+            _progress_pusher = threading.Thread(target=_push_progress_loop, daemon=True)
+            _progress_pusher.start()
+    stream = event_bus.stream(initial=[('progress', _progress_payload())])
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route("/api/recordings/<session_id>/metrics")
+def api_recording_metrics(session_id):
+    """Recent ffmpeg progress samples (fps, bitrate, speed, drops, out_time) for one session."""
+    session = recording_manager.get(session_id)
+    if session is None:
+        return jsonify({'error': f"No recording session '{session_id}'"}), 404
+    return jsonify(session.to_dict(history=True))
 
 @app.route("/auto_categorize", methods=["POST"])
 def manual_auto_categorize():
@@ -3258,9 +3397,12 @@ def schedule_recording():
         
     try:
         # Create simple scheduled recording entries (not using schedule library)
-        for day in data['days']:
+        # Nothing is appended until the batch is admitted, so number the entries from one base id
+        entries = []
+        base_id = next_job_id()
+        for i, day in enumerate(data['days']):
             entry = {
-                'id': len(scheduled_jobs) + 1,
+                'id': base_id + i,
                 'type': 'recurring_series',
                 'title': f"{channels.get(data['channel'], data['channel'])} Recording",
                 'channel': channels.get(data['channel'], data['channel']),
@@ -3279,12 +3421,23 @@ def schedule_recording():
                 'status': 'active',
                 'created_at': datetime.now().isoformat()
             }
+            for key in ('pre_padding_sec', 'post_padding_sec'):
+                if data.get(key) not in (None, ''):
+                    entry[key] = int(data[key])
+            entries.append(entry)
+        conflicts = _admit_new_jobs(entries)
+        for entry in entries:
             scheduled_jobs.append(entry)
-            print(f"Added scheduled recording: {entry['title']} on {day} at {data['time']}")
+            print(f"Added scheduled recording: {entry['title']} on {entry['recurrence']['days'][0]} at {data['time']}")
             
-        save_schedule()
-        return jsonify({"message": f"Recording scheduled for {len(data['days'])} day(s) successfully."})
+        save_jobs(entries)
+        message = f"Recording scheduled for {len(data['days'])} day(s) successfully."
+        if conflicts:
+            message += f" Warning: {len(conflicts)} time slot(s) need more tuners than available."
+        return jsonify({"message": message, "conflicts": conflicts})
         
+    except TunerConflictError as e:
+        return jsonify({"message": f"Not scheduled: {e}", **e.to_dict()}), 409
     except Exception as e:
         print(f"Error scheduling recording: {e}")
         import traceback
@@ -3298,7 +3451,7 @@ def cancel():
     if 0 <= idx < len(scheduled_jobs):
         # Remove the recording from the list
         removed_recording = scheduled_jobs.pop(idx)
-        save_schedule()
+        delete_jobs([removed_recording])
         print(f"Canceled recording: {removed_recording['title']} on {removed_recording['channel']}")
         return jsonify({"message": f"Canceled recording: {removed_recording['title']}"})
     return jsonify({"message":"Invalid index."}), 400
@@ -3312,15 +3465,15 @@ def cancel_series():
         return jsonify({"message": "Series name required."}), 400
     
     # Find all recordings that belong to this series
-    original_count = len(scheduled_jobs)
-    scheduled_jobs[:] = [job for job in scheduled_jobs 
-                        if not (job.get('series_recording') and 
-                               (job.get('series_group') == series_name or job.get('title') == series_name))]
+    removed = [job for job in scheduled_jobs
+               if job.get('series_recording') and
+               (job.get('series_group') == series_name or job.get('title') == series_name)]
+    scheduled_jobs[:] = [job for job in scheduled_jobs if not any(job is r for r in removed)]
     
-    canceled_count = original_count - len(scheduled_jobs)
+    canceled_count = len(removed)
     
     if canceled_count > 0:
-        save_schedule()
+        delete_jobs(removed)
         print(f"Canceled {canceled_count} episodes of series: {series_name}")
         return jsonify({"message": f"Canceled {canceled_count} episodes of '{series_name}'"})
     else:
@@ -3355,8 +3508,8 @@ def cancel_recurring():
     episode_count = len(ep_list)
 
     # Remove the rule itself
-    before = len(scheduled_jobs)
     scheduled_jobs[:] = [j for j in scheduled_jobs if j is not rule_to_remove]
+    removed = [rule_to_remove]
 
     # Also remove any standalone scheduled episodes that belong to same series (heuristic)
     removed_episode_count = 0
@@ -3370,11 +3523,12 @@ def cancel_recurring():
                 same = True
             if same and j.get('type') != 'recurring_series':
                 removed_episode_count += 1
+                removed.append(j)
                 continue
             new_list.append(j)
         scheduled_jobs[:] = new_list
 
-    save_schedule()
+    delete_jobs(removed)
     print(f"Canceled recurring series '{title}' rule_id={rule_id}; rule removed; episodes_in_rule={episode_count}; standalone_removed={removed_episode_count}")
     return jsonify({
         "message": f"Canceled recurring series '{title}' (rule + {episode_count} rule-episodes, {removed_episode_count} standalone removed)",
@@ -3403,7 +3557,7 @@ def cancel_next_episode():
                     job['next_episode'] = None
                     job['status'] = 'completed'  # No more episodes
                 
-                save_schedule()
+                save_jobs([job])
                 episode_info = f"{next_episode.get('date')} at {next_episode.get('time')}"
                 if next_episode.get('episode_id'):
                     episode_info += f" ({next_episode['episode_id']})"
@@ -3493,6 +3647,10 @@ if __name__=="__main__":
     
     # Load existing scheduled recordings
     load_schedule()
+    # Pick up post-processing interrupted by the last shutdown
+    resumed = postprocessor.resume()
+    if resumed:
+        print(f"[PostProcess] Resumed {resumed} job(s) from the last run")
 
     import os as _os_main
     # Always start the schedule loop so time-based recurring rules can trigger.
@@ -0,0 +1,322 @@
+"""
+LineDrive EPG Cache File
+Compact binary on-disk EPG cache: interned strings, integer epochs, records and descriptions decoded on demand
+"""
+
+import json
+import os
+import struct
+import threading
+import uuid
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b'LDEPGBIN'
+VERSION = 1
+# magic, version, generation, cache timestamp, field count, string count, record count
+HEADER = struct.Struct('<8sI16sdIII')
+STRLEN = struct.Struct('<I')
+NO_START = -(2 ** 63)        # start_ts sentinel for programs without a parseable start
+NO_DESCRIPTION = 0xFFFFFFFF  # description length sentinel for programs without the key
+
+
+def description_path(index_path):
+    return os.path.splitext(str(index_path))[0] + '.desc'
+
+
+def _record_struct(field_count):
+    # start epoch, one string-table index per field (0 = key absent), description offset + length
+    return struct.Struct('<q' + 'I' * field_count + 'II')
+
+
+class DescriptionFile:
+    """Descriptions live in a side file that is read only when one is first needed."""
+
+    def __init__(self, path, generation):
+        self.path = path
+        self.generation = generation
+        self._blob = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._blob is None:
+                try:
+                    with open(self.path, 'rb') as f:
+                        blob = f.read()
+                    if blob[:16] != self.generation:
+                        print("EPG: description file does not match the cache index; descriptions unavailable")
+                        blob = b''
+                except OSError as e:
+                    print(f"EPG: could not read descriptions: {e}")
+                    blob = b''
+                self._blob = blob
+        return self._blob
+
+    def read(self, offset, length):
+        blob = self._blob if self._blob is not None else self._load()
+        if not blob:
+            return ''
+        return blob[offset:offset + length].decode('utf-8', errors='replace')
+
+
+class LazyProgram(dict):
+    """EPG entry whose description is read from the side file on first access."""
+
+    __slots__ = ('_desc',)
+
+    def __missing__(self, key):
+        if key == 'description' and getattr(self, '_desc', None) is not None:
+            source, offset, length = self._desc
+            self._desc = None
+            value = source.read(offset, length)
+            self['description'] = value
+            return value
+        raise KeyError(key)
+
+    def _materialize(self):
+        if getattr(self, '_desc', None) is not None:
+            self['description']
+
+    # Every way of walking the mapping loads the description first, so json.dump, dict(e),
+    # {**e} and loops see the same keys as a plain dict would. Overriding __iter__ also makes
+    # CPython copy this class through keys()/__getitem__ instead of the raw dict storage.
+    def __iter__(self):
+        self._materialize()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        # Counted without loading, so truth tests on an entry stay cheap
+        return dict.__len__(self) + (getattr(self, '_desc', None) is not None)
+
+    def keys(self):
+        self._materialize()
+        return dict.keys(self)
+
+    def values(self):
+        self._materialize()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize()
+        return dict.items(self)
+
+    def copy(self):
+        self._materialize()
+        return dict(self)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def peek(self, key):
+        """Like get(), but a pending description is read without being kept on the entry."""
+        desc = getattr(self, '_desc', None)
+        if key == 'description' and desc is not None:
+            source, offset, length = desc
+            return source.read(offset, length)
+        return dict.get(self, key)
+
+    def __contains__(self, key):
+        return dict.__contains__(self, key) or (key == 'description' and getattr(self, '_desc', None) is not None)
+
+
+def save(index_path, programs, timestamp):
+    """Write programs to `index_path` plus its .desc side file (each replaced atomically)."""
+    programs = [p for p in (programs or []) if isinstance(p, dict)]
+    generation = uuid.uuid4().bytes
+    fields = []
+    field_pos = {}
+    for entry in programs:
+        for key in entry:
+            if key not in ('description', 'start_ts') and key not in field_pos:
+                field_pos[key] = len(fields)
+                fields.append(key)
+
+    strings = [None]  # index 0 means "key not present"
+    string_ids = {}
+
+    def intern(value):
+        text = json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+        sid = string_ids.get(text)
+        if sid is None:
+            sid = string_ids[text] = len(strings)
+            strings.append(text)
+        return sid
+
+    field_ids = [intern(name) for name in fields]
+    record = _record_struct(len(fields))
+    records = bytearray()
+    desc_chunks = [generation]
+    desc_offset = len(generation)
+    for entry in programs:
+        values = [0] * len(fields)
+        for key, value in entry.items():
+            pos = field_pos.get(key)
+            if pos is not None:
+                values[pos] = intern(value)
+        start = entry.get('start_ts')
+        start = NO_START if start is None else int(round(float(start)))
+        if 'description' in entry:
+            data = str(entry.get('description') or '').encode('utf-8')
+            desc_chunks.append(data)
+            offset, length = desc_offset, len(data)
+            desc_offset += length
+        else:
+            offset, length = 0, NO_DESCRIPTION
+        records += record.pack(start, *values, offset, length)
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, generation, float(timestamp or 0),
+                                len(fields), len(strings) - 1, len(programs)))
+    for sid in field_ids:
+        out += STRLEN.pack(sid)
+    for text in strings[1:]:
+        data = text.encode('utf-8')
+        out += STRLEN.pack(len(data)) + data
+    out += records
+
+    desc_path = description_path(index_path)
+    for path, payload in ((desc_path, b''.join(desc_chunks)), (str(index_path), bytes(out))):
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+    return len(out), desc_offset
+
+
+_UNDECODED = object()
+
+
+class ProgramTable(Sequence):
+    """The programs of a loaded cache, each decoded into a LazyProgram the first time it is read.
+
+    The index file is kept as bytes: records are fixed-size, so record i starts at a
+    computed offset, and strings are decoded from the string table as records need them.
+    A decoded entry is kept, so later reads return the same (possibly updated) dict.
+    """
+
+    def __init__(self, data, string_offsets, field_ids, records_pos, record_count, descriptions):
+        self._data = data
+        self._string_offsets = string_offsets
+        self._strings = [_UNDECODED] * len(string_offsets)
+        self._record = _record_struct(len(field_ids))
+        self._records_pos = records_pos
+        self._count = record_count
+        self._descriptions = descriptions
+        self._entries = [None] * record_count
+        self._lock = threading.Lock()
+        self.fields = [self._string(sid) for sid in field_ids]
+
+    def _string(self, sid):
+        value = self._strings[sid]
+        if value is _UNDECODED:
+            pos = self._string_offsets[sid]
+            (length,) = STRLEN.unpack_from(self._data, pos)
+            value = self._strings[sid] = json.loads(self._data[pos + 4:pos + 4 + length].decode('utf-8'))
+        return value
+
+    def _decode(self, index):
+        row = self._record.unpack_from(self._data, self._records_pos + index * self._record.size)
+        entry = LazyProgram()
+        for name, sid in zip(self.fields, row[1:-2]):
+            if sid:
+                entry[name] = self._string(sid)
+        start = row[0]
+        entry['start_ts'] = None if start == NO_START else start
+        length = row[-1]
+        entry._desc = None if length == NO_DESCRIPTION else (self._descriptions, row[-2], length)
+        return entry
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('program index out of range')
+        entry = self._entries[index]
+        if entry is None:
+            with self._lock:
+                entry = self._entries[index]
+                if entry is None:
+                    entry = self._entries[index] = self._decode(index)
+        return entry
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def columns(self, *names):
+        """(start_ts, value, ...) per record for the named fields, without building the entries.
+
+        start_ts is None where the record has no start. Entries that were already
+        decoded may have been changed since; their current values are used.
+        """
+        positions = [self.fields.index(name) + 1 if name in self.fields else None for name in names]
+        end = self._records_pos + self._record.size * self._count
+        rows = self._record.iter_unpack(memoryview(self._data)[self._records_pos:end])
+        for row, entry in zip(rows, self._entries):
+            if entry is not None:
+                yield (entry.get('start_ts'),) + tuple(entry.get(name) for name in names)
+                continue
+            start = None if row[0] == NO_START else row[0]
+            yield (start,) + tuple(self._string(row[p]) if p and row[p] else None for p in positions)
+
+    def view(self, positions):
+        """A read-only sequence of the records at `positions`, in that order."""
+        return ProgramView(self, array('I', positions))
+
+
+class ProgramView(Sequence):
+    """Records of a ProgramTable picked out by position; slices come back as lists."""
+
+    def __init__(self, table, positions):
+        self._table = table
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._table[p] for p in self._positions[index]]
+        return self._table[self._positions[index]]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+
+def load(index_path):
+    """Read the index file. Returns (programs, timestamp).
+
+    programs is a ProgramTable: entries and their descriptions are decoded when first read.
+    """
+    with open(index_path, 'rb') as f:
+        data = f.read()
+    magic, version, generation, timestamp, field_count, string_count, record_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{index_path} is not a LineDrive EPG cache (version {version})")
+    pos = HEADER.size
+    field_ids = struct.unpack_from('<' + 'I' * field_count, data, pos)
+    pos += 4 * field_count
+    string_offsets = array('I', [0])
+    for _ in range(string_count):
+        string_offsets.append(pos)
+        (length,) = STRLEN.unpack_from(data, pos)
+        pos += 4 + length
+    if pos + _record_struct(field_count).size * record_count > len(data):
+        raise ValueError(f"{index_path} is truncated")
+    descriptions = DescriptionFile(description_path(index_path), generation)
+    return ProgramTable(data, string_offsets, field_ids, pos, record_count, descriptions), timestamp
+
+
+def export_json(programs, timestamp, json_path):
+    """Write the legacy epg_cache.json layout (loads every description)."""
+    data = [dict(entry.items()) for entry in programs or []]
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({"data": data, "timestamp": timestamp}, f, ensure_ascii=False, indent=2)
+    return len(data)
@@ -0,0 +1,93 @@
+"""
+LineDrive EPG Refresh Worker
+Rebuilds the EPG in a background thread while callers keep using the cached copy
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class EPGRefreshWorker:
+    """Runs one EPG crawl at a time off the request path.
+
+    refresh_fn(**kwargs) must return the new program list (or raise). An empty
+    result is treated as a failure so a Gracenote outage never replaces a good
+    cache with nothing. on_success(data) swaps the result in.
+    """
+
+    def __init__(self, refresh_fn, on_success, retry_interval_sec=300):
+        self.refresh_fn = refresh_fn
+        self.on_success = on_success
+        self.retry_interval_sec = retry_interval_sec
+        self._last_failure_ts = 0
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._done.set()
+        self._thread = None
+        self.in_progress = False
+        self.reason = None
+        self.started_at = None
+        self.last_success = None
+        self.last_error = None
+        self.last_error_at = None
+        self.last_duration_sec = None
+        self.last_program_count = None
+
+    def _run(self, kwargs):
+        started = time.time()
+        try:
+            data = self.refresh_fn(**kwargs)
+            if not data:
+                raise RuntimeError("refresh returned no programs")
+            self.on_success(data)
+            self.last_success = datetime.now().isoformat()
+            self.last_program_count = len(data)
+            self.last_error = None
+            print(f"EPG: background refresh finished ({len(data)} programs in {time.time() - started:.1f}s)")
+        except Exception as e:
+            self.last_error = str(e)
+            self.last_error_at = datetime.now().isoformat()
+            self._last_failure_ts = time.time()
+            print(f"EPG: background refresh failed, keeping cached data: {e}")
+        finally:
+            self.last_duration_sec = round(time.time() - started, 1)
+            with self._lock:
+                self.in_progress = False
+                self._done.set()
+
+    def trigger(self, reason='expired', force=False, **kwargs):
+        """Start a refresh unless one is already running. Returns True if one was started.
+
+        After a failure, unforced triggers are ignored for retry_interval_sec so
+        every page load does not start a new crawl against a failing source.
+        """
+        with self._lock:
+            if self.in_progress:
+                return False
+            if not force and time.time() - self._last_failure_ts < self.retry_interval_sec:
+                return False
+            self.in_progress = True
+            self.reason = reason
+            self.started_at = datetime.now().isoformat()
+            self._done.clear()
+            self._thread = threading.Thread(target=self._run, args=(kwargs,), daemon=True)
+        print(f"EPG: starting background refresh ({reason})")
+        self._thread.start()
+        return True
+
+    def wait(self, timeout=None):
+        """Block until the current refresh (if any) finishes. Only for background callers."""
+        return self._done.wait(timeout)
+
+    def status(self):
+        return {
+            'in_progress': self.in_progress,
+            'reason': self.reason,
+            'started_at': self.started_at,
+            'last_success': self.last_success,
+            'last_error': self.last_error,
+            'last_error_at': self.last_error_at,
+            'last_duration_sec': self.last_duration_sec,
+            'last_program_count': self.last_program_count,
+        }
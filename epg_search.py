@@ -0,0 +1,214 @@
+"""
+LineDrive EPG Search
+Tokenized inverted index over the cached EPG with prefix matching and BM25 ranking
+"""
+
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+# Field weights: a title hit counts for more than the same word in a description
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'episode_title': 2.0,
+    'genre': 1.5,
+    'description': 1.0,
+}
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has in is it its of on or the this to was with
+""".split())
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_PENALTY = 0.7     # a prefix-only hit scores a bit below an exact word
+MAX_PREFIX_TERMS = 50    # cap on vocabulary words one query token may expand to
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric words; apostrophes are dropped so "grey's" -> "greys"."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(str(text).lower().replace("'", "").replace("’", ""))
+
+
+def query_terms(query):
+    """Query words without stopwords (all words are kept if every one is a stopword)."""
+    words = tokenize(query)
+    kept = [w for w in words if w not in STOPWORDS]
+    return kept or words
+
+
+def program_key(entry):
+    """Identity of a program across refreshes: channel + start + title."""
+    start = entry.get('start_ts')
+    if start is None:
+        start = f"{entry.get('date', '')} {entry.get('time', '')}"
+    return (str(entry.get('channel_number') or ''), start, entry.get('title') or '')
+
+
+def _field_text(entry, field):
+    # Cached entries read a pending description without keeping it on the entry, so
+    # indexing the guide does not load every description into memory
+    peek = getattr(entry, 'peek', None)
+    return peek(field) if peek is not None else entry.get(field)
+
+
+def _signature(entry):
+    # Hashed so the index does not hold a second copy of every description
+    return hash(tuple(_field_text(entry, field) for field in FIELD_WEIGHTS))
+
+
+def _field_terms(entry):
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(_field_text(entry, field)):
+            terms[token] += weight
+    return terms
+
+
+class EPGSearchIndex:
+    """Inverted index: term -> {doc id: field-weighted term frequency}.
+
+    update() diffs the new program list against the indexed one, so an EPG
+    refresh only tokenizes programs that were added or changed. Queries touch
+    only the posting lists of their terms, not the whole guide.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._docs = {}        # doc id -> entry
+        self._doc_terms = {}   # doc id -> Counter, needed to remove a doc
+        self._doc_sig = {}     # doc id -> indexed field values, to skip unchanged programs
+        self._doc_len = {}
+        self._total_len = 0.0
+        self._vocab = []       # sorted terms for prefix lookups, rebuilt lazily
+        self._vocab_dirty = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _add(self, doc_id, entry):
+        terms = _field_terms(entry)
+        self._docs[doc_id] = entry
+        self._doc_terms[doc_id] = terms
+        self._doc_sig[doc_id] = _signature(entry)
+        length = sum(terms.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._vocab_dirty = True
+            posting[doc_id] = tf
+
+    def _remove(self, doc_id):
+        self._docs.pop(doc_id, None)
+        self._doc_sig.pop(doc_id, None)
+        self._total_len -= self._doc_len.pop(doc_id, 0)
+        for term in self._doc_terms.pop(doc_id, ()):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+                self._vocab_dirty = True
+
+    def update(self, programs):
+        """Bring the index in line with a new program list. Returns (added, removed)."""
+        incoming = {}
+        for entry in programs or []:
+            if isinstance(entry, dict):
+                incoming[program_key(entry)] = entry
+        with self._lock:
+            removed = [doc_id for doc_id in self._docs if doc_id not in incoming]
+            for doc_id in removed:
+                self._remove(doc_id)
+            added = 0
+            for doc_id, entry in incoming.items():
+                old = self._docs.get(doc_id)
+                if old is entry:
+                    continue
+                if old is not None:
+                    if _signature(entry) == self._doc_sig[doc_id]:
+                        self._docs[doc_id] = entry  # same text, newer dict
+                        continue
+                    self._remove(doc_id)
+                self._add(doc_id, entry)
+                added += 1
+        return added, len(removed)
+
+    def _expand(self, token):
+        """Indexed terms matching a query token: (term, weight) for exact and prefix hits."""
+        if self._vocab_dirty:
+            self._vocab = sorted(self._postings)
+            self._vocab_dirty = False
+        matches = []
+        if token in self._postings:
+            matches.append((token, 1.0))
+        i = bisect_left(self._vocab, token)
+        while i < len(self._vocab) and len(matches) < MAX_PREFIX_TERMS:
+            term = self._vocab[i]
+            if not term.startswith(token):
+                break
+            if term != token:
+                matches.append((term, PREFIX_PENALTY))
+            i += 1
+        return matches
+
+    def search(self, query, limit=None, predicate=None):
+        """Programs containing every query term (exact or as a prefix), best BM25 score first.
+
+        predicate, if given, filters the matching entries before any are scored
+        (e.g. an air-time window). Returns a list of (score, entry).
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            # AND semantics: a doc must match every token, through any of its expansions
+            expansions = []
+            matched = None
+            for token in terms:
+                expanded = [(self._postings[term], weight) for term, weight in self._expand(token)]
+                docs = set()
+                for posting, _ in expanded:
+                    docs.update(posting)
+                matched = docs if matched is None else matched & docs
+                if not matched:
+                    return []
+                expansions.append(expanded)
+            if predicate is not None:
+                matched = {doc_id for doc_id in matched if predicate(self._docs[doc_id])}
+            avg_len = self._total_len / n_docs or 1.0
+            norms = {doc_id: BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avg_len)
+                     for doc_id in matched}
+            scores = dict.fromkeys(matched, 0.0)
+            for expanded in expansions:
+                token_scores = {}
+                for posting, weight in expanded:
+                    idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                    # Walk whichever side is smaller: the posting list or the surviving docs
+                    if len(posting) < len(norms):
+                        hits = ((d, tf) for d, tf in posting.items() if d in norms)
+                    else:
+                        hits = ((d, posting[d]) for d in norms if d in posting)
+                    for doc_id, tf in hits:
+                        s = weight * idf * tf * (BM25_K1 + 1) / (tf + norms[doc_id])
+                        if s > token_scores.get(doc_id, 0.0):
+                            token_scores[doc_id] = s
+                for doc_id, s in token_scores.items():
+                    scores[doc_id] += s
+            results = [(score, self._docs[doc_id]) for doc_id, score in scores.items()]
+        results.sort(key=lambda r: (-r[0], r[1].get('start_ts') or float('inf')))
+        return results[:limit] if limit else results
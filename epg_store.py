@@ -0,0 +1,158 @@
+"""
+LineDrive EPG Store
+In-memory index over the flat EPG program list: by start time and by channel
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+
+# Gracenote listings use '07:30 PM'; older caches and hand-built entries use '19:30'
+TIME_FORMATS = ("%Y-%m-%d %I:%M %p", "%Y-%m-%d %H:%M")
+
+
+def parse_program_start(date_str, time_str):
+    """Local start datetime of an EPG entry, or None if it has no usable date/time."""
+    if not (date_str and time_str):
+        return None
+    text = f"{date_str} {time_str}".strip()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def program_start_ts(entry):
+    """Start epoch of an entry, parsed once and kept on the entry as 'start_ts'."""
+    ts = entry.get('start_ts')
+    if ts is not None:
+        return ts
+    start = parse_program_start(entry.get('date') or entry.get('airDate'),
+                                entry.get('time') or entry.get('airTime'))
+    ts = start.timestamp() if start else None
+    entry['start_ts'] = ts
+    return ts
+
+
+def _as_ts(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class EPGStore:
+    """Read-only index built once per EPG load.
+
+    Programs are kept sorted by start epoch globally and per channel number, so
+    time-window and channel lookups are bisects instead of scans of the whole
+    guide. Entries without a parseable start are kept separately in `undated`.
+    """
+
+    def __init__(self, programs=None):
+        self.programs = []      # dated entries sorted by start
+        self._starts = []       # start epochs, parallel to programs
+        self._channels = {}     # channel number -> (starts, entries)
+        self.undated = []
+        if programs:
+            self._build(programs)
+
+    def _build(self, programs):
+        if hasattr(programs, 'columns'):
+            self._build_from_table(programs)
+            return
+        dated = []
+        for entry in programs:
+            if not isinstance(entry, dict):
+                continue
+            ts = program_start_ts(entry)
+            if ts is None:
+                self.undated.append(entry)
+            else:
+                dated.append((ts, entry))
+        dated.sort(key=lambda pair: pair[0])
+        self._starts = [ts for ts, _ in dated]
+        self.programs = [entry for _, entry in dated]
+        by_channel = {}
+        for ts, entry in dated:
+            key = str(entry.get('channel_number') or '')
+            starts, entries = by_channel.setdefault(key, ([], []))
+            starts.append(ts)
+            entries.append(entry)
+        self._channels = by_channel
+
+    def _build_from_table(self, table):
+        """Same index over an epg_cache_file.ProgramTable, read from its columns so the
+        entries are only decoded when a lookup returns them."""
+        dated = []
+        for pos, (ts, channel) in enumerate(table.columns('channel_number')):
+            if ts is None:
+                entry = table[pos]
+                ts = program_start_ts(entry)
+                if ts is None:
+                    self.undated.append(entry)
+                    continue
+            dated.append((ts, str(channel or ''), pos))
+        dated.sort(key=lambda row: row[0])
+        self._starts = [ts for ts, _, _ in dated]
+        self.programs = table.view([pos for _, _, pos in dated])
+        by_channel = {}
+        for ts, key, pos in dated:
+            starts, positions = by_channel.setdefault(key, ([], []))
+            starts.append(ts)
+            positions.append(pos)
+        self._channels = {key: (starts, table.view(positions)) for key, (starts, positions) in by_channel.items()}
+
+    def __len__(self):
+        return len(self.programs) + len(self.undated)
+
+    @staticmethod
+    def start_of(entry):
+        """Start of an indexed entry as a local datetime (None for undated entries)."""
+        ts = entry.get('start_ts')
+        return datetime.fromtimestamp(ts) if ts is not None else None
+
+    @staticmethod
+    def _slice(starts, entries, start, end):
+        lo = 0 if start is None else bisect_left(starts, _as_ts(start))
+        hi = len(starts) if end is None else bisect_right(starts, _as_ts(end))
+        return entries[lo:hi]
+
+    def between(self, start=None, end=None):
+        """Programs starting in [start, end], earliest first. Accepts datetimes or epochs."""
+        return self._slice(self._starts, self.programs, start, end)
+
+    def upcoming(self, days=7, now=None):
+        """Programs starting from now through the next `days` days."""
+        now = now or datetime.now()
+        return self.between(now, now + timedelta(days=days))
+
+    def channel_numbers(self):
+        return [key for key in self._channels if key]
+
+    def channel_between(self, channel_number, start=None, end=None):
+        """Programs on one channel starting in [start, end], earliest first."""
+        index = self._channels.get(str(channel_number))
+        if not index:
+            return []
+        return self._slice(index[0], index[1], start, end)
+
+    def on_air(self, channel_number, at=None):
+        """The program airing on a channel at a given moment (default now), if known."""
+        index = self._channels.get(str(channel_number))
+        if not index:
+            return None
+        at_ts = _as_ts(at or datetime.now())
+        pos = bisect_right(index[0], at_ts) - 1
+        if pos < 0:
+            return None
+        entry = index[1][pos]
+        try:
+            minutes = int(entry.get('duration') or 0)
+        except (TypeError, ValueError):
+            minutes = 0
+        if minutes and index[0][pos] + minutes * 60 <= at_ts:
+            return None
+        return entry
@@ -1,8 +1,48 @@
 from bs4 import BeautifulSoup
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 import pytz
+import http_client
 from config_manager import get_config
+from epg_store import program_start_ts
+
+GRID_URL = "https://tvlistings.gracenote.com/api/grid"
+GRID_WINDOW_HOURS = 6
+GRID_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json',
+    'Referer': 'https://tvlistings.gracenote.com/'
+}
+
+# One session shared by all grid fetches; keep-alive connections come from the shared http_client pools
+_grid_session = None
+_grid_session_lock = threading.Lock()
+
+def _get_grid_session():
+    global _grid_session
+    with _grid_session_lock:
+        if _grid_session is None:
+            _grid_session = http_client.new_session(GRID_HEADERS)
+        return _grid_session
+
+def _fetch_grid_window(session, params, label, retries=3, backoff=1.0):
+    """Fetch and parse one 6-hour grid window, retrying with exponential backoff. None if it failed."""
+    target_date = datetime.fromtimestamp(int(params['time'])).strftime('%Y-%m-%d')
+    for attempt in range(retries + 1):
+        try:
+            r = session.get(GRID_URL, params=params, timeout=15)
+            r.raise_for_status()
+            return parse_gracenote_data(r.json(), target_date)
+        except Exception as e:
+            if attempt >= retries:
+                print(f"  Error fetching {label}: {e}")
+                return None
+            delay = backoff * (2 ** attempt)
+            print(f"  Retrying {label} in {delay:.0f}s ({e})")
+            time.sleep(delay)
 
 def detect_headend_id(zip_code):
     """Detect headend ID for a given zip code by querying Gracenote"""
@@ -20,7 +60,7 @@ def detect_headend_id(zip_code):
             'postalCode': zip_code
         }
         
-        response = requests.get(lookup_url, params=params, headers=headers, timeout=10)
+        response = http_client.get(lookup_url, params=params, headers=headers, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -41,104 +81,109 @@ def detect_headend_id(zip_code):
         print(f"Error detecting headend ID for zip {zip_code}: {e}")
         return ""
 
-def fetch_gracenote_epg(days=7, zip_code=None, headend_id=None):
-    """Fetch EPG data from Gracenote API for specified location and multiple days"""
-    try:
-        # Get configuration
-        config = get_config()
-        epg_config = config.get_epg_config()
+def _resolve_location(zip_code=None, headend_id=None):
+    """Zip code and headend ID from the arguments or configuration (auto-detecting the headend)."""
+    config = get_config()
+    epg_config = config.get_epg_config()
+    
+    # Use provided parameters or fall back to configuration
+    if zip_code is None:
+        zip_code = epg_config['zip_code']
+    if headend_id is None:
+        headend_id = epg_config['headend_id']
         
-        # Use provided parameters or fall back to configuration
-        if zip_code is None:
-            zip_code = epg_config['zip_code']
-        if headend_id is None:
-            headend_id = epg_config['headend_id']
-            
-        # Auto-detect headend ID if not provided
-        if not headend_id:
-            print(f"Auto-detecting headend ID for zip code {zip_code}...")
-            headend_id = detect_headend_id(zip_code)
-            if headend_id:
-                # Save the detected headend ID to config for future use
-                config.set('epg', 'headend_id', headend_id)
-                config.save_config()
-                print(f"Saved headend ID '{headend_id}' to configuration")
+    # Auto-detect headend ID if not provided
+    if not headend_id:
+        print(f"Auto-detecting headend ID for zip code {zip_code}...")
+        headend_id = detect_headend_id(zip_code)
+        if headend_id:
+            # Save the detected headend ID to config for future use
+            config.set('epg', 'headend_id', headend_id)
+            config.save_config()
+            print(f"Saved headend ID '{headend_id}' to configuration")
+    return zip_code, headend_id
+
+def grid_window_starts(days=7, now=None):
+    """Start timestamps of the 6-hour grid windows covering the next `days` days."""
+    # Generate timestamps for better coverage throughout each day
+    # Start from current time and cover multiple days with different time periods
+    current_time = now or datetime.now()
+    day_timestamps = []
+    
+    for day_offset in range(days):
+        current_date = current_time + timedelta(days=day_offset)
         
-        print(f"Fetching EPG data for zip code {zip_code}, headend ID: {headend_id}")
+        # For each day, fetch multiple time periods to ensure full coverage
+        time_periods = [
+            (6, "6AM"),    # Morning: 6 AM
+            (14, "2PM"),   # Afternoon: 2 PM  
+            (20, "8PM")    # Evening/Night: 8 PM
+        ]
+        
+        for hour, label in time_periods:
+            time_slot = current_date.replace(hour=hour, minute=0, second=0, microsecond=0)
+            time_slot_end = time_slot + timedelta(hours=GRID_WINDOW_HOURS)
+            
+            # Skip time periods only if the ENTIRE window has already passed
+            if day_offset == 0 and time_slot_end <= current_time:
+                continue  # Skip only if the 6-hour window has completely passed
+            
+            day_timestamps.append(int(time_slot.timestamp()))
+    return day_timestamps
+
+def _fetch_grid_windows(day_timestamps, zip_code, headend_id):
+    """Fetch windows concurrently; returns one program list per window (None if it failed), in order."""
+    epg_config = get_config().get_epg_config()
+    workers = max(1, min(epg_config['fetch_workers'], len(day_timestamps) or 1))
+    session = _get_grid_session()
+    futures = []
+    executor = ThreadPoolExecutor(max_workers=workers)
+    for timestamp in day_timestamps:
+        target_date = datetime.fromtimestamp(timestamp)
         
         # Use the exact parameters from your working URL
-        base_url = "https://tvlistings.gracenote.com/api/grid"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'application/json',
-            'Referer': 'https://tvlistings.gracenote.com/'
+        params = {
+            'lineupId': '',  # Leave empty for auto-detection
+            'timespan': str(GRID_WINDOW_HOURS),  # 6 hours coverage per fetch
+            'headendId': headend_id or '',
+            'country': 'USA',
+            'timezone': '',  # Leave empty for auto-detection
+            'device': 'X',
+            'postalCode': zip_code,
+            'isOverride': 'true',
+            'time': str(timestamp),  # Use calculated timestamps
+            'pref': '32,256',
+            'userId': '-',
+            'aid': 'orbebb',
+            'languagecode': 'en-us'
         }
         
+        label = target_date.strftime('%Y-%m-%d %H:%M')
+        print(f"Fetching EPG data for {label} (6-hour block)...")
+        futures.append(executor.submit(_fetch_grid_window, session, params, label,
+                                       retries=epg_config['fetch_retries']))
+    
+    # Collect in window order regardless of which request finished first
+    try:
+        return [future.result() for future in futures]
+    finally:
+        executor.shutdown(wait=False)
+
+def fetch_gracenote_epg(days=7, zip_code=None, headend_id=None):
+    """Fetch EPG data from Gracenote API for specified location and multiple days"""
+    try:
+        zip_code, headend_id = _resolve_location(zip_code, headend_id)
+        print(f"Fetching EPG data for zip code {zip_code}, headend ID: {headend_id}")
+        
         # Fetch data for multiple days to catch recurring shows
+        day_timestamps = grid_window_starts(days)
+        started = time.time()
         all_results = []
+        for window_results in _fetch_grid_windows(day_timestamps, zip_code, headend_id):
+            all_results.extend(window_results or [])
         
-        # Generate timestamps for better coverage throughout each day
-        # Start from current time and cover multiple days with different time periods
-        base_date = datetime.now()
-        current_time = datetime.now()
-        day_timestamps = []
-        
-        for day_offset in range(days):
-            current_date = base_date + timedelta(days=day_offset)
-            
-            # For each day, fetch multiple time periods to ensure full coverage
-            time_periods = [
-                (6, "6AM"),    # Morning: 6 AM
-                (14, "2PM"),   # Afternoon: 2 PM  
-                (20, "8PM")    # Evening/Night: 8 PM
-            ]
-            
-            for hour, label in time_periods:
-                time_slot = current_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-                time_slot_end = time_slot + timedelta(hours=6)  # Each window covers 6 hours
-                
-                # Skip time periods only if the ENTIRE window has already passed
-                if day_offset == 0 and time_slot_end <= current_time:
-                    continue  # Skip only if the 6-hour window has completely passed
-                
-                day_timestamps.append(int(time_slot.timestamp()))
-        
-        # Fetch data for each timestamp period
-        for i, timestamp in enumerate(day_timestamps):
-            target_date = datetime.fromtimestamp(timestamp)
-            
-            params = {
-                'lineupId': '',  # Leave empty for auto-detection
-                'timespan': '6',  # 6 hours coverage per fetch
-                'headendId': headend_id or '',
-                'country': 'USA',
-                'timezone': '',  # Leave empty for auto-detection
-                'device': 'X',
-                'postalCode': zip_code,
-                'isOverride': 'true',
-                'time': str(timestamp),  # Use calculated timestamps
-                'pref': '32,256',
-                'userId': '-',
-                'aid': 'orbebb',
-                'languagecode': 'en-us'
-            }
-            
-            print(f"Fetching EPG data for {target_date.strftime('%Y-%m-%d %H:%M')} (6-hour block)...")
-            
-            try:
-                r = requests.get(base_url, params=params, headers=headers, timeout=15)
-                r.raise_for_status()
-                data = r.json()
-                
-                # Process this time period's data
-                period_results = parse_gracenote_data(data, target_date.strftime('%Y-%m-%d'))
-                all_results.extend(period_results)
-                
-            except Exception as e:
-                print(f"  Error fetching {target_date.strftime('%Y-%m-%d %H:%M')}: {e}")
-                continue
-        
-        print(f"Gracenote API: Found {len(all_results)} programs across {len(day_timestamps)} time periods ({days} days)")
+        print(f"Gracenote API: Found {len(all_results)} programs across {len(day_timestamps)} time periods ({days} days) "
+              f"in {time.time() - started:.1f}s")
         
         # Only use real API data - no fallback data
         return all_results
@@ -149,6 +194,76 @@ def fetch_gracenote_epg(days=7, zip_code=None, headend_id=None):
         traceback.print_exc()
         return []  # Return empty list instead of fallback data
 
+def _program_end_ts(entry, start_ts):
+    try:
+        minutes = int(entry.get('duration') or 0)
+    except (TypeError, ValueError):
+        minutes = 0
+    return start_ts + max(minutes, 1) * 60
+
+def fetch_gracenote_delta(existing, days=7, refetch_hours=None, zip_code=None, headend_id=None):
+    """Incrementally refresh an EPG program list instead of re-crawling every window.
+
+    Only windows with no programs in `existing` (e.g. the new trailing day) and
+    windows starting within `refetch_hours` (late schedule changes) are fetched.
+    A fetched window replaces the existing programs that start inside it; the
+    rest are merged by (channel, start). Programs that have finished airing are
+    dropped. Windows that fail to download keep their existing programs.
+    """
+    if refetch_hours is None:
+        refetch_hours = get_config().get_epg_config()['delta_refetch_hours']
+    now = time.time()
+    window_sec = GRID_WINDOW_HOURS * 3600
+    all_windows = grid_window_starts(days)
+
+    # Keep what has not finished airing, keyed by channel + start
+    kept = {}
+    undated = []
+    dropped = 0
+    for entry in existing or []:
+        start_ts = program_start_ts(entry)
+        if start_ts is None:
+            undated.append(entry)
+            continue
+        if _program_end_ts(entry, start_ts) <= now:
+            dropped += 1
+            continue
+        kept[(str(entry.get('channel_number') or ''), start_ts)] = entry
+
+    covered = set()
+    for _, start_ts in kept:
+        for window in all_windows:
+            if window <= start_ts < window + window_sec:
+                covered.add(window)
+                break
+    windows = [w for w in all_windows if w not in covered or w < now + refetch_hours * 3600]
+    if not windows:
+        print("EPG delta: cache already covers every window")
+        return list(kept.values()) + undated
+
+    zip_code, headend_id = _resolve_location(zip_code, headend_id)
+    started = time.time()
+    fetched = 0
+    changed = 0
+    for window, window_results in zip(windows, _fetch_grid_windows(windows, zip_code, headend_id)):
+        if window_results is None:
+            continue  # keep the old listings for a window we could not download
+        fetched += 1
+        # The fresh window is authoritative for programs starting inside it
+        for key in [k for k in kept if window <= k[1] < window + window_sec]:
+            del kept[key]
+        for entry in window_results:
+            start_ts = program_start_ts(entry)
+            if start_ts is None or _program_end_ts(entry, start_ts) <= now:
+                continue
+            kept[(str(entry.get('channel_number') or ''), start_ts)] = entry
+            changed += 1
+
+    merged = sorted(kept.values(), key=lambda e: e['start_ts']) + undated
+    print(f"EPG delta: fetched {fetched}/{len(windows)} windows (of {len(all_windows)}) in {time.time() - started:.1f}s, "
+          f"{changed} programs updated, {dropped} aired programs dropped, {len(merged)} total")
+    return merged
+
 def search_epg_for_show(show_name, days=7):
     """Search EPG data for any show name and return all matching episodes with smart sports matching"""
     print(f"Searching EPG for show: '{show_name}' over next {days} days...")
@@ -475,10 +590,109 @@ def group_episodes_by_series(episodes):
     
     return dict(series_groups)
 
+# Leading 3-digit zip ranges -> time zone, used when epg.timezone is not set.
+# Coarse by state; border counties may differ, set epg.timezone to override.
+ZIP_PREFIX_ZONES = [
+    (349, 'America/New_York'),
+    (369, 'America/Chicago'),       # Alabama
+    (385, 'America/Chicago'),       # Tennessee (middle/west)
+    (397, 'America/Chicago'),       # Mississippi
+    (499, 'America/New_York'),      # Kentucky, Ohio, Indiana, Michigan
+    (588, 'America/Chicago'),       # Iowa, Wisconsin, Minnesota, Dakotas
+    (599, 'America/Denver'),        # Montana
+    (797, 'America/Chicago'),       # Illinois through Texas
+    (799, 'America/Denver'),        # El Paso
+    (831, 'America/Denver'),        # Colorado, Wyoming
+    (838, 'America/Boise'),         # Idaho
+    (847, 'America/Denver'),        # Utah
+    (865, 'America/Phoenix'),       # Arizona
+    (884, 'America/Denver'),        # New Mexico
+    (961, 'America/Los_Angeles'),   # Nevada, California
+    (968, 'Pacific/Honolulu'),
+    (994, 'America/Los_Angeles'),   # Oregon, Washington
+    (999, 'America/Anchorage'),
+]
+
+def zone_for_zip(zip_code):
+    """Best-guess IANA zone name for a US zip code (Central if unknown)."""
+    try:
+        prefix = int(str(zip_code).strip()[:3])
+    except (TypeError, ValueError):
+        return 'America/Chicago'
+    for upper, zone in ZIP_PREFIX_ZONES:
+        if prefix <= upper:
+            return zone
+    return 'America/Chicago'
+
+@lru_cache(maxsize=8)
+def _zone(name):
+    return pytz.timezone(name)
+
+_logged_zone = None
+
+def get_epg_zone():
+    """Listing time zone: epg.timezone if set, else derived from the configured zip code."""
+    global _logged_zone
+    epg_config = get_config().get_epg_config()
+    if epg_config['timezone']:
+        name, source = epg_config['timezone'], 'epg.timezone'
+    else:
+        name, source = zone_for_zip(epg_config['zip_code']), f"zip code {epg_config['zip_code']}"
+    try:
+        zone = _zone(name)
+    except pytz.UnknownTimeZoneError:
+        print(f"Unknown EPG timezone '{name}', using America/Chicago")
+        name, source = 'America/Chicago', 'fallback'
+        zone = _zone(name)
+    if (name, source) != _logged_zone:
+        _logged_zone = (name, source)
+        print(f"EPG: listing time zone {name} (from {source})")
+    return zone
+
+def _period_for_hour(hour):
+    if 6 <= hour < 12:
+        return 'Morning'
+    if 12 <= hour < 18:
+        return 'Afternoon'
+    return 'Evening'
+
+def convert_start_times(start_times, zone):
+    """Map each distinct Gracenote startTime to (epoch, 'hh:mm AM', 'YYYY-MM-DD', period) in `zone`."""
+    converted = {}
+    for start_time in start_times:
+        if not start_time:
+            continue
+        try:
+            if 'T' in start_time:
+                # ISO timestamp; assume UTC when no offset is given
+                dt_utc = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+                if dt_utc.tzinfo is None:
+                    dt_utc = dt_utc.replace(tzinfo=pytz.UTC)
+                dt_local = dt_utc.astimezone(zone)
+            elif start_time.isdigit():
+                # Unix timestamp
+                dt_local = datetime.fromtimestamp(int(start_time), tz=zone)
+            else:
+                # Try other formats; naive values are already local listing time
+                dt_local = datetime.fromisoformat(start_time)
+                if dt_local.tzinfo is None:
+                    dt_local = zone.localize(dt_local)
+        except Exception as time_error:
+            print(f"Time parsing error for {start_time}: {time_error}")
+            continue
+        converted[start_time] = (int(dt_local.timestamp()), dt_local.strftime('%I:%M %p'),
+                                 dt_local.strftime('%Y-%m-%d'), _period_for_hour(dt_local.hour))
+    return converted
+
 def parse_gracenote_data(data, target_date):
     """Parse Gracenote API response data for a specific date"""
     results = []
     
+    # Many channels share the same slot times, so convert each distinct start once
+    start_times = convert_start_times(
+        {event.get('startTime', '') for channel in data.get('channels', []) for event in channel.get('events', [])},
+        get_epg_zone())
+    
     # Parse the JSON response - use all available channels
     # Note: Channel filtering should be done based on user's actual HDHomeRun lineup
     
@@ -540,78 +754,34 @@ def parse_gracenote_data(data, target_date):
                         except:
                             air_date_formatted = original_air_date
                     
-                    # Parse start time with proper timezone handling
+                    # Start time was converted once for the whole response above
                     start_time = event.get('startTime', '')
                     time_str = "TBD"
                     date_str = target_date  # Use the target date passed in
+                    start_ts = None
+                    converted = start_times.get(start_time)
                     
-                    if start_time:
-                        try:
-                            # Handle ISO format from API
-                            if 'T' in start_time:
-                                # Parse the ISO timestamp
-                                if start_time.endswith('Z'):
-                                    # UTC timestamp
-                                    dt_utc = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                                else:
-                                    dt_utc = datetime.fromisoformat(start_time)
-                                
-                                # Convert to Central Time
-                                central_tz = pytz.timezone('America/Chicago')
-                                if dt_utc.tzinfo is None:
-                                    # Assume UTC if no timezone info
-                                    dt_utc = dt_utc.replace(tzinfo=pytz.UTC)
-                                
-                                dt_central = dt_utc.astimezone(central_tz)
-                                
-                                # Commented out verbose timezone logging
-                                # print(f"Timezone conversion: {start_time} -> {dt_central.strftime('%I:%M %p')} Central Time")
-                                
-                            elif start_time.isdigit():
-                                # Unix timestamp - convert to Central Time
-                                dt_utc = datetime.fromtimestamp(int(start_time), tz=pytz.UTC)
-                                central_tz = pytz.timezone('America/Chicago')
-                                dt_central = dt_utc.astimezone(central_tz)
-                            else:
-                                # Try other formats
-                                dt_central = datetime.fromisoformat(start_time)
-                                if dt_central.tzinfo is None:
-                                    # Assume it's already in Central Time
-                                    central_tz = pytz.timezone('America/Chicago')
-                                    dt_central = central_tz.localize(dt_central)
-                            
-                            time_str = dt_central.strftime('%I:%M %p')
-                            date_str = dt_central.strftime('%Y-%m-%d')
-                            
-                            # Determine period based on Central Time
-                            hour = dt_central.hour
-                            if 6 <= hour < 12:
+                    if converted:
+                        start_ts, time_str, date_str, period = converted
+                    elif start_time:
+                        # Fallback time parsing
+                        import re
+                        time_match = re.search(r'(\d{1,2}:\d{2})', start_time)
+                        if time_match:
+                            time_str = time_match.group(1)
+                            # Try to determine AM/PM
+                            hour = int(time_str.split(':')[0])
+                            if hour >= 6 and hour <= 11:
+                                time_str += ' AM'
                                 period = 'Morning'
-                            elif 12 <= hour < 18:
+                            elif hour >= 12 and hour <= 17:
+                                time_str += ' PM'
                                 period = 'Afternoon'
                             else:
+                                time_str += ' PM'
                                 period = 'Evening'
-                        
-                        except Exception as time_error:
-                            print(f"Time parsing error for {start_time}: {time_error}")
-                            # Fallback time parsing
-                            import re
-                            time_match = re.search(r'(\d{1,2}:\d{2})', start_time)
-                            if time_match:
-                                time_str = time_match.group(1)
-                                # Try to determine AM/PM
-                                hour = int(time_str.split(':')[0])
-                                if hour >= 6 and hour <= 11:
-                                    time_str += ' AM'
-                                    period = 'Morning'
-                                elif hour >= 12 and hour <= 17:
-                                    time_str += ' PM'
-                                    period = 'Afternoon'
-                                else:
-                                    time_str += ' PM'
-                                    period = 'Evening'
-                            else:
-                                period = 'Current'
+                        else:
+                            period = 'Current'
                     else:
                         period = 'Current'
                     
@@ -634,7 +804,8 @@ def parse_gracenote_data(data, target_date):
                         'genre': genre,
                         'rating': rating,
                         'year': year,
-                        'duration': duration
+                        'duration': duration,
+                        'start_ts': start_ts
                     })
     
     return results
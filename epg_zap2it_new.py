@@ -1,5 +1,5 @@
 from bs4 import BeautifulSoup
-import requests
+import http_client
 from datetime import datetime, timedelta
 import pytz
 
@@ -42,7 +42,7 @@ def fetch_gracenote_epg(days=7):
             print(f"Fetching EPG data for {target_date.strftime('%Y-%m-%d')} (day {day_offset + 1} of {days})...")
             
             try:
-                r = requests.get(base_url, params=params, headers=headers, timeout=15)
+                r = http_client.get(base_url, params=params, headers=headers, timeout=15)
                 r.raise_for_status()
                 data = r.json()
                 
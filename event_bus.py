@@ -0,0 +1,80 @@
+"""
+LineDrive Event Bus
+Server-Sent Events fan-out: each event is serialized once and queued to every connected browser
+"""
+
+import json
+import queue
+import threading
+
+HEARTBEAT_SEC = 15
+SUBSCRIBER_QUEUE = 100
+
+
+def format_event(event, data, event_id=None):
+    """One SSE frame. JSON data never contains raw newlines, so a single data: line suffices."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventBus:
+    """Broadcasts named events to any number of SSE subscribers.
+
+    A subscriber whose queue fills up (a stalled or backgrounded tab) is
+    dropped instead of slowing the publisher down; EventSource reconnects on
+    its own and gets a fresh snapshot.
+    """
+
+    def __init__(self, max_queue=SUBSCRIBER_QUEUE, heartbeat_sec=HEARTBEAT_SEC):
+        self.max_queue = max_queue
+        self.heartbeat_sec = heartbeat_sec
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data):
+        with self._lock:
+            self._next_id += 1
+            frame = format_event(event, data, self._next_id)
+            subscribers = list(self._subscribers)
+        dropped = []
+        for q in subscribers:
+            try:
+                q.put_nowait(frame)
+            except queue.Full:
+                dropped.append(q)
+        if dropped:
+            with self._lock:
+                self._subscribers.difference_update(dropped)
+            for q in dropped:
+                # Discard the backlog and wake the stream so it closes
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait(None)
+        return len(subscribers) - len(dropped)
+
+    def stream(self, initial=()):
+        """Generator of SSE frames for one client: `initial` (event, data) pairs, then live events."""
+        q = queue.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subscribers.add(q)
+        try:
+            yield "retry: 3000\n\n"
+            for event, data in initial:
+                yield format_event(event, data)
+            while True:
+                try:
+                    frame = q.get(timeout=self.heartbeat_sec)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"  # comment line; also detects closed connections
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            with self._lock:
+                self._subscribers.discard(q)
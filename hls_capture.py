@@ -0,0 +1,84 @@
+"""
+LineDrive Segmented Capture
+ffmpeg HLS output for recordings that can be watched (and rewound) while they are still recording
+"""
+
+import os
+
+PLAYLIST_NAME = 'index.m3u8'
+SEGMENT_DIR_EXT = '.hls'
+ENDLIST_TAG = '#EXT-X-ENDLIST'
+
+MIMETYPES = {
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.ts': 'video/mp2t',
+    '.m4s': 'video/iso.segment',
+    '.mp4': 'video/mp4',
+}
+
+
+def segment_dir(save_dir, basename):
+    """Folder holding one segmented recording (playlist + segments)."""
+    return os.path.join(save_dir, basename + SEGMENT_DIR_EXT)
+
+
+def playlist_path(folder):
+    return os.path.join(folder, PLAYLIST_NAME)
+
+
+def is_segment_dir(name):
+    return name.endswith(SEGMENT_DIR_EXT) and os.path.basename(name) == name
+
+
+def output_args(folder, segment_sec=6, segment_type='mpegts'):
+    """ffmpeg output options for an EVENT playlist that keeps every segment.
+
+    An EVENT playlist only ever grows, so players can seek back to the start of
+    the recording while it is still being written. temp_file keeps half-written
+    segments out of the playlist. Keyframes are forced on segment boundaries so
+    every segment starts cleanly.
+    """
+    fmp4 = segment_type == 'fmp4'
+    segment_name = 'seg_%05d' + ('.m4s' if fmp4 else '.ts')
+    return [
+        '-force_key_frames', f'expr:gte(t,n_forced*{segment_sec})',
+        '-f', 'hls',
+        '-hls_time', str(segment_sec),
+        '-hls_list_size', '0',
+        '-hls_playlist_type', 'event',
+        '-hls_flags', 'independent_segments+temp_file',
+        '-hls_segment_type', 'fmp4' if fmp4 else 'mpegts',
+        '-hls_segment_filename', os.path.join(folder, segment_name),
+        '-y', playlist_path(folder),
+    ]
+
+
+def is_finished(folder):
+    """True once ffmpeg has closed the playlist (a crashed capture never gets the tag)."""
+    try:
+        with open(playlist_path(folder), 'rb') as f:
+            f.seek(max(0, os.path.getsize(f.name) - 64))
+            return ENDLIST_TAG.encode() in f.read()
+    except OSError:
+        return False
+
+
+def list_recordings(save_dir):
+    """Segmented recordings under save_dir, newest first."""
+    items = []
+    try:
+        names = os.listdir(save_dir)
+    except OSError:
+        return items
+    for name in names:
+        folder = os.path.join(save_dir, name)
+        if not (is_segment_dir(name) and os.path.exists(playlist_path(folder))):
+            continue
+        items.append({
+            'name': name,
+            'title': name[:-len(SEGMENT_DIR_EXT)],
+            'finished': is_finished(folder),
+            'modified': os.path.getmtime(playlist_path(folder)),
+        })
+    items.sort(key=lambda i: i['modified'], reverse=True)
+    return items
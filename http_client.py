@@ -0,0 +1,174 @@
+"""
+LineDrive HTTP Client
+Shared connection pools, default timeouts, retries and per-host request stats for every outbound call
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds, used when a caller passes none
+POOL_HOSTS = 32            # hosts kept in the pool manager at once
+POOL_PER_HOST = 16         # keep-alive connections per host (EPG fetches run several at once)
+
+# Connection failures and gateway errors on idempotent requests are retried with backoff;
+# the caller still sees the last response (raise_on_status=False) and decides what to do.
+RETRY = Retry(total=2, connect=2, read=0, status=2, backoff_factor=0.5,
+              status_forcelist=(502, 503, 504), allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']),
+              raise_on_status=False)
+# HDHomeRun answers 503 when every tuner is busy. That is an answer, not a fault, so device
+# calls only retry failed connections and hand any status straight back to the caller.
+DEVICE_RETRY = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.5,
+                     allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS']), raise_on_status=False)
+
+
+class HostStats:
+    """Request count, failures and time-to-headers for one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_status = None
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.requests, 1) if self.requests else None,
+            'max_ms': round(self.max_ms, 1),
+            'last_status': self.last_status,
+        }
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that fills in the default timeout and records per-host stats."""
+
+    def __init__(self, client, **kwargs):
+        self._client = client
+        super().__init__(**kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        host = urlsplit(request.url).netloc
+        started = time.perf_counter()
+        try:
+            response = super().send(request, timeout=timeout if timeout is not None else DEFAULT_TIMEOUT, **kwargs)
+        except Exception:
+            self._client._record(host, time.perf_counter() - started, None)
+            raise
+        self._client._record(host, time.perf_counter() - started, response.status_code)
+        return response
+
+
+class HttpClient:
+    """One pooled adapter mounted on every session, so all modules share keep-alive connections.
+
+    session_for(base_url) returns a long-lived session per host, which keeps
+    cookies such as a login SID between calls; new_session() is for clients
+    that need private headers but should still use the shared pools.
+    device_get() is for the tuner itself and never retries on a status code.
+    """
+
+    def __init__(self):
+        self._adapter = _PooledAdapter(self, pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST,
+                                       max_retries=RETRY)
+        self._device_adapter = _PooledAdapter(self, pool_connections=4, pool_maxsize=POOL_PER_HOST,
+                                              max_retries=DEVICE_RETRY)
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._default = self.new_session()
+        self._device = self.new_session(adapter=self._device_adapter)
+
+    def new_session(self, headers=None, adapter=None):
+        session = requests.Session()
+        session.mount('http://', adapter or self._adapter)
+        session.mount('https://', adapter or self._adapter)
+        if headers:
+            session.headers.update(headers)
+        return session
+
+    def session_for(self, base_url, login=None):
+        """Shared session for a host. login(session) -> bool runs once up front and again on a 403."""
+        key = urlsplit(base_url).netloc or base_url
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self.new_session()
+                if login:
+                    session.hooks['response'].append(_relogin_hook(session, login))
+                self._sessions[key] = session
+                new = True
+            else:
+                new = False
+        if new and login:
+            login(session)
+        return session
+
+    def request(self, method, url, **kwargs):
+        return self._default.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self._default.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._default.post(url, **kwargs)
+
+    def device_get(self, url, **kwargs):
+        """GET from the HDHomeRun: connection retries only, so a busy-tuner 503 comes back at once."""
+        return self._device.get(url, **kwargs)
+
+    def _record(self, host, elapsed, status):
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = self._stats[host] = HostStats()
+            stats.requests += 1
+            stats.total_ms += elapsed * 1000
+            stats.max_ms = max(stats.max_ms, elapsed * 1000)
+            stats.last_status = status
+            if status is None or status >= 500:
+                stats.errors += 1
+
+    def stats(self):
+        with self._lock:
+            return {host: s.to_dict() for host, s in sorted(self._stats.items())}
+
+
+def _relogin_hook(session, login):
+    """Response hook: on a 403 log in again and replay the request once."""
+    guard = threading.local()
+
+    def hook(response, **kwargs):
+        if response.status_code != 403 or getattr(guard, 'active', False):
+            return response
+        guard.active = True  # the login request itself must not re-enter
+        try:
+            response.content  # drain so the connection goes back to the pool
+            response.close()
+            if not login(session):
+                return response
+            retry = response.request.copy()
+            retry.headers.pop('Cookie', None)
+            retry.prepare_cookies(session.cookies)
+            return session.send(retry, **kwargs)
+        finally:
+            guard.active = False
+
+    return hook
+
+
+client = HttpClient()
+
+get = client.get
+post = client.post
+device_get = client.device_get
+request = client.request
+session_for = client.session_for
+new_session = client.new_session
+stats = client.stats
@@ -4,12 +4,101 @@ Generic indexer support for multiple torrent/usenet providers
 """
 
 import requests
+import threading
 import time
+import http_client
+from collections import OrderedDict
 from urllib.parse import urljoin, urlencode
 from config_manager import get_config
 
+
+def normalize_query(query):
+    """Cache key form of a search term: case-folded with whitespace collapsed."""
+    return ' '.join(str(query or '').split()).casefold()
+
+
+class _PendingSearch:
+    """An upstream search in progress that identical concurrent searches wait on."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.done = threading.Event()
+        self.result = None
+
+
+class SearchCache:
+    """TTL + LRU cache of normalised search results with request coalescing.
+
+    Keys are (provider, normalised query, category). Only successful results
+    are stored. While a search for a key is running, identical searches wait
+    for it instead of calling the indexer again. Callers get their own copies
+    of the result dicts, so annotating results never leaks into the cache.
+    """
+
+    def __init__(self, ttl_sec=600, max_entries=256):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, limit, result)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _copy(result, limit):
+        if 'results' not in result:
+            return dict(result)
+        items = [dict(r) for r in result['results'][:limit]]
+        return {**result, 'results': items, 'total': len(items)}
+
+    def get_or_fetch(self, key, limit, fetch):
+        """Cached result for key (at least `limit` items deep), else fetch() once for every waiting caller."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time() and entry[1] >= limit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(entry[2], limit)
+            pending = self._pending.get(key)
+            leader = pending is None or pending.limit < limit
+            if leader:
+                pending = self._pending[key] = _PendingSearch(limit)
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            pending.done.wait()
+            return self._copy(pending.result, limit)
+
+        try:
+            pending.result = fetch()
+        except Exception as e:
+            pending.result = {'error': f'Search failed: {e}'}
+        finally:
+            with self._lock:
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+                if pending.result is not None and 'error' not in pending.result and self.ttl_sec > 0:
+                    self._entries[key] = (time.time() + self.ttl_sec, limit, pending.result)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            pending.done.set()
+        return self._copy(pending.result, limit)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'coalesced': self.coalesced, 'ttl_sec': self.ttl_sec}
+
+
 class IndexerManager:
-    def __init__(self, indexer_config=None):
+    def __init__(self, indexer_config=None, cache=None):
         if indexer_config:
             self.indexer_config = indexer_config
         else:
@@ -18,6 +107,7 @@ class IndexerManager:
         
         self.provider = self.indexer_config['provider']
         self.provider_config = self.indexer_config['providers'].get(self.provider, {})
+        self.cache = cache
         
     def is_enabled(self):
         """Check if indexer integration is enabled"""
@@ -34,7 +124,7 @@ class IndexerManager:
                 return False
                 
             # Test connectivity with a simple ping
-            response = requests.get(f"{url}/api/v1/indexers", 
+            response = http_client.get(f"{url}/api/v1/indexers", 
                                   headers=self._get_headers(),
                                   timeout=5)
             return response.status_code == 200
@@ -97,10 +187,16 @@ class IndexerManager:
         return None
     
     def search(self, query, category=None, limit=50):
-        """Search for content using the configured indexer"""
+        """Search for content using the configured indexer (through the result cache when there is one)"""
         if not self.is_enabled():
             return {'error': 'Indexer integration is disabled'}
-            
+        if self.cache is None:
+            return self._search_upstream(query, category, limit)
+        key = (self.provider, normalize_query(query), str(category or ''))
+        return self.cache.get_or_fetch(key, limit, lambda: self._search_upstream(query, category, limit))
+    
+    def _search_upstream(self, query, category=None, limit=50):
+        """Run one search against the indexer API"""
         try:
             search_url = self._build_search_url(query, category)
             if not search_url:
@@ -109,16 +205,20 @@ class IndexerManager:
             headers = self._get_headers()
             timeout = self.indexer_config.get('timeout', 30)
             
-            response = requests.get(search_url, headers=headers, timeout=timeout)
-            response.raise_for_status()
-            
-            # Parse response based on provider
-            if self.provider == 'prowlarr':
-                return self._parse_prowlarr_response(response.json(), limit)
-            elif self.provider in ['jackett', 'torznab']:
-                return self._parse_torznab_response(response.text, limit)
-            else:
-                return {'error': f'Unknown provider: {self.provider}'}
+            # XML feeds are parsed straight off the socket, so they are not read into memory first
+            streamed = self.provider in ['jackett', 'torznab']
+            response = http_client.get(search_url, headers=headers, timeout=timeout, stream=streamed)
+            with response:
+                response.raise_for_status()
+                
+                # Parse response based on provider
+                if self.provider == 'prowlarr':
+                    return self._parse_prowlarr_response(response.json(), limit)
+                elif streamed:
+                    response.raw.decode_content = True  # undo gzip/deflate while streaming
+                    return self._parse_torznab_response(response.raw, limit)
+                else:
+                    return {'error': f'Unknown provider: {self.provider}'}
                 
         except requests.exceptions.Timeout:
             return {'error': f'Search request timed out after {timeout} seconds'}
@@ -213,7 +313,7 @@ class IndexerManager:
         if '/download?' in download_url and 'apikey=' in download_url:
             try:
                 # Make request to Prowlarr download URL
-                response = requests.get(download_url, timeout=10, allow_redirects=True)
+                response = http_client.get(download_url, timeout=10, allow_redirects=True)
                 
                 # Check if response is a redirect to magnet link
                 if response.history:
@@ -243,15 +343,33 @@ class IndexerManager:
         return None
     
     def _parse_torznab_response(self, xml_data, limit):
-        """Parse Torznab/Jackett XML response"""
+        """Parse Torznab/Jackett XML incrementally, stopping once `limit` items are read
+
+        xml_data is the XML text/bytes or a binary stream such as the raw HTTP
+        response. Each item is dropped from the tree once converted, so memory
+        and time to the first results don't grow with the size of the feed.
+        """
+        import io
         import xml.etree.ElementTree as ET
         
+        if isinstance(xml_data, str):
+            xml_data = io.StringIO(xml_data)
+        elif isinstance(xml_data, bytes):
+            xml_data = io.BytesIO(xml_data)
+        
         results = []
+        parent = None
         try:
-            root = ET.fromstring(xml_data)
-            items = root.findall('.//item')[:limit]
-            
-            for item in items:
+            for event, item in ET.iterparse(xml_data, events=('start', 'end')):
+                if len(results) >= limit:
+                    break
+                if event == 'start':
+                    if item.tag == 'channel':
+                        parent = item
+                    continue
+                if item.tag != 'item':
+                    continue
+                
                 title = item.find('title')
                 size = item.find('size') 
                 link = item.find('link')
@@ -274,9 +392,15 @@ class IndexerManager:
                     'publish_date': ''
                 }
                 results.append(result)
+                # Free the parsed item (and channel-level elements seen so far)
+                item.clear()
+                if parent is not None:
+                    parent.clear()
                 
         except ET.ParseError as e:
-            return {'error': f'Failed to parse XML response: {e}'}
+            if not results:
+                return {'error': f'Failed to parse XML response: {e}'}
+            print(f"Torznab response cut short after {len(results)} items: {e}")
         
         return {
             'results': results,
@@ -292,7 +416,7 @@ class IndexerManager:
         try:
             if self.provider == 'prowlarr':
                 url = urljoin(self.provider_config['api_url'], '/api/v1/indexer')
-                response = requests.get(url, headers=self._get_headers(), timeout=10)
+                response = http_client.get(url, headers=self._get_headers(), timeout=10)
                 response.raise_for_status()
                 return {'indexers': response.json()}
             else:
@@ -329,10 +453,23 @@ class IndexerManager:
         except Exception as e:
             return {'success': False, 'error': f'Connection test failed: {e}'}
 
-# Convenience functions for backward compatibility
+# Process-wide manager and result cache, rebuilt only when the indexer config changes
+_manager = None
+_manager_lock = threading.Lock()
+search_cache = SearchCache()
+
 def get_indexer_manager():
-    """Get configured indexer manager instance"""
-    return IndexerManager()
+    """Get the shared indexer manager for the current configuration"""
+    global _manager
+    indexer_config = get_config().get_indexer_config()
+    with _manager_lock:
+        if _manager is None or _manager.indexer_config != indexer_config:
+            if _manager is not None:
+                search_cache.clear()  # results may come from a different indexer now
+            search_cache.ttl_sec = indexer_config['cache_ttl_sec']
+            search_cache.max_entries = indexer_config['cache_size']
+            _manager = IndexerManager(indexer_config, cache=search_cache)
+        return _manager
 
 def search_torrents(query, category=None, limit=50):
     """Search for torrents using configured indexer"""
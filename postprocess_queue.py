@@ -0,0 +1,373 @@
+"""
+LineDrive Post-Processing Queue
+Persistent, prioritised queue of post-capture ffmpeg jobs: remux, concat, transcode, thumbnail, loudness
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+
+import psutil
+
+from recording_scheduler import parse_job_time
+
+# Lower runs first. A quick remux should never wait behind an hour-long transcode.
+DEFAULT_PRIORITY = {
+    'remux': 0,
+    'concat': 5,
+    'thumbnail': 10,
+    'transcode': 20,
+    'loudnorm': 30,
+}
+# Only these are held back to the off-peak window; the others are cheap
+HEAVY_KINDS = ('transcode', 'loudnorm')
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Windows has no nice(); these map to the closest process priority classes
+WINDOWS_PRIORITY_CLASSES = [
+    (15, 0x00000040),  # IDLE_PRIORITY_CLASS
+    (1, 0x00004000),   # BELOW_NORMAL_PRIORITY_CLASS
+]
+
+CPU_SAMPLE_SEC = 1.0
+
+
+def in_offpeak_window(start, end, now=None):
+    """True if now falls inside the daily [start, end) window ('HH:MM'); always True if unset."""
+    start_hm, end_hm = parse_job_time(start), parse_job_time(end)
+    if not (start_hm and end_hm) or start_hm == end_hm:
+        return True
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    lo, hi = start_hm[0] * 60 + start_hm[1], end_hm[0] * 60 + end_hm[1]
+    if lo < hi:
+        return lo <= minute < hi
+    return minute >= lo or minute < hi  # window crosses midnight
+
+
+def low_priority_popen_kwargs(nice_level):
+    """Popen arguments that start a child at reduced CPU priority (Windows priority class).
+
+    On POSIX nothing is passed: preexec_fn is unsafe in a process with threads
+    (it can deadlock the fork), so lower_priority() renices the child instead.
+    """
+    if not nice_level or sys.platform != 'win32':
+        return {}
+    for threshold, priority_class in WINDOWS_PRIORITY_CLASSES:
+        if nice_level >= threshold:
+            return {'creationflags': priority_class}
+    return {}
+
+
+def lower_priority(proc, nice_level):
+    """Raise a started child's niceness by nice_level (POSIX; Windows uses the creation flags)."""
+    if not nice_level or sys.platform == 'win32':
+        return
+    try:
+        ps = psutil.Process(proc.pid)
+        ps.nice(min(19, ps.nice() + int(nice_level)))
+    except psutil.Error as e:
+        print(f"[PostProcess] Could not lower priority of pid {proc.pid}: {e}")
+
+
+def _work_path(path):
+    """Scratch file next to `path` for jobs that rewrite a recording in place."""
+    base, ext = os.path.splitext(path)
+    return f"{base}.part{ext}"
+
+
+def default_dest(kind, source):
+    base = os.path.splitext(source)[0]
+    if kind == 'transcode':
+        return base + '.mp4'
+    if kind == 'thumbnail':
+        return base + '.jpg'
+    if kind == 'concat':
+        # source is the playlist inside a segment folder; the joined file sits beside the folder
+        return os.path.splitext(os.path.dirname(source))[0] + '.mp4'
+    return source  # remux and loudnorm replace the recording
+
+
+def build_command(ffmpeg_bin, job):
+    """ffmpeg argv for a job. In-place kinds write to a .part file that replaces the source."""
+    opts = job.options
+    head = [ffmpeg_bin, '-hide_banner', '-nostdin', '-nostats', '-loglevel', 'error']
+    if job.kind == 'remux':
+        return head + ['-i', job.source, '-map', '0', '-c', 'copy', '-movflags', '+faststart',
+                       '-y', _work_path(job.dest)]
+    if job.kind == 'concat':
+        return head + ['-i', job.source, '-map', '0:v?', '-map', '0:a?', '-c', 'copy',
+                       '-movflags', '+faststart', '-y', job.dest]
+    if job.kind == 'transcode':
+        return head + ['-i', job.source, '-map', '0:v:0', '-map', '0:a?',
+                       '-c:v', 'libx264', '-preset', opts.get('preset', 'fast'), '-crf', str(opts.get('crf', 23)),
+                       '-c:a', 'aac', '-b:a', '160k', '-movflags', '+faststart', '-y', job.dest]
+    if job.kind == 'thumbnail':
+        return head + ['-ss', str(opts.get('offset_sec', 30)), '-i', job.source,
+                       '-vf', 'thumbnail,scale=480:-2', '-frames:v', '1', '-y', job.dest]
+    if job.kind == 'loudnorm':
+        return head + ['-i', job.source, '-map', '0:v?', '-map', '0:a?', '-c:v', 'copy',
+                       '-af', opts.get('filter', 'loudnorm=I=-23:TP=-2:LRA=7'),
+                       '-c:a', 'aac', '-b:a', '160k', '-movflags', '+faststart', '-y', _work_path(job.dest)]
+    raise ValueError(f"unknown post-processing job kind: {job.kind}")
+
+
+class PostProcessJob:
+    """One unit of post-capture work. Everything needed to rerun it is in to_dict()."""
+
+    def __init__(self, kind, source, dest=None, priority=None, recording_job_id=None,
+                 delete_source=False, then=None, options=None, job_id=None):
+        self.id = job_id
+        self.kind = kind
+        self.source = source
+        self.dest = dest or default_dest(kind, source)
+        self.priority = DEFAULT_PRIORITY.get(kind, 50) if priority is None else int(priority)
+        self.recording_job_id = recording_job_id
+        self.delete_source = delete_source
+        self.then = list(then or [])  # kinds to queue on this job's output once it succeeds
+        self.options = dict(options or {})
+        self.status = 'queued'
+        self.returncode = None
+        self.error = None
+        self.cpu_seconds = 0.0
+        self.queued_at = datetime.now().isoformat()
+        self.started_at = None
+        self.ended_at = None
+
+    @property
+    def output(self):
+        """The video the next job in the chain should read."""
+        return self.source if self.kind == 'thumbnail' else self.dest
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'source': self.source,
+            'dest': self.dest,
+            'priority': self.priority,
+            'recording_job_id': self.recording_job_id,
+            'delete_source': self.delete_source,
+            'then': self.then,
+            'options': self.options,
+            'status': self.status,
+            'returncode': self.returncode,
+            'error': self.error,
+            'cpu_seconds': round(self.cpu_seconds, 2),
+            'queued_at': self.queued_at,
+            'started_at': self.started_at,
+            'ended_at': self.ended_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['kind'], data['source'], dest=data.get('dest'), priority=data.get('priority'),
+                  recording_job_id=data.get('recording_job_id'), delete_source=data.get('delete_source', False),
+                  then=data.get('then'), options=data.get('options'), job_id=data.get('id'))
+        for key in ('status', 'returncode', 'error', 'queued_at', 'started_at', 'ended_at'):
+            if key in data:
+                setattr(job, key, data[key])
+        job.cpu_seconds = float(data.get('cpu_seconds') or 0.0)
+        return job
+
+
+class PostProcessQueue:
+    """Priority queue of ffmpeg jobs run by a fixed pool of low-priority child processes.
+
+    Each worker thread drives one ffmpeg process at a time, so `workers` is the
+    number of concurrent encodes. With a store (see ScheduleStore), every state
+    change is persisted and resume() re-queues work interrupted by a restart.
+    Heavy kinds only start inside the off-peak window, if one is configured.
+    on_done(job) is called after every job, successful or not.
+    """
+
+    def __init__(self, ffmpeg_bin, workers=1, nice_level=10, offpeak_start='', offpeak_end='',
+                 store=None, on_done=None, history_size=20):
+        self.ffmpeg_bin = ffmpeg_bin
+        self.workers = max(1, int(workers or 1))
+        self.nice_level = nice_level
+        self.offpeak_start = offpeak_start
+        self.offpeak_end = offpeak_end
+        self.store = store
+        self.on_done = on_done
+        self._pending = []
+        self._running = {}
+        self._history = deque(maxlen=history_size)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        self._seq = 0
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._threads = [threading.Thread(target=self._work, name=f"postprocess-{n + 1}", daemon=True)
+                             for n in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        window = f", off-peak {self.offpeak_start}-{self.offpeak_end}" if self.offpeak_start else ""
+        print(f"[PostProcess] {self.workers} worker(s) started (nice {self.nice_level}{window})")
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def resume(self):
+        """Re-queue jobs the store still has as queued or running. Returns how many."""
+        if not self.store:
+            return 0
+        jobs = [PostProcessJob.from_dict(d) for d in self.store.load_postprocess_jobs(ACTIVE_STATUSES)]
+        for job in jobs:
+            if job.status == 'running':
+                print(f"[PostProcess] Restarting interrupted {job.kind} of {os.path.basename(job.source)}")
+            job.status = 'queued'
+            job.started_at = None
+            self._persist(job)
+            self._push(job)
+        if jobs:
+            self.start()
+        return len(jobs)
+
+    def enqueue(self, kind, source, dest=None, priority=None, recording_job_id=None,
+                delete_source=False, then=None, **options):
+        job = PostProcessJob(kind, source, dest=dest, priority=priority, recording_job_id=recording_job_id,
+                             delete_source=delete_source, then=then, options=options)
+        build_command(self.ffmpeg_bin, job)  # reject unknown kinds before persisting
+        self._persist(job)
+        self.start()
+        self._push(job)
+        print(f"[PostProcess] Queued {job.kind} of {os.path.basename(source)} (priority {job.priority})")
+        return job
+
+    def _persist(self, job):
+        if not self.store:
+            return
+        try:
+            job.id = self.store.save_postprocess_job(job.to_dict())
+        except Exception as e:
+            print(f"[PostProcess] Could not persist job {job.id}: {e}")
+
+    def _push(self, job):
+        with self._cond:
+            self._seq += 1
+            if job.id is None:
+                job.id = self._seq  # in-memory queue without a store
+            self._pending.append((job.priority, self._seq, job))
+            self._cond.notify()
+
+    def _next_job(self):
+        """Highest-priority job allowed to start now, or None."""
+        offpeak = in_offpeak_window(self.offpeak_start, self.offpeak_end)
+        eligible = [p for p in self._pending if offpeak or p[2].kind not in HEAVY_KINDS]
+        if not eligible:
+            return None
+        best = min(eligible, key=lambda p: p[:2])
+        self._pending.remove(best)
+        return best[2]
+
+    def _work(self):
+        while not self._stop.is_set():
+            with self._cond:
+                job = self._next_job()
+                if job is None:
+                    # Re-check once a minute so held-back jobs start when the window opens
+                    self._cond.wait(60)
+                    continue
+                self._running[job.id] = job
+            self._run(job)
+            with self._cond:
+                self._running.pop(job.id, None)
+                self._history.appendleft(job)
+            self._persist(job)
+            if job.status == 'completed' and job.then:
+                self.enqueue(job.then[0], job.output, recording_job_id=job.recording_job_id,
+                             then=job.then[1:], **job.options)
+            if self.on_done:
+                try:
+                    self.on_done(job)
+                except Exception as e:
+                    print(f"[PostProcess] Completion callback failed for job {job.id}: {e}")
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started_at = datetime.now().isoformat()
+        job.cpu_seconds = 0.0
+        self._persist(job)
+        print(f"[PostProcess] {job.kind.title()} {os.path.basename(job.source)}")
+        in_place = job.dest == job.source
+        try:
+            cmd = build_command(self.ffmpeg_bin, job)
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    **low_priority_popen_kwargs(self.nice_level))
+            lower_priority(proc, self.nice_level)
+            stderr = []
+            reader = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+            reader.start()
+            self._account_cpu(job, proc)
+            reader.join()
+            job.returncode = proc.returncode
+            if proc.returncode == 0:
+                if in_place:
+                    os.replace(_work_path(job.dest), job.dest)
+                job.status = 'completed'
+            else:
+                job.status = 'failed'
+                tail = b''.join(stderr).decode(errors='ignore').strip().splitlines()[-1:] or ['']
+                job.error = f"ffmpeg exited with code {proc.returncode}: {tail[0]}"
+        except Exception as e:
+            job.status = 'failed'
+            job.error = str(e)
+        if in_place and job.status == 'failed' and os.path.exists(_work_path(job.dest)):
+            try:
+                os.remove(_work_path(job.dest))
+            except OSError:
+                pass
+        job.ended_at = datetime.now().isoformat()
+        if job.status == 'completed' and job.delete_source and not in_place:
+            try:
+                if job.kind == 'concat':
+                    shutil.rmtree(os.path.dirname(job.source))  # the whole segment folder
+                else:
+                    os.remove(job.source)
+            except OSError as e:
+                print(f"[PostProcess] Could not remove {job.source}: {e}")
+        print(f"[PostProcess] {job.kind.title()} {job.status}: {os.path.basename(job.dest)} "
+              f"({job.cpu_seconds:.1f}s CPU)" + (f" - {job.error}" if job.error else ""))
+
+    @staticmethod
+    def _account_cpu(job, proc):
+        """Wait for the child, sampling its user+system CPU time into job.cpu_seconds."""
+        try:
+            ps = psutil.Process(proc.pid)
+        except psutil.Error:
+            ps = None
+        while True:
+            if ps is not None:
+                try:
+                    times = ps.cpu_times()
+                    job.cpu_seconds = times.user + times.system
+                except psutil.Error:
+                    ps = None
+            try:
+                proc.wait(timeout=CPU_SAMPLE_SEC)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    def snapshot(self):
+        with self._cond:
+            pending = sorted(self._pending, key=lambda p: p[:2])
+            return {
+                'workers': self.workers,
+                'offpeak': {'start': self.offpeak_start, 'end': self.offpeak_end,
+                            'active': in_offpeak_window(self.offpeak_start, self.offpeak_end)},
+                'running': [j.to_dict() for j in self._running.values()],
+                'queued': [p[2].to_dict() for p in pending],
+                'recent': [j.to_dict() for j in self._history],
+            }
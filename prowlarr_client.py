@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import os
 import requests
+import http_client
 from typing import List, Dict, Any, Optional
 import logging
 
@@ -47,7 +48,7 @@ def _make_request(endpoint: str, params: Dict[str, Any] = None) -> requests.Resp
     headers = {"X-Api-Key": API_KEY}
     
     try:
-        resp = requests.get(url, headers=headers, params=params or {}, timeout=TIMEOUT)
+        resp = http_client.get(url, headers=headers, params=params or {}, timeout=TIMEOUT)
         resp.raise_for_status()
         return resp
     except requests.exceptions.ConnectionError as e:
@@ -0,0 +1,430 @@
+"""
+LineDrive Recording Manager
+Tracks concurrent HDHomeRun recording sessions, capped by the device tuner count
+"""
+
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import http_client
+from recording_writer import RecordingWriter, expected_size
+from stream_warmup import WarmupStats
+
+# ffmpeg writes a progress block about twice a second; keep the last two minutes
+METRICS_HISTORY = 240
+STDERR_TAIL = 20
+# Quiet console, machine-readable progress on stdout
+FFMPEG_PROGRESS_ARGS = ['-hide_banner', '-nostats', '-loglevel', 'warning', '-progress', 'pipe:1']
+# Direct (ffmpeg-less) captures: metrics sample interval, and how early the stream may end and still count
+DIRECT_SAMPLE_SEC = 0.5
+DIRECT_EARLY_EOF_SEC = 5
+
+
+def _number(value, suffix=''):
+    if value is None:
+        return None
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None  # 'N/A' before the first frame
+
+
+def parse_progress_block(fields, now=None):
+    """Turn one -progress key=value block into a metrics sample."""
+    out_us = _number(fields.get('out_time_us') or fields.get('out_time_ms'))  # both are microseconds
+    frame = _number(fields.get('frame'))
+    size = _number(fields.get('total_size'))
+    return {
+        'ts': now if now is not None else time.time(),
+        'frame': int(frame) if frame is not None else None,
+        'fps': _number(fields.get('fps')),
+        'bitrate_kbps': _number(fields.get('bitrate'), 'kbits/s'),
+        'speed': _number(fields.get('speed'), 'x'),
+        'drop_frames': int(_number(fields.get('drop_frames')) or 0),
+        'dup_frames': int(_number(fields.get('dup_frames')) or 0),
+        'out_time_sec': round(out_us / 1e6, 2) if out_us is not None and out_us >= 0 else None,
+        'total_size': int(size) if size is not None else None,
+    }
+
+
+class TunerBusyError(Exception):
+    """Raised when every tuner on the HDHomeRun is already recording."""
+    pass
+
+
+class RecordingSession:
+    """A single ffmpeg capture with its own stop control and exit status.
+
+    With a StreamWarmup the session opens the tuner stream itself, waits for a
+    keyframe at or after capture_start (epoch seconds) and feeds ffmpeg on
+    stdin; otherwise ffmpeg reads the tuner URL directly. With cmd=None there
+    is no ffmpeg at all: the warmed-up stream is written straight to filepath
+    through a RecordingWriter configured by writer_options.
+    """
+
+    def __init__(self, session_id, channel, filepath, cmd, duration_sec, job_id=None,
+                 warmup=None, capture_start=None, writer_options=None):
+        self.session_id = session_id
+        self.channel = channel
+        self.filepath = filepath
+        self.cmd = cmd
+        self.duration_sec = duration_sec
+        self.job_id = job_id
+        self.warmup = warmup
+        self.capture_start = capture_start
+        self.writer_options = writer_options or {}
+        self.writer = None
+        self.stop_event = threading.Event()
+        self.process = None
+        self.status = 'pending'
+        self.returncode = None
+        self.error = None
+        self.opened_at = None
+        self.started_at = None
+        self.ended_at = None
+        self.metrics = deque(maxlen=METRICS_HISTORY)
+        self.stderr_tail = deque(maxlen=STDERR_TAIL)
+        self._wake = threading.Event()  # set by stop() or when ffmpeg closes its output
+
+    def _read_progress(self, stream):
+        fields = {}
+        for raw in iter(stream.readline, b''):
+            key, _, value = raw.decode(errors='ignore').strip().partition('=')
+            if key == 'progress':
+                if fields:
+                    self.metrics.append(parse_progress_block(fields))
+                fields = {}
+            elif key:
+                fields[key] = value
+        self._wake.set()
+
+    def _read_stderr(self, stream):
+        for raw in iter(stream.readline, b''):
+            line = raw.decode(errors='ignore').strip()
+            if line:
+                self.stderr_tail.append(line)  # shown only if ffmpeg fails
+
+    def _warm_up(self):
+        """Open the tuner stream and wait for the first keyframe of the capture.
+
+        Returns False when the session was stopped meanwhile; raises if the
+        stream could not be opened.
+        """
+        self.status = 'warming'
+        try:
+            self.warmup.open()
+            found = self.warmup.wait_for_keyframe(not_before=self.capture_start)
+        except Exception:
+            self.warmup.close()
+            if self.stop_event.is_set():
+                return False
+            raise
+        if self.stop_event.is_set():
+            self.warmup.close()
+            return False
+        if not found:
+            print(f"[{self.session_id}] No keyframe within {self.warmup.keyframe_timeout}s; capturing anyway")
+        return True
+
+    def _finish_stopped(self):
+        self.status = 'stopped'
+        self.ended_at = datetime.now()
+        return self.returncode
+
+    def _record_progress(self, written):
+        """Metrics sample for a direct capture, in the same shape as parse_progress_block()."""
+        now = time.time()
+        if self.metrics and now - self.metrics[-1]['ts'] < DIRECT_SAMPLE_SEC:
+            return
+        elapsed = max(0.001, now - self.started_at.timestamp())
+        self.metrics.append({
+            'ts': now, 'frame': None, 'fps': None,
+            'bitrate_kbps': round(written * 8 / elapsed / 1000, 1), 'speed': 1.0,
+            'drop_frames': 0, 'dup_frames': 0,
+            'out_time_sec': round(elapsed, 2), 'total_size': written,
+        })
+
+    def _run_direct(self):
+        """Write the tuner's MPEG-TS to disk as-is, for duration_sec of wall-clock time."""
+        try:
+            if not self._warm_up():
+                return self._finish_stopped()
+        except Exception as e:
+            self.status = 'failed'
+            self.error = f"Could not open tuner stream: {e}"
+            self.ended_at = datetime.now()
+            return self.returncode
+        self.started_at = datetime.now()
+        self.status = 'recording'
+        deadline = time.time() + self.duration_sec
+        opts = self.writer_options
+        try:
+            self.writer = RecordingWriter(
+                self.filepath, expected_size(self.duration_sec, opts.get('preallocate_mbps')),
+                chunk_size=int(opts.get('chunk_mb') or 4) * 1024 * 1024, fsync_sec=opts.get('fsync_sec', 10))
+            with self.writer as f:
+                self.warmup.copy_to(f, self.stop_event, deadline, on_progress=self._record_progress)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.warmup.close()
+        self.ended_at = datetime.now()
+        short = deadline - time.time()
+        if self.stop_event.is_set():
+            self.status = 'stopped'
+        elif self.error or short > DIRECT_EARLY_EOF_SEC:
+            self.status = 'failed'
+            self.error = self.error or f"Tuner stream ended {int(short)}s early"
+            self.returncode = 1
+        else:
+            self.status = 'completed'
+            self.returncode = 0
+        return self.returncode
+
+    def run(self):
+        """Run ffmpeg (or the direct writer) until it exits or a stop is requested. Blocks the caller."""
+        self.opened_at = datetime.now()
+        if self.cmd is None:
+            return self._run_direct()
+        cmd = [self.cmd[0], *FFMPEG_PROGRESS_ARGS, *self.cmd[1:]]
+        if self.warmup:
+            try:
+                if not self._warm_up():
+                    return self._finish_stopped()
+                i = cmd.index(self.warmup.url)
+                cmd[i - 1:i + 1] = ['-f', 'mpegts', '-i', 'pipe:0']
+            except Exception as e:
+                print(f"[{self.session_id}] Tuner warm-up failed ({e}); letting ffmpeg open the stream")
+                self.warmup = None
+        self.started_at = datetime.now()
+        try:
+            self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except Exception as e:
+            if self.warmup:
+                self.warmup.close()
+            self.status = 'failed'
+            self.error = str(e)
+            self.ended_at = datetime.now()
+            return self.returncode
+        self.status = 'recording'
+        threading.Thread(target=self._read_progress, args=(self.process.stdout,), daemon=True).start()
+        stderr_thread = threading.Thread(target=self._read_stderr, args=(self.process.stderr,), daemon=True)
+        stderr_thread.start()
+        if self.warmup:
+            # stdin carries the stream; a stop closes it, and EOF finalizes the file
+            threading.Thread(target=self.warmup.pump, args=(self.process.stdin, self.stop_event),
+                             daemon=True).start()
+
+        self._wake.wait()
+        if self.stop_event.is_set() and self.process.poll() is None and not self.warmup:
+            self.status = 'stopping'
+            try:
+                # 'q' lets ffmpeg finalize the container instead of truncating it
+                self.process.stdin.write(b'q\n')
+                self.process.stdin.flush()
+            except Exception:
+                pass
+        elif self.stop_event.is_set():
+            self.status = 'stopping'
+
+        self.returncode = self.process.wait()
+        stderr_thread.join(5)
+        self.ended_at = datetime.now()
+        if self.stop_event.is_set():
+            self.status = 'stopped'
+        elif self.returncode == 0:
+            self.status = 'completed'
+        else:
+            self.status = 'failed'
+            last = f": {self.stderr_tail[-1]}" if self.stderr_tail else ""
+            self.error = f"ffmpeg exited with code {self.returncode}{last}"
+            print(f"[{self.session_id}] {self.error}")
+            for line in self.stderr_tail:
+                print(f"[{self.session_id}]   {line}")
+        return self.returncode
+
+    def stop(self):
+        """Ask the session to stop gracefully."""
+        self.stop_event.set()
+        self._wake.set()
+        if self.warmup and self.status == 'warming':
+            self.warmup.close()  # unblocks wait_for_keyframe()
+
+    def latest_metrics(self):
+        return self.metrics[-1] if self.metrics else None
+
+    def is_active(self):
+        return self.status in ('pending', 'warming', 'recording', 'stopping')
+
+    def elapsed_seconds(self):
+        if not self.started_at:
+            return 0
+        end = self.ended_at or datetime.now()
+        return max(0, int((end - self.started_at).total_seconds()))
+
+    def progress(self):
+        """Fraction of the requested duration captured so far (0.0 - 1.0)."""
+        if not self.duration_sec:
+            return 0.0
+        latest = self.latest_metrics()
+        captured = latest['out_time_sec'] if latest and latest['out_time_sec'] is not None else self.elapsed_seconds()
+        return min(1.0, captured / float(self.duration_sec))
+
+    def to_dict(self, history=False):
+        data = {
+            'session_id': self.session_id,
+            'job_id': self.job_id,
+            'channel': self.channel,
+            'file': self.filepath,
+            'status': self.status,
+            'pid': self.process.pid if self.process else None,
+            'returncode': self.returncode,
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'ended_at': self.ended_at.isoformat() if self.ended_at else None,
+            'elapsed_sec': self.elapsed_seconds(),
+            'duration_sec': self.duration_sec,
+            'progress': round(self.progress(), 3),
+            'metrics': self.latest_metrics(),
+            'warmup': self.warmup.to_dict() if self.warmup else None,
+            'writer': self.writer.stats() if self.writer else None,
+        }
+        if history:
+            data['metrics_history'] = list(self.metrics)
+        return data
+
+
+class RecordingManager:
+    """Keeps one RecordingSession per active job, never more than the tuner count."""
+
+    DEFAULT_TUNER_COUNT = 2
+
+    def __init__(self, hdhr_ip, tuner_count=None, history_size=20, listener=None, writer_options=None):
+        self.hdhr_ip = hdhr_ip
+        self.writer_options = writer_options  # RecordingWriter settings for direct captures
+        self.listener = listener  # listener(action, session) on 'started' and 'finished'
+        self._configured_tuners = tuner_count or None
+        self._detected_tuners = None
+        self._detect_lock = threading.Lock()  # one discover.json probe at a time, never under _lock
+        self._sessions = {}
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self.warmup_stats = WarmupStats()
+
+    def get_tuner_count(self, refresh=False):
+        """Tuner count from config, else from the device's discover.json (cached).
+
+        Must not be called while holding _lock: the first call may wait on the
+        device, and that would stall every session start, stop and lookup.
+        """
+        if self._configured_tuners:
+            return int(self._configured_tuners)
+        if self._detected_tuners is not None and not refresh:
+            return self._detected_tuners
+        with self._detect_lock:
+            if self._detected_tuners is None or refresh:
+                try:
+                    r = http_client.device_get(f"http://{self.hdhr_ip}/discover.json", timeout=5)
+                    r.raise_for_status()
+                    count = int(r.json().get('TunerCount') or self.DEFAULT_TUNER_COUNT)
+                    print(f"HDHomeRun reports {count} tuners")
+                except Exception as e:
+                    print(f"Could not read tuner count from HDHomeRun ({e}); assuming {self.DEFAULT_TUNER_COUNT}")
+                    count = self.DEFAULT_TUNER_COUNT
+                self._detected_tuners = count
+            return self._detected_tuners
+
+    def free_tuners(self):
+        tuners = self.get_tuner_count()
+        with self._lock:
+            return max(0, tuners - len(self._sessions))
+
+    def open_session(self, session_id, channel, filepath, cmd, duration_sec, job_id=None,
+                     warmup=None, capture_start=None):
+        """Reserve a tuner for a new session. Raises TunerBusyError when none is free."""
+        tuners = self.get_tuner_count()
+        with self._lock:
+            if session_id in self._sessions:
+                raise TunerBusyError(f"Session '{session_id}' is already recording")
+            if len(self._sessions) >= tuners:
+                busy = ', '.join(s.channel for s in self._sessions.values())
+                raise TunerBusyError(f"All {tuners} tuners are busy (recording {busy})")
+            session = RecordingSession(session_id, channel, filepath, cmd, duration_sec, job_id=job_id,
+                                       warmup=warmup, capture_start=capture_start,
+                                       writer_options=self.writer_options)
+            self._sessions[session_id] = session
+            return session
+
+    def close_session(self, session):
+        """Release the tuner held by a finished session and keep it in recent history."""
+        with self._lock:
+            if self._sessions.get(session.session_id) is session:
+                del self._sessions[session.session_id]
+            self._history.appendleft(session)
+
+    def record(self, session_id, channel, filepath, cmd, duration_sec, job_id=None,
+               warmup=None, capture_start=None):
+        """Open a session, run it to completion and release its tuner."""
+        session = self.open_session(session_id, channel, filepath, cmd, duration_sec, job_id=job_id,
+                                    warmup=warmup, capture_start=capture_start)
+        self._notify('started', session)
+        try:
+            session.run()
+            if session.warmup:
+                self.warmup_stats.record(channel, session.warmup.first_keyframe_sec)
+        finally:
+            self.close_session(session)
+            self._notify('finished', session)
+        return session
+
+    def _notify(self, action, session):
+        if not self.listener:
+            return
+        try:
+            self.listener(action, session)
+        except Exception as e:
+            print(f"Recording listener failed on {action} for {session.session_id}: {e}")
+
+    def stop(self, session_id=None):
+        """Stop one session, or every active session when no id is given."""
+        with self._lock:
+            if session_id is None:
+                targets = list(self._sessions.values())
+            else:
+                targets = [s for s in self._sessions.values()
+                           if s.session_id == str(session_id) or str(s.job_id) == str(session_id)]
+        for session in targets:
+            session.stop()
+        return len(targets)
+
+    def get(self, session_id):
+        """Active session by id, else the most recent finished one with that id."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = next((s for s in self._history if s.session_id == session_id), None)
+            return session
+
+    def active_sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def recent_sessions(self):
+        with self._lock:
+            return list(self._history)
+
+    def snapshot(self):
+        """JSON-friendly view of active and recently finished sessions."""
+        return {
+            'tuner_count': self.get_tuner_count(),
+            'active': [s.to_dict() for s in self.active_sessions()],
+            'recent': [s.to_dict() for s in self.recent_sessions()],
+            'warmup': self.warmup_stats.snapshot(),
+        }
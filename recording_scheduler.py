@@ -0,0 +1,251 @@
+"""
+LineDrive Recording Scheduler
+Fires scheduled recordings from a heap of absolute start times instead of a polling loop
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime, timedelta
+
+WEEKDAY_INDEX = {'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6}
+
+# Never-started one-offs and recurring slots are still fired if the scheduler
+# wakes up (or restarts) this many seconds after their start time.
+DEFAULT_GRACE_SEC = 60
+
+
+def parse_job_time(value):
+    """Parse '19:30', '7:30 PM' or '7:30PM' into (hour, minute); None if unparseable."""
+    if not value:
+        return None
+    text = str(value).strip().upper()
+    try:
+        if text.endswith('AM') or text.endswith('PM'):
+            parsed = datetime.strptime(text.replace(' ', ''), '%I:%M%p')
+            return parsed.hour, parsed.minute
+        hour, minute = map(int, text.split(':')[:2])
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return hour, minute
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def recurrence_weekdays(job):
+    """Weekday numbers (Mon=0) a recurring rule runs on; empty set means every day."""
+    days = (job.get('recurrence') or {}).get('days') or []
+    result = set()
+    for day in days:
+        idx = WEEKDAY_INDEX.get(str(day).strip().lower()[:3])
+        if idx is not None:
+            result.add(idx)
+    return result
+
+
+def _parse_iso(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def next_fire_time(job, now=None, grace_sec=DEFAULT_GRACE_SEC):
+    """Absolute local datetime at which a job should start next, or None if it never will."""
+    now = now or datetime.now()
+    earliest = now - timedelta(seconds=grace_sec)
+    job_type = job.get('type')
+
+    if job_type == 'recurring_series':
+        if job.get('status') != 'active':
+            return None
+        hm = parse_job_time(job.get('time') or (job.get('recurrence') or {}).get('time'))
+        if not hm:
+            return None
+        last_started = _parse_iso(job.get('last_started_at'))
+        if last_started and last_started > earliest:
+            earliest = last_started + timedelta(seconds=1)
+        weekdays = recurrence_weekdays(job)
+        day = earliest.replace(hour=hm[0], minute=hm[1], second=0, microsecond=0)
+        for _ in range(8):
+            if day >= earliest and (not weekdays or day.weekday() in weekdays):
+                return day
+            day += timedelta(days=1)
+        return None
+
+    # One-off episode recordings created from the EPG / NLP agent
+    if job.get('status') != 'scheduled' or job_type == 'one_time_timeslot':
+        return None
+    if job.get('last_started_at'):
+        return None
+    if not (job.get('channel_number') or job.get('channel')):
+        return None
+    hm = parse_job_time(job.get('time'))
+    if not (hm and job.get('date')):
+        return None
+    try:
+        start = datetime.strptime(job['date'], '%Y-%m-%d').replace(hour=hm[0], minute=hm[1])
+    except (TypeError, ValueError):
+        return None
+    return start if start >= earliest else None
+
+
+def _fingerprint(job):
+    """Fields that influence the next fire time; a change means the entry is recomputed."""
+    rec = job.get('recurrence') or {}
+    return (job.get('type'), job.get('status'), job.get('date'), job.get('time'),
+            tuple(rec.get('days') or ()), rec.get('time'), job.get('last_started_at'),
+            job.get('channel_number'), job.get('pre_padding_sec'))
+
+
+class RecordingScheduler:
+    """Priority queue of next start times; sleeps until the earliest one is due.
+
+    Each job has at most one live heap entry. Replaced or cancelled entries are
+    dropped lazily when they reach the top of the heap, so adding, changing or
+    cancelling a job costs O(log n).
+
+    lead_fn(job) returns how many seconds before its start a job should be
+    woken (pre-roll padding plus tuner warm-up); on_fire still receives the
+    real start time.
+    """
+
+    def __init__(self, on_fire, grace_sec=DEFAULT_GRACE_SEC, lead_fn=None):
+        self.on_fire = on_fire
+        self.grace_sec = grace_sec
+        self.lead_fn = lead_fn
+        self._heap = []
+        self._entries = {}   # job id -> (wake_ts, seq, start_ts)
+        self._jobs = {}      # job id -> job dict
+        self._fingerprints = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    def _push(self, job_id, job, now=None):
+        fire_dt = next_fire_time(job, now=now, grace_sec=self.grace_sec)
+        self._jobs[job_id] = job
+        self._fingerprints[job_id] = _fingerprint(job)
+        if fire_dt is None:
+            self._entries.pop(job_id, None)
+            return None
+        start_ts = fire_dt.timestamp()
+        lead = 0
+        if self.lead_fn:
+            try:
+                lead = max(0, float(self.lead_fn(job) or 0))
+            except (TypeError, ValueError):
+                lead = 0
+        entry = (start_ts - lead, next(self._seq), start_ts)
+        self._entries[job_id] = entry
+        heapq.heappush(self._heap, (entry[0], entry[1], job_id))
+        return fire_dt
+
+    def schedule(self, job):
+        """Add or recompute a single job's next start."""
+        job_id = job.get('id')
+        if job_id is None:
+            return None
+        with self._cond:
+            fire_dt = self._push(job_id, job)
+            self._cond.notify()
+        return fire_dt
+
+    def cancel(self, job_id):
+        with self._cond:
+            self._entries.pop(job_id, None)
+            self._jobs.pop(job_id, None)
+            self._fingerprints.pop(job_id, None)
+            self._cond.notify()
+
+    def sync(self, jobs):
+        """Reconcile with the job list, recomputing only jobs whose timing fields changed."""
+        with self._cond:
+            seen = set()
+            changed = 0
+            for job in jobs:
+                if not isinstance(job, dict) or job.get('id') is None:
+                    continue
+                job_id = job['id']
+                seen.add(job_id)
+                if self._jobs.get(job_id) is job and self._fingerprints.get(job_id) == _fingerprint(job):
+                    continue
+                self._push(job_id, job)
+                changed += 1
+            for job_id in [j for j in self._jobs if j not in seen]:
+                self._entries.pop(job_id, None)
+                self._jobs.pop(job_id, None)
+                self._fingerprints.pop(job_id, None)
+                changed += 1
+            if changed:
+                self._cond.notify()
+        return changed
+
+    def next_fire_for(self, job_id):
+        with self._cond:
+            entry = self._entries.get(job_id)
+        return datetime.fromtimestamp(entry[2]) if entry else None
+
+    def upcoming(self, limit=10):
+        """Next scheduled starts as (datetime, job) pairs, earliest first."""
+        with self._cond:
+            live = sorted((start_ts, job_id) for job_id, (_, _, start_ts) in self._entries.items())
+            return [(datetime.fromtimestamp(ts), self._jobs[job_id]) for ts, job_id in live[:limit]]
+
+    def _pop_due(self):
+        """Wait for the earliest live entry to become due and pop it. Called with the lock held."""
+        while self._running:
+            while self._heap:
+                wake_ts, seq, job_id = self._heap[0]
+                if self._entries.get(job_id, ())[:2] == (wake_ts, seq):
+                    break
+                heapq.heappop(self._heap)  # superseded or cancelled entry
+            if not self._heap:
+                self._cond.wait()
+                continue
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                self._cond.wait(timeout=delay)
+                continue
+            heapq.heappop(self._heap)
+            return self._entries.pop(job_id)[2], job_id
+        return None
+
+    def run(self):
+        print("[Scheduler] Event-driven scheduler started")
+        while True:
+            with self._cond:
+                due = self._pop_due()
+                if due is None:
+                    return
+                fire_ts, job_id = due
+                job = self._jobs.get(job_id)
+            if job is None:
+                continue
+            fire_dt = datetime.fromtimestamp(fire_ts)
+            try:
+                self.on_fire(job, fire_dt)
+            except Exception as e:
+                print(f"[Scheduler] Failed to start job #{job_id}: {e}")
+            # Queue the following occurrence (recurring rules) even if the callback
+            # did not update the job; one-offs drop out because they are started.
+            with self._cond:
+                if self._jobs.get(job_id) is job and job_id not in self._entries:
+                    self._push(job_id, job, now=max(datetime.now(), fire_dt + timedelta(seconds=self.grace_sec + 1)))
+
+    def start(self, jobs=None):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        if jobs is not None:
+            self.sync(jobs)
+        self._running = True
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
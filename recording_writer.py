@@ -0,0 +1,181 @@
+"""
+LineDrive Recording Writer
+Bounded-memory file writer for direct captures: preallocated, coalesced into large aligned writes, fsynced on a schedule
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import sys
+import time
+
+ALIGN = 64 * 1024
+DEFAULT_CHUNK = 4 * 1024 * 1024   # one disk write per ~1.7 s at 19.4 Mbit/s
+DEFAULT_FSYNC_SEC = 10
+
+
+def expected_size(duration_sec, mbps):
+    """Bytes a capture of duration_sec at mbps (megabits/s) should need."""
+    if not duration_sec or not mbps:
+        return 0
+    return int(duration_sec * mbps * 1_000_000 / 8)
+
+
+FALLOC_FL_KEEP_SIZE = 0x01
+_fallocate = None
+
+
+def _linux_fallocate():
+    """libc fallocate(2), loaded once; None if unavailable."""
+    global _fallocate
+    if _fallocate is None:
+        try:
+            func = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True).fallocate
+            func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong]
+            _fallocate = func
+        except (OSError, AttributeError):
+            _fallocate = False
+    return _fallocate or None
+
+
+def preallocate(fd, size):
+    """Reserve size bytes for the file so concurrent recordings don't interleave their extents.
+
+    On Linux this is fallocate(2) with FALLOC_FL_KEEP_SIZE: the blocks are
+    reserved past the end of file without zeroing them, so the file grows only
+    as data is written and a crash leaves nothing extra behind. Filesystems
+    without native support (NFS, SMB, some FUSE mounts) answer EOPNOTSUPP and
+    the file is simply not preallocated. posix_fallocate() is deliberately not
+    used: glibc emulates it there by writing every block, which would stall the
+    capture start for seconds right after warm-up found the keyframe.
+
+    On Windows, extending the file with truncate() reserves the clusters
+    (NTFS files are not sparse by default). close() trims the unused part, but
+    after a crash the file keeps a zero-filled tail up to the reserved size.
+    Elsewhere nothing is reserved.
+    """
+    if size <= 0:
+        return False
+    try:
+        if sys.platform.startswith('linux'):
+            fallocate = _linux_fallocate()
+            if fallocate is None:
+                return False
+            if fallocate(fd, FALLOC_FL_KEEP_SIZE, 0, size) != 0:
+                err = ctypes.get_errno()
+                if err in (errno.EOPNOTSUPP, errno.ENOSYS):
+                    return False  # no native support; writing zeroes would cost more than it saves
+                raise OSError(err, os.strerror(err))
+            return True
+        if os.name == 'nt':
+            os.ftruncate(fd, size)
+            return True
+    except OSError as e:
+        print(f"[Writer] Could not preallocate {size // (1024 * 1024)} MiB: {e}")
+    return False
+
+
+class RecordingWriter:
+    """File-like sink that turns many small stream writes into few large ones.
+
+    Incoming data is copied into one reusable buffer of chunk_size bytes (a
+    multiple of 64 KiB) and written out only when it is full, so every write
+    except the last lands on an aligned offset. fsync runs at most every
+    fsync_sec seconds instead of per write. Memory stays at chunk_size no
+    matter how long the recording is. close() trims the preallocated tail
+    (on Linux it only releases the reserved blocks; the size is already right).
+    """
+
+    def __init__(self, path, expected_bytes=0, chunk_size=DEFAULT_CHUNK, fsync_sec=DEFAULT_FSYNC_SEC):
+        self.path = path
+        self.chunk_size = max(ALIGN, chunk_size // ALIGN * ALIGN)
+        self.fsync_sec = fsync_sec
+        self._buf = bytearray(self.chunk_size)
+        self._view = memoryview(self._buf)
+        self._fill = 0
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+        self.preallocated = expected_bytes if preallocate(self._fd, expected_bytes) else 0
+        self.opened_at = time.time()
+        self._last_fsync = self.opened_at
+        self.closed = False
+        self.bytes_in = 0
+        self.bytes_written = 0
+        self.writes = 0
+        self.write_sec = 0.0
+        self.max_write_ms = 0.0
+        self.fsyncs = 0
+        self.max_fsync_ms = 0.0
+
+    def write(self, data):
+        """Buffer data, writing full chunks to disk. Returns len(data) like a file."""
+        data = memoryview(data)
+        size = len(data)
+        self.bytes_in += size
+        while data:
+            n = min(len(data), self.chunk_size - self._fill)
+            self._view[self._fill:self._fill + n] = data[:n]
+            self._fill += n
+            data = data[n:]
+            if self._fill == self.chunk_size:
+                self._flush_buffer()
+        if self.fsync_sec and time.time() - self._last_fsync >= self.fsync_sec:
+            self._fsync()
+        return size
+
+    def _flush_buffer(self):
+        if not self._fill:
+            return
+        started = time.perf_counter()
+        pending = self._view[:self._fill]
+        while pending:
+            pending = pending[os.write(self._fd, pending):]
+        elapsed = time.perf_counter() - started
+        self.writes += 1
+        self.write_sec += elapsed
+        self.max_write_ms = max(self.max_write_ms, elapsed * 1000)
+        self.bytes_written += self._fill
+        self._fill = 0
+
+    def _fsync(self):
+        started = time.perf_counter()
+        os.fsync(self._fd)
+        self.max_fsync_ms = max(self.max_fsync_ms, (time.perf_counter() - started) * 1000)
+        self.fsyncs += 1
+        self._last_fsync = time.time()
+
+    def flush(self):
+        self._flush_buffer()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._flush_buffer()
+            if self.preallocated:
+                os.ftruncate(self._fd, self.bytes_written)
+            self._fsync()
+        finally:
+            os.close(self._fd)
+            self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        """Throughput and latency counters for the progress views."""
+        elapsed = max(0.001, time.time() - self.opened_at)
+        return {
+            'bytes_written': self.bytes_written,
+            'buffered': self._fill,
+            'preallocated': self.preallocated,
+            'writes': self.writes,
+            'avg_write_ms': round(self.write_sec / self.writes * 1000, 2) if self.writes else None,
+            'max_write_ms': round(self.max_write_ms, 2),
+            'fsyncs': self.fsyncs,
+            'max_fsync_ms': round(self.max_fsync_ms, 2),
+            'throughput_mbps': round(self.bytes_in * 8 / elapsed / 1_000_000, 2),
+        }
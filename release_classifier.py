@@ -0,0 +1,194 @@
+"""
+LineDrive Release Classifier
+Single-pass torrent title parser: TV/movie verdict plus season, episode, resolution, source and year
+"""
+
+import re
+from functools import lru_cache
+
+# Every indicator is one alternative of a single precompiled pattern, scanned once over the
+# lowercased title with finditer(). The scan is anchored where a word starts, and suffix
+# indicators (DTS, HDCAM) match the whole word. Each alternative begins with a plain
+# character so the regex engine can rule it out with one comparison, and ends in an empty
+# named group that tags it (m.lastgroup). Alternatives sharing a start are ordered
+# longest-first: s01e02 before s01, episode 3 before e03, complete season before season.
+# Words inside an indicator may be separated by spaces, dots, dashes or underscores.
+_TOKEN_RE = re.compile(r"""
+    (?<![a-z0-9])(?:
+      s(?P<sxe_season>\d+)[\s._-]?e(?P<sxe_episode>\d+)(?P<sxe>)
+    | (?=\d)(?:
+        (?P<cross_season>\d{1,2})x(?P<cross_episode>\d{2,3})\b(?P<cross>)
+      | \d{3,4}x(?P<dims_res>2160|1080|720|576|480)\b(?P<dims>)
+      | (?P<date_year>(?:19|20)\d{2})\.\d{2}\.\d{2}\b(?P<date>)
+      | (?:19|20)\d{2}\b(?P<year>)
+      | (?:2160|1080|720|576|480)(?P<res>)
+      )
+    | 4k(?P<res_4k>)
+    | (?P<whole_kind>complete|full)[\s._-]*season(?:[\s._-]*(?P<whole_season>\d{1,3})(?!\d))?(?P<whole_pack>[\s._-]*pack)?(?P<whole>)
+    | season[\s._-]*pack(?P<season_pack>)
+    | season[\s._-]*(?P<season_no>\d{1,3})(?!\d)(?P<season_pack_tail>[\s._-]*pack)?(?P<season>)
+    | season(?P<season_word>)
+    | episode[\s._-]*(?P<episode_no>\d+)(?P<episode>)
+    | episode(?P<episode_word>)
+    | ep[\s._-]*(?P<ep_no>\d+)(?P<ep>)
+    | tv[\s._-]*series(?P<tv_series>)
+    | (?:web-?dl|webrip|hdtv|blu-?ray|bdrip|brrip|dvdrip|hdrip|telesync|r5\b)(?P<source>)
+    | (?:director|extended|cut|unrated|remastered|criterion)(?P<edition>)
+    | s(?P<tag_season>\d{1,2})\b(?P<season_tag>)
+    | e(?P<e_no>\d{2,})(?P<e_only>)
+    | [a-z]*(?:cam\b(?P<cam>)|ts\b(?P<ts>))
+    )
+""", re.VERBOSE)
+
+RESOLUTIONS = {'2160': '2160p', '4k': '2160p', '1080': '1080p', '720': '720p', '576': '576p', '480': '480p'}
+RESOLUTION_RANK = {'2160p': 4, '1080p': 3, '720p': 2, '576p': 1, '480p': 0}
+
+# matched source text -> (label, movie indicator or None, counts towards the TV release pattern)
+SOURCES = {
+    'web-dl': ('WEB-DL', None, True), 'webdl': ('WEB-DL', None, True),
+    'webrip': ('WEBRip', None, True), 'hdtv': ('HDTV', None, True),
+    'bluray': ('BluRay', 'bluray', False), 'blu-ray': ('BluRay', 'bluray', False),
+    'bdrip': ('BDRip', 'bdrip', False), 'brrip': ('BRRip', None, False),
+    'dvdrip': ('DVDRip', 'dvdrip', False), 'hdrip': ('HDRip', None, False),
+    'telesync': ('TS', 'ts', False), 'r5': ('R5', 'r5', False),
+}
+
+
+class ReleaseInfo:
+    """What one pass over a release name found. Treat as read-only: classify() caches instances."""
+
+    def __init__(self, title):
+        self.title = title
+        self.season = None
+        self.episode = None
+        self.resolution = None
+        self.source = None
+        self.year = None
+        self.tv = set()      # TV indicators seen (each counts once, like a pattern that matched)
+        self.movie = set()   # movie indicators seen
+        self.tv_hint = False  # bare "S01", "season" or "episode" words, only used to break ties
+
+    @property
+    def quality(self):
+        return self.resolution or 'unknown'
+
+    @property
+    def content_type(self):
+        """'TV', 'Movies' or 'Uncategorized', by which side has more indicators."""
+        tv_score, movie_score = len(self.tv), len(self.movie)
+        if tv_score > movie_score:
+            return "TV"
+        if movie_score > tv_score:
+            return "Movies"
+        if self.tv_hint:
+            return "TV"
+        if self.year:
+            return "Movies"
+        return "Uncategorized"
+
+    @property
+    def is_season_pack(self):
+        return self.season is not None and self.episode is None
+
+    def to_dict(self):
+        return {
+            'content_type': self.content_type,
+            'season': self.season,
+            'episode': self.episode,
+            'resolution': self.resolution,
+            'source': self.source,
+            'year': self.year,
+        }
+
+
+@lru_cache(maxsize=4096)
+def classify(title):
+    """Parse a release name in one scan. Cached, since the torrent list repeats the same names on every poll."""
+    info = ReleaseInfo(title)
+    tv, movie = info.tv, info.movie
+    tv_source_seen = director_seen = extended_seen = False
+    weak_source = None
+    season = episode = None
+    for m in _TOKEN_RE.finditer(title.lower()):
+        kind = m.lastgroup
+        if kind in ('sxe', 'cross'):
+            tv.add(kind)
+            num = m.group(kind + '_episode')
+            if kind == 'sxe' and len(num) >= 2:
+                tv.add('e_num')  # the E01 inside S01E01 counts on its own, as a separate pattern would
+            if season is None:
+                season, episode = int(m.group(kind + '_season')), int(num)
+        elif kind == 'season':
+            tv.add('season')
+            if m.group('season_pack_tail'):
+                tv.add('season_pack')
+            if season is None:
+                season = int(m.group('season_no'))
+        elif kind == 'whole':
+            tv.add(m.group('whole_kind') + '_season')
+            if m.group('whole_pack'):
+                tv.add('season_pack')
+            if m.group('whole_season'):
+                tv.add('season')
+                if season is None:
+                    season = int(m.group('whole_season'))
+        elif kind in ('season_pack', 'tv_series'):
+            tv.add(kind)
+        elif kind in ('episode', 'ep', 'e_only'):
+            tv.add('e_num' if kind == 'e_only' else kind)
+            info.tv_hint = info.tv_hint or kind != 'e_only'
+            if episode is None:
+                episode = int(m.group({'episode': 'episode_no', 'ep': 'ep_no', 'e_only': 'e_no'}[kind]))
+        elif kind in ('season_word', 'episode_word'):
+            info.tv_hint = True
+        elif kind == 'season_tag':
+            info.tv_hint = True
+            if season is None:
+                season = int(m.group('tag_season'))
+        elif kind in ('date', 'year'):
+            if kind == 'date':
+                tv.add('date')
+            movie.add('year')
+            info.year = int(m.group('date_year') if kind == 'date' else m.group())
+        elif kind in ('res', 'res_4k', 'dims'):
+            res = RESOLUTIONS[m.group('dims_res') if kind == 'dims' else m.group()]
+            if tv_source_seen:
+                tv.add('tv_release')
+            if info.resolution is None or RESOLUTION_RANK[res] > RESOLUTION_RANK[info.resolution]:
+                info.resolution = res
+        elif kind == 'source':
+            label, indicator, tv_source = SOURCES[m.group()]
+            if indicator:
+                movie.add(indicator)
+            tv_source_seen = tv_source_seen or tv_source
+            info.source = info.source or label
+        elif kind == 'cam':
+            movie.add('cam')  # CAM, HDCAM
+            info.source = info.source or 'CAM'
+        elif kind == 'ts':
+            movie.add('ts')  # TS, HDTS, but also the DTS audio tag, so only a fallback source
+            weak_source = weak_source or 'TS'
+        elif kind == 'edition':
+            word = m.group()
+            if word == 'director':
+                director_seen = True
+            elif word == 'extended':
+                extended_seen = True
+            elif word == 'cut':
+                if director_seen:
+                    movie.add('directors_cut')
+                if extended_seen:
+                    movie.add('extended_cut')
+            else:
+                movie.add(word)
+    info.source = info.source or weak_source
+    info.season, info.episode = season, episode
+    return info
+
+
+def detect_content_type(title):
+    return classify(title).content_type
+
+
+def quality_hint(title):
+    return classify(title).quality
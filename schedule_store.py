@@ -0,0 +1,254 @@
+"""
+LineDrive Schedule Store
+Transactional SQLite storage for scheduled jobs, recurrence rules, recording history and post-processing jobs
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    type TEXT,
+    status TEXT,
+    title TEXT,
+    channel_number TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_channel ON jobs(channel_number);
+-- Start times live in the in-memory RecordingScheduler; databases from before that keep an
+-- unused next_fire_at column, but not its index
+DROP INDEX IF EXISTS idx_jobs_next_fire;
+
+CREATE TABLE IF NOT EXISTS recurrence_rules (
+    job_id INTEGER PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+    pattern TEXT,
+    days TEXT,
+    time TEXT,
+    description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS recording_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER,
+    title TEXT,
+    channel_number TEXT,
+    started_at TEXT,
+    ended_at TEXT,
+    status TEXT,
+    exit_code INTEGER,
+    output_file TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_job ON recording_history(job_id);
+CREATE INDEX IF NOT EXISTS idx_history_started ON recording_history(started_at);
+
+CREATE TABLE IF NOT EXISTS postprocess_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT,
+    status TEXT,
+    priority INTEGER,
+    recording_job_id INTEGER,
+    cpu_seconds REAL,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_postprocess_status ON postprocess_jobs(status);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ScheduleStore:
+    """Row-level job persistence. All writes go through one lock and one transaction each."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._row_cache = {}  # job id -> serialized row, used to skip unchanged jobs
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self):
+        return _Transaction(self)
+
+    def _reload_row_cache(self):
+        rows = self._conn.execute("SELECT id, data FROM jobs").fetchall()
+        self._row_cache = {r['id']: r['data'] for r in rows}
+
+    def _write_job(self, job, serialized):
+        self._conn.execute(
+            """INSERT INTO jobs (id, type, status, title, channel_number, updated_at, data)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET type=excluded.type, status=excluded.status,
+                   title=excluded.title, channel_number=excluded.channel_number,
+                   updated_at=excluded.updated_at, data=excluded.data""",
+            (job['id'], job.get('type'), job.get('status'), job.get('title'),
+             str(job.get('channel_number') or '') or None,
+             datetime.now().isoformat(), serialized))
+        rec = job.get('recurrence')
+        if job.get('type') == 'recurring_series' and isinstance(rec, dict):
+            self._conn.execute(
+                """INSERT OR REPLACE INTO recurrence_rules (job_id, pattern, days, time, description)
+                   VALUES (?, ?, ?, ?, ?)""",
+                (job['id'], rec.get('pattern') or job.get('pattern'), json.dumps(rec.get('days') or []),
+                 rec.get('time') or job.get('time'), rec.get('description')))
+        else:
+            self._conn.execute("DELETE FROM recurrence_rules WHERE job_id = ?", (job['id'],))
+        self._row_cache[job['id']] = serialized
+
+    def _delete_job(self, job_id):
+        self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._row_cache.pop(job_id, None)
+
+    def load_jobs(self):
+        """All jobs in creation (id) order, as the dicts the web app works with."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, data FROM jobs ORDER BY id").fetchall()
+            jobs = []
+            self._row_cache = {}
+            for row in rows:
+                try:
+                    job = json.loads(row['data'])
+                except ValueError:
+                    continue
+                job['id'] = row['id']
+                self._row_cache[row['id']] = row['data']
+                jobs.append(job)
+            return jobs
+
+    def upsert_job(self, job):
+        """Insert or update a single job row. Returns False if the stored row was already identical."""
+        serialized = json.dumps(job, default=str)
+        with self._lock:
+            if self._row_cache.get(job['id']) == serialized:
+                return False
+            with self._transaction():
+                self._write_job(job, serialized)
+        return True
+
+    def delete_job(self, job_id):
+        with self._transaction():
+            self._delete_job(job_id)
+
+    def add_history(self, job_id, title, channel_number, started_at, ended_at, status,
+                    exit_code=None, output_file=None, error=None):
+        with self._transaction():
+            self._conn.execute(
+                """INSERT INTO recording_history
+                   (job_id, title, channel_number, started_at, ended_at, status, exit_code, output_file, error)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, title, str(channel_number) if channel_number is not None else None,
+                 started_at, ended_at, status, exit_code, output_file, error))
+
+    def recent_history(self, limit=50):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM recording_history ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def save_postprocess_job(self, data):
+        """Insert or update a post-processing job (keyed on data['id']). Returns its id."""
+        job_id = data.get('id')
+        with self._transaction():
+            if job_id is None:
+                cur = self._conn.execute("INSERT INTO postprocess_jobs (data) VALUES ('{}')")
+                job_id = data['id'] = cur.lastrowid
+            self._conn.execute(
+                """INSERT OR REPLACE INTO postprocess_jobs
+                   (id, kind, status, priority, recording_job_id, cpu_seconds, updated_at, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, data.get('kind'), data.get('status'), data.get('priority'),
+                 data.get('recording_job_id'), data.get('cpu_seconds'), datetime.now().isoformat(),
+                 json.dumps(data, default=str)))
+        return job_id
+
+    def load_postprocess_jobs(self, statuses):
+        marks = ','.join('?' * len(statuses))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM postprocess_jobs WHERE status IN ({marks}) ORDER BY priority, id",
+                tuple(statuses)).fetchall()
+        return [json.loads(r['data']) for r in rows]
+
+    def recent_postprocess_jobs(self, limit=50):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM postprocess_jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(r['data']) for r in rows]
+
+    def import_json(self, json_path):
+        """One-time import of a legacy scheduled_jobs.json. Returns the number of jobs imported.
+
+        The JSON file is left in place; a meta flag prevents importing it twice.
+        """
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'json_imported'").fetchone()
+            if done or not os.path.exists(json_path):
+                return 0
+            try:
+                with open(json_path, 'r') as f:
+                    legacy = json.load(f)
+            except Exception as e:
+                print(f"Schedule store: could not read {json_path}: {e}")
+                return 0
+            jobs = [j for j in legacy if isinstance(j, dict)]
+            next_id = max([j['id'] for j in jobs if isinstance(j.get('id'), int)], default=0)
+            seen_ids = set()
+            with self._transaction():
+                for job in jobs:
+                    if not isinstance(job.get('id'), int) or job['id'] in seen_ids:
+                        next_id += 1
+                        job['id'] = next_id
+                    seen_ids.add(job['id'])
+                    self._write_job(job, json.dumps(job, default=str))
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                                   (datetime.now().isoformat(),))
+            print(f"Schedule store: imported {len(jobs)} jobs from {json_path}")
+            return len(jobs)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK under the store lock."""
+
+    def __init__(self, store):
+        self._store = store
+        self._conn = store._conn
+        self._lock = store._lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self._lock.release()
+            raise
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type:
+                self._conn.execute("ROLLBACK")
+                # Rolled-back rows must not be treated as already persisted
+                self._store._reload_row_cache()
+            else:
+                self._conn.execute("COMMIT")
+        finally:
+            self._lock.release()
+        return False
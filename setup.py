@@ -329,7 +329,7 @@ def setup_epg():
     return {
         "zip_code": zip_code,
         "headend_id": headend_id_final,
-        "timezone": "America/Chicago",  # Could be auto-detected later
+        "timezone": "",  # Empty = derived from the zip code
         "auto_refresh": auto_refresh in ['y', 'yes'],
         "refresh_hours": [6, 14, 22]
     }
@@ -92,7 +92,8 @@ class LineDriveSetupGUI:
             "epg": {
                 "zip_code": "",
                 "headend_id": "",
-                "timezone": "America/New_York",
+                "timezone": "",
+                "timezone_migrated": True,
                 "auto_refresh": True,
                 "refresh_interval": 24
             },
@@ -1588,7 +1589,8 @@ Mac/Linux: arp -a | grep "00:18:dd"
                 "epg": {
                     "zip_code": self.zip_code_var.get(),
                     "headend_id": self.headend_var.get(),
-                    "timezone": "America/New_York",  # Could be made configurable
+                    "timezone": "",  # Empty = derived from the zip code
+                    "timezone_migrated": True,
                     "auto_refresh": True,
                     "refresh_interval": 24
                 },
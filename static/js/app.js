@@ -5,18 +5,24 @@ const resultDiv = document.getElementById('result');
 const torrentResultsDiv = document.getElementById('torrentResults');
 const micBtn = document.getElementById('micBtn');
 
+// Id of the command in flight; season searches stream partial episode lists tagged with it
+let pendingRequestId = null;
+
 form.addEventListener('submit', async (e) => {
   e.preventDefault();
   const command = input.value.trim();
   if (!command) return;
   resultDiv.textContent = 'Processing...';
+  const requestId = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+  pendingRequestId = requestId;
   try {
     const res = await fetch('/nlp_command', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ command })
+      body: JSON.stringify({ command, request_id: requestId })
     });
     const data = await res.json();
+    if (pendingRequestId === requestId) pendingRequestId = null;
     
     // Check if this is a series download response with episode data
     if (data.result && data.result.episodes && Array.isArray(data.result.episodes)) {
@@ -33,6 +39,7 @@ form.addEventListener('submit', async (e) => {
       resultDiv.textContent = JSON.stringify(data, null, 2);
     }
   } catch (err) {
+    if (pendingRequestId === requestId) pendingRequestId = null;
     resultDiv.textContent = 'Error: ' + err;
   }
 });
@@ -65,15 +72,18 @@ if ('webkitSpeechRecognition' in window) {
 }
 
 // Display episode selection interface for series downloads
-function displayEpisodeSelection(data) {
+function displayEpisodeSelection(data, partial = false) {
   const episodes = data.episodes;
   const seriesName = data.series || 'Unknown Series';
   const seasonNumber = data.season || '';
+  const found = partial
+    ? `Found ${episodes.length} episodes so far, still searching...`
+    : `Found ${episodes.length} episodes. Select episodes to download:`;
   
   let html = `
     <div class="episode-selection">
       <h4>📺 ${seriesName}${seasonNumber ? ` - Season ${seasonNumber}` : ''}</h4>
-      <p class="text-muted mb-3">Found ${episodes.length} episodes. Select episodes to download:</p>
+      <p class="text-muted mb-3">${found}</p>
       
       <div class="mb-3">
         <button class="btn btn-sm btn-outline-primary" onclick="toggleAllEpisodes(true)">Select All</button>
@@ -567,17 +577,68 @@ function scheduleRecording() {
   });
 }
 
+function renderProgress(data) {
+  const el = document.getElementById('progress');
+  if (el) el.innerHTML = data.html || '';
+}
+
 function updateProgress() {
   fetch('/progress')
     .then(res => res.json())
-    .then(data => {
-      document.getElementById('progress').innerHTML = data.html || '';
-    })
+    .then(renderProgress)
     .catch(err => {
       console.error('Error updating progress:', err);
     });
 }
 
+// Schedule events carry the re-rendered list (rendered once on the server for every open page)
+function renderScheduledList(data) {
+  const el = document.getElementById('scheduledList');
+  if (el && data.html !== undefined) el.innerHTML = data.html;
+}
+
+// Server push (SSE) for progress and schedule changes; polls only if EventSource is unavailable
+let progressPollTimer = null;
+
+function startProgressPolling() {
+  if (progressPollTimer) return;
+  updateProgress();
+  progressPollTimer = setInterval(updateProgress, 5000);
+}
+
+function connectEvents() {
+  if (!window.EventSource) {
+    startProgressPolling();
+    return;
+  }
+  const source = new EventSource('/events');
+  source.addEventListener('open', () => {
+    if (progressPollTimer) {
+      clearInterval(progressPollTimer);
+      progressPollTimer = null;
+    }
+  });
+  source.addEventListener('progress', e => renderProgress(JSON.parse(e.data)));
+  source.addEventListener('schedule', e => renderScheduledList(JSON.parse(e.data)));
+  source.addEventListener('season_search', e => {
+    const info = JSON.parse(e.data);
+    // Partial season results for the command this page is waiting on; the final response replaces them
+    if (!info.done && info.request_id && info.request_id === pendingRequestId && info.episodes.length) {
+      displayEpisodeSelection(info, true);
+    }
+  });
+  source.addEventListener('epg', e => {
+    const info = JSON.parse(e.data);
+    console.log(`EPG refreshed: ${info.programs} programs`);
+  });
+  source.addEventListener('error', () => {
+    // EventSource retries by itself; poll meanwhile so the page never goes stale
+    if (source.readyState !== EventSource.OPEN) startProgressPolling();
+  });
+}
+
+if (document.getElementById('progress')) connectEvents();
+
 // Auto-categorize torrents
 document.getElementById('autoCategorizeBtn')?.addEventListener('click', function() {
   this.textContent = '⏳ Categorizing...';
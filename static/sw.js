@@ -12,6 +12,9 @@ self.addEventListener('install', (e) => {
 });
 
 self.addEventListener('fetch', (e) => {
+  // Live streams (event push, HLS playback) go straight to the network
+  const path = new URL(e.request.url).pathname;
+  if (path === '/events' || path.startsWith('/hls/')) return;
   e.respondWith(
     caches.match(e.request).then((resp) => resp || fetch(e.request))
   );
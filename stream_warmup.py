@@ -0,0 +1,255 @@
+"""
+LineDrive Stream Warm-up
+Opens the tuner stream ahead of a recording and hands ffmpeg (or a file) the stream from the first keyframe
+"""
+
+import threading
+import time
+from collections import deque
+
+import http_client
+
+TS_PACKET = 188
+TS_SYNC = 0x47
+READ_CHUNK = TS_PACKET * 348  # ~64 KiB, a whole number of packets
+COPY_BUFFER = TS_PACKET * 5578  # ~1 MiB, the most one read may return
+
+# PMT stream types -> codec family used for keyframe detection
+VIDEO_STREAM_TYPES = {0x01: 'mpeg2', 0x02: 'mpeg2', 0x1B: 'h264', 0x24: 'hevc'}
+
+
+def _payload_offset(pkt):
+    """Offset of the payload in a TS packet (None if it has none) and the random-access flag."""
+    afc = (pkt[3] >> 4) & 0x3
+    offset = 4
+    rai = False
+    if afc & 0x2:
+        af_len = pkt[4]
+        if af_len:
+            rai = bool(pkt[5] & 0x40)
+        offset = 5 + af_len
+    if not afc & 0x1 or offset >= TS_PACKET:
+        return None, rai
+    return offset, rai
+
+
+def _section(pkt, offset):
+    """(start, end) of the PSI section in a packet whose payload starts a section."""
+    start = offset + 1 + pkt[offset]  # skip pointer_field
+    if start + 3 > TS_PACKET:
+        return None
+    length = ((pkt[start + 1] & 0x0F) << 8) | pkt[start + 2]
+    return start, min(TS_PACKET, start + 3 + length - 4)  # without CRC
+
+
+def parse_pat(pkt, offset):
+    """PMT PIDs listed in a PAT packet."""
+    bounds = _section(pkt, offset)
+    if not bounds or pkt[bounds[0]] != 0x00:
+        return set()
+    pids = set()
+    for pos in range(bounds[0] + 8, bounds[1] - 3, 4):
+        program = (pkt[pos] << 8) | pkt[pos + 1]
+        if program:
+            pids.add(((pkt[pos + 2] & 0x1F) << 8) | pkt[pos + 3])
+    return pids
+
+
+def parse_pmt(pkt, offset):
+    """{elementary PID: codec} for the video streams in a PMT packet."""
+    bounds = _section(pkt, offset)
+    if not bounds or pkt[bounds[0]] != 0x02:
+        return {}
+    start, end = bounds
+    pos = start + 12 + (((pkt[start + 10] & 0x0F) << 8) | pkt[start + 11])
+    video = {}
+    while pos + 5 <= end:
+        stream_type = pkt[pos]
+        pid = ((pkt[pos + 1] & 0x1F) << 8) | pkt[pos + 2]
+        if stream_type in VIDEO_STREAM_TYPES:
+            video[pid] = VIDEO_STREAM_TYPES[stream_type]
+        pos += 5 + (((pkt[pos + 3] & 0x0F) << 8) | pkt[pos + 4])
+    return video
+
+
+def payload_has_keyframe(payload, codec):
+    """Look for the start codes that begin a random access point in a PES payload."""
+    i = payload.find(b'\x00\x00\x01')
+    while 0 <= i < len(payload) - 3:
+        code = payload[i + 3]
+        if codec == 'mpeg2':
+            if code in (0xB3, 0xB8):  # sequence header / GOP header
+                return True
+        elif codec == 'h264':
+            if code & 0x1F in (5, 7):  # IDR slice / SPS
+                return True
+        elif codec == 'hevc':
+            if (code >> 1) & 0x3F in (19, 20, 32, 33):  # IDR / VPS / SPS
+                return True
+        i = payload.find(b'\x00\x00\x01', i + 3)
+    return False
+
+
+class StreamWarmup:
+    """HTTP MPEG-TS stream opened before capture starts.
+
+    wait_for_keyframe() reads (and discards) the stream until a video keyframe
+    at or after `not_before`, tracking the PAT/PMT so they can be replayed
+    first. pump() then copies the stream into ffmpeg's stdin starting at that
+    packet, so the recording begins on a clean, decodable frame. copy_to()
+    does the same into any file-like object without ffmpeg.
+    """
+
+    def __init__(self, url, connect_timeout=5, keyframe_timeout=15):
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.keyframe_timeout = keyframe_timeout
+        self._response = None
+        self._chunks = None
+        self._head = b''
+        self.opened_at = None
+        self.connect_sec = None
+        self.first_keyframe_sec = None
+        self.start_delay_sec = None
+        self.keyframe_found = False
+        self.bytes_pumped = 0
+
+    def open(self):
+        started = time.time()
+        self._response = http_client.device_get(self.url, stream=True, timeout=(self.connect_timeout, 10))
+        self._response.raise_for_status()
+        self._chunks = self._response.iter_content(chunk_size=READ_CHUNK)
+        self.opened_at = started
+        self.connect_sec = round(time.time() - started, 3)
+
+    def _packets(self):
+        """Yields (buffer, offset) for each aligned packet; the caller may stop at any one."""
+        rest = b''
+        for chunk in self._chunks:
+            buf = rest + chunk if rest else chunk
+            pos, end = 0, len(buf)
+            while end - pos >= TS_PACKET:
+                if buf[pos] != TS_SYNC:
+                    nxt = buf.find(b'\x47', pos + 1)
+                    pos = nxt if nxt >= 0 else end
+                    continue
+                yield buf, pos
+                pos += TS_PACKET
+            rest = buf[pos:]
+
+    def wait_for_keyframe(self, not_before=None):
+        """Discard packets until a keyframe at or after `not_before` (epoch). Returns True if found.
+
+        Gives up after keyframe_timeout seconds past `not_before` (or past opening)
+        and starts from the current packet, so an unknown codec still records.
+        """
+        pat = pmt = None
+        pmt_pids = set()
+        video = {}
+        deadline = max(not_before or 0, time.time()) + self.keyframe_timeout
+        for buf, pos in self._packets():
+            pkt = buf[pos:pos + TS_PACKET]
+            pid = ((pkt[1] & 0x1F) << 8) | pkt[2]
+            pusi = pkt[1] & 0x40
+            offset, rai = _payload_offset(pkt)
+            if pusi and offset is not None:
+                if pid == 0:
+                    pat, pmt_pids = pkt, parse_pat(pkt, offset) or pmt_pids
+                elif pid in pmt_pids:
+                    found = parse_pmt(pkt, offset)
+                    if found:
+                        pmt, video = pkt, found
+            now = time.time()
+            keyframe = pid in video and pusi and (
+                rai or (offset is not None and payload_has_keyframe(pkt[offset:], video[pid])))
+            if keyframe and self.first_keyframe_sec is None:
+                self.first_keyframe_sec = round(now - self.opened_at, 3)
+            if (keyframe and (not_before is None or now >= not_before)) or now >= deadline:
+                self.keyframe_found = bool(keyframe)
+                self.start_delay_sec = round(now - not_before, 3) if not_before else 0.0
+                self._head = (pat or b'') + (pmt or b'') + buf[pos:]
+                return self.keyframe_found
+        raise IOError("tuner stream ended during warm-up")
+
+    def copy_to(self, sink, stop_event=None, deadline=None, on_progress=None, buffer_size=COPY_BUFFER):
+        """Write the stream to sink from the keyframe on, until EOF, stop or the wall-clock deadline.
+
+        Reads whatever the socket has (up to buffer_size) and writes it as-is, with
+        no per-packet work. read1() is used because read()/readinto() block until
+        the whole buffer is full, which on a low-bitrate subchannel would overshoot
+        the deadline and delay stops by seconds. on_progress(bytes) is called after
+        every write. Returns the number of bytes written.
+        """
+        sink.write(self._head)
+        self.bytes_pumped += len(self._head)
+        raw = self._response.raw
+        read = raw.read1 if hasattr(raw, 'read1') else (lambda n: raw.read(READ_CHUNK))
+        while not (stop_event is not None and stop_event.is_set()):
+            if deadline is not None and time.time() >= deadline:
+                break
+            data = read(buffer_size)
+            if not data:
+                break
+            sink.write(data)
+            self.bytes_pumped += len(data)
+            if on_progress:
+                on_progress(self.bytes_pumped)
+        return self.bytes_pumped
+
+    def pump(self, sink, stop_event=None):
+        """Copy the stream into sink (ffmpeg stdin) until EOF, stop or a closed pipe, then close it."""
+        try:
+            self.copy_to(sink, stop_event)
+        except (OSError, ValueError):
+            pass  # ffmpeg exited (duration reached or stopped)
+        except Exception as e:
+            print(f"Tuner stream error: {e}")
+        finally:
+            try:
+                sink.close()  # EOF lets ffmpeg finalize the file
+            except OSError:
+                pass
+            self.close()
+
+    def close(self):
+        if self._response is not None:
+            self._response.close()
+
+    def to_dict(self):
+        return {
+            'connect_sec': self.connect_sec,
+            'first_keyframe_sec': self.first_keyframe_sec,
+            'start_delay_sec': self.start_delay_sec,
+            'keyframe_found': self.keyframe_found,
+        }
+
+
+class WarmupStats:
+    """Recent warm-up latencies per channel; the scheduler uses them to open tuners early enough."""
+
+    def __init__(self, history=20):
+        self._history = history
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, channel, seconds):
+        if seconds is None:
+            return
+        with self._lock:
+            self._samples.setdefault(str(channel), deque(maxlen=self._history)).append(seconds)
+
+    def worst(self, channel):
+        with self._lock:
+            samples = self._samples.get(str(channel))
+            return max(samples) if samples else None
+
+    def lead_sec(self, channel, base_sec):
+        """Seconds to open the stream before capture: the configured lead, or more if this channel is slow."""
+        worst = self.worst(channel)
+        return max(base_sec, worst + 2) if worst is not None else base_sec
+
+    def snapshot(self):
+        with self._lock:
+            return {ch: {'samples': len(s), 'last_sec': s[-1], 'avg_sec': round(sum(s) / len(s), 3),
+                         'max_sec': max(s)}
+                    for ch, s in self._samples.items()}
@@ -3,7 +3,7 @@ Torrent Client Manager for LineDrive
 Handles integration with various torrent clients (qBittorrent, Transmission, Deluge)
 """
 
-import requests
+import http_client
 import json
 import base64
 from pathlib import Path
@@ -17,7 +17,7 @@ class TorrentClientManager:
         self.base_url = self.torrent_config.get('url', 'http://localhost:8080')
         self.username = self.torrent_config.get('username', 'admin')
         self.password = self.torrent_config.get('password', '')
-        self.session = requests.Session()
+        self.session = http_client.new_session()
         self.authenticated = False
 
     def authenticate(self):
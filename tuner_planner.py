@@ -0,0 +1,209 @@
+"""
+LineDrive Tuner Planner
+Admission control for the schedule: interval sweep of planned recordings against the tuner count
+"""
+
+from datetime import datetime, time as dtime, timedelta
+
+from epg_store import EPGStore
+from recording_scheduler import parse_job_time, recurrence_weekdays
+
+DEFAULT_HORIZON_DAYS = 14
+DEFAULT_DURATION_MIN = 30
+
+
+class TunerConflictError(Exception):
+    """Raised when adding a job would need more tuners than the device has at some instant."""
+
+    def __init__(self, conflicts, alternatives=None):
+        self.conflicts = conflicts
+        self.alternatives = alternatives or []
+        first = conflicts[0]
+        titles = ', '.join(j['title'] for j in first['jobs'])
+        super().__init__(f"All {first['tuners']} tuners are busy {first['start'][:16].replace('T', ' ')}"
+                         f" - {first['end'][11:16]} ({titles})")
+
+    def to_dict(self):
+        return {'error': str(self), 'conflicts': self.conflicts, 'alternatives': self.alternatives}
+
+
+def job_duration_min(job):
+    try:
+        return int(float(job.get('duration') or DEFAULT_DURATION_MIN)) or DEFAULT_DURATION_MIN
+    except (TypeError, ValueError):
+        return DEFAULT_DURATION_MIN
+
+
+def job_intervals(job, start, end):
+    """(start, end) datetimes of a job's recordings that overlap [start, end)."""
+    length = timedelta(minutes=job_duration_min(job))
+    if job.get('type') == 'recurring_series':
+        if job.get('status') != 'active':
+            return []
+        hm = parse_job_time(job.get('time') or (job.get('recurrence') or {}).get('time'))
+        if not hm:
+            return []
+        weekdays = recurrence_weekdays(job)
+        out = []
+        day = (start - length).date()
+        while day <= end.date():
+            begin = datetime.combine(day, dtime(hm[0], hm[1]))
+            if (not weekdays or begin.weekday() in weekdays) and begin < end and begin + length > start:
+                out.append((begin, begin + length))
+            day += timedelta(days=1)
+        return out
+
+    if job.get('status') not in ('scheduled', 'recording'):
+        return []
+    begin = None
+    if job.get('status') == 'recording' and job.get('last_started_at'):
+        try:
+            begin = datetime.fromisoformat(job['last_started_at'])
+        except (TypeError, ValueError):
+            begin = None
+    if begin is None:
+        hm = parse_job_time(job.get('time'))
+        try:
+            begin = datetime.strptime(job.get('date') or '', '%Y-%m-%d').replace(hour=hm[0], minute=hm[1])
+        except (TypeError, ValueError):
+            return []
+    if begin < end and begin + length > start:
+        return [(begin, begin + length)]
+    return []
+
+
+def overloaded_windows(intervals, capacity):
+    """Sweep over interval endpoints; windows where more than `capacity` intervals overlap.
+
+    intervals are (start, end, ref). An interval that ends exactly when another
+    starts does not overlap it (ends are processed before starts at equal times).
+    Returns (peak concurrency, [{'start', 'end', 'peak', 'refs'}]).
+    """
+    points = []
+    for i, (begin, finish, _) in enumerate(intervals):
+        if finish > begin:
+            points.append((begin, 1, i))
+            points.append((finish, 0, i))
+    points.sort(key=lambda p: (p[0], p[1]))
+    active = set()
+    peak = 0
+    windows = []
+    current = None
+    for at, is_start, i in points:
+        if is_start:
+            active.add(i)
+        else:
+            active.discard(i)
+        peak = max(peak, len(active))
+        if len(active) > capacity:
+            if current is None:
+                if windows and windows[-1]['end'] == at:
+                    current = windows.pop()  # dip at a shared boundary, same conflict
+                else:
+                    current = {'start': at, 'peak': 0, 'refs': set()}
+            current['refs'] |= active
+            current['peak'] = max(current['peak'], len(active))
+        elif current is not None:
+            current['end'] = at
+            windows.append(current)
+            current = None
+    return peak, windows
+
+
+class TunerPlanner:
+    """Checks the schedule over a rolling horizon against the number of tuners.
+
+    tuner_count may be an int or a callable (e.g. RecordingManager.get_tuner_count)
+    so a device with more tuners is picked up without rebuilding the planner.
+    padding_fn(job) returns the (pre, post) seconds a recording holds its tuner
+    around the programme.
+    """
+
+    def __init__(self, tuner_count, horizon_days=DEFAULT_HORIZON_DAYS, padding_fn=None):
+        self._tuner_count = tuner_count
+        self.horizon_days = horizon_days
+        self.padding_fn = padding_fn
+
+    def capacity(self):
+        count = self._tuner_count() if callable(self._tuner_count) else self._tuner_count
+        return max(1, int(count or 1))
+
+    def _intervals(self, jobs, start, end):
+        out = []
+        for job in jobs:
+            if isinstance(job, dict):
+                pre, post = self.padding_fn(job) if self.padding_fn else (0, 0)
+                for begin, finish in job_intervals(job, start, end):
+                    out.append((begin - timedelta(seconds=pre), finish + timedelta(seconds=post), job))
+        return out
+
+    @staticmethod
+    def _describe(intervals, windows, capacity):
+        conflicts = []
+        for w in windows:
+            jobs = sorted((intervals[i] for i in w['refs']), key=lambda r: r[0])
+            conflicts.append({
+                'start': w['start'].isoformat(),
+                'end': w['end'].isoformat(),
+                'recordings': w['peak'],
+                'tuners': capacity,
+                'jobs': [{'id': job.get('id'), 'title': job.get('title') or '',
+                          'channel_number': str(job.get('channel_number') or ''),
+                          'start': begin.isoformat(), 'end': finish.isoformat()}
+                         for begin, finish, job in jobs],
+            })
+        return conflicts
+
+    def plan(self, jobs, now=None):
+        """Peak concurrency and every overloaded window in the horizon."""
+        now = now or datetime.now()
+        end = now + timedelta(days=self.horizon_days)
+        intervals = self._intervals(jobs, now, end)
+        capacity = self.capacity()
+        peak, windows = overloaded_windows(intervals, capacity)
+        return {
+            'tuners': capacity,
+            'horizon_end': end.isoformat(),
+            'peak': peak,
+            'conflicts': self._describe(intervals, windows, capacity),
+        }
+
+    def conflicts_with(self, jobs, new_jobs, now=None):
+        """Overloaded windows that include at least one of new_jobs."""
+        now = now or datetime.now()
+        end = now + timedelta(days=self.horizon_days)
+        new_ids = {id(j) for j in new_jobs}
+        intervals = self._intervals(list(jobs) + list(new_jobs), now, end)
+        capacity = self.capacity()
+        _, windows = overloaded_windows(intervals, capacity)
+        involved = [w for w in windows if any(id(intervals[i][2]) in new_ids for i in w['refs'])]
+        return self._describe(intervals, involved, capacity)
+
+    def alternatives(self, job, jobs, programs, now=None, limit=5):
+        """Other EPG airings of the same show (same episode when known) that fit the tuners."""
+        title = (job.get('title') or '').strip().lower()
+        if not title:
+            return []
+        episode_id = job.get('episode_id')
+        now = now or datetime.now()
+        own_starts = {begin for begin, _ in job_intervals(job, now, now + timedelta(days=self.horizon_days))}
+        found = []
+        for entry in programs:
+            if (entry.get('title') or '').strip().lower() != title:
+                continue
+            if episode_id and entry.get('episode_id') and entry.get('episode_id') != episode_id:
+                continue
+            begin = EPGStore.start_of(entry)
+            if begin is None or begin in own_starts:
+                continue
+            candidate = {'status': 'scheduled', 'title': entry.get('title'),
+                         'date': begin.strftime('%Y-%m-%d'), 'time': begin.strftime('%H:%M'),
+                         'duration': entry.get('duration') or job.get('duration')}
+            if self.conflicts_with(jobs, [candidate], now=now):
+                continue
+            found.append({key: entry.get(key) for key in
+                          ('title', 'episode_title', 'episode_id', 'channel', 'channel_number', 'call_sign',
+                           'date', 'time', 'duration')})
+            if len(found) >= limit:
+                break
+        return found
@@ -5,7 +5,7 @@ Generic VPN support for secure connections with multiple providers
 
 import subprocess
 import time
-import requests
+import http_client
 from config_manager import get_config
 
 class VPNManager:
@@ -56,8 +56,10 @@ class VPNManager:
     def check_ip_change(self):
         """Check if IP indicates VPN connection by comparing with known local IP"""
         try:
-            response = requests.get(
+            # Connection: close so the check never rides a keep-alive connection opened before the VPN came up
+            response = http_client.get(
                 self.vpn_config['connection_check_url'], 
+                headers={'Connection': 'close'},
                 timeout=5
             )
             if response.status_code == 200:
@@ -178,8 +180,9 @@ class VPNManager:
             
             # Get IP information
             try:
-                response = requests.get(
+                response = http_client.get(
                     self.vpn_config['connection_check_url'], 
+                    headers={'Connection': 'close'},
                     timeout=5
                 )
                 if response.status_code == 200: